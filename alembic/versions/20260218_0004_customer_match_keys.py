@@ -0,0 +1,138 @@
+"""Add normalized customer match keys
+
+Revision ID: 20260218_0004
+Revises: 20260218_0003
+Create Date: 2026-02-18 03:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "20260218_0004"
+down_revision = "20260218_0003"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 1000
+
+_customers = sa.table(
+    "customers",
+    sa.column("customer_id", sa.BigInteger),
+    sa.column("first_name", sa.Unicode),
+    sa.column("last_name", sa.Unicode),
+    sa.column("phone", sa.Unicode),
+    sa.column("email", sa.Unicode),
+    sa.column("phone_digits", sa.Unicode),
+    sa.column("email_normalized", sa.Unicode),
+    sa.column("name_key", sa.Unicode),
+)
+
+
+# Frozen copy of pecan_crm.domain.customer_keys as of this revision. Migrations must not
+# import application code, which can change after the revision ships.
+def _normalize_phone(value: str | None) -> str:
+    digits = "".join(ch for ch in (value or "") if ch.isdigit())
+    if len(digits) == 11 and digits.startswith("1"):
+        return digits[1:]
+    return digits
+
+
+def _normalize_text(value: str | None) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _match_keys(row: sa.Row) -> dict[str, str | None]:
+    first = _normalize_text(row.first_name)
+    last = _normalize_text(row.last_name)
+    return {
+        "phone_digits": _normalize_phone(row.phone) or None,
+        "email_normalized": _normalize_text(row.email) or None,
+        "name_key": f"{first}|{last}" if first and last else None,
+    }
+
+
+# Offline (--sql) scripts can't run Python per row. These T-SQL expressions cover the usual
+# phone punctuation and trim/lowercase; the application recomputes exact keys on next save.
+_OFFLINE_BACKFILL = [
+    """
+    UPDATE customers SET
+        phone_digits = NULLIF(
+            REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
+                phone, ' ', ''), '-', ''), '(', ''), ')', ''), '.', ''), '+', ''), '/', ''),
+                CHAR(9), ''),
+            ''),
+        email_normalized = NULLIF(LOWER(LTRIM(RTRIM(email))), ''),
+        name_key = CASE
+            WHEN LTRIM(RTRIM(ISNULL(first_name, ''))) = ''
+                OR LTRIM(RTRIM(ISNULL(last_name, ''))) = ''
+                THEN NULL
+            ELSE LOWER(LTRIM(RTRIM(first_name))) + '|' + LOWER(LTRIM(RTRIM(last_name)))
+        END
+    """,
+    """
+    UPDATE customers SET phone_digits = SUBSTRING(phone_digits, 2, 10)
+    WHERE LEN(phone_digits) = 11 AND LEFT(phone_digits, 1) = '1'
+    """,
+]
+
+
+def _backfill_online() -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                _customers.c.customer_id,
+                _customers.c.first_name,
+                _customers.c.last_name,
+                _customers.c.phone,
+                _customers.c.email,
+            )
+            .where(_customers.c.customer_id > last_id)
+            .order_by(_customers.c.customer_id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        updates = []
+        for row in rows:
+            updates.append({"id": row.customer_id, **_match_keys(row)})
+        bind.execute(
+            _customers.update()
+            .where(_customers.c.customer_id == sa.bindparam("id"))
+            .values(
+                phone_digits=sa.bindparam("phone_digits"),
+                email_normalized=sa.bindparam("email_normalized"),
+                name_key=sa.bindparam("name_key"),
+            ),
+            updates,
+        )
+        last_id = rows[-1].customer_id
+
+
+def upgrade() -> None:
+    op.add_column("customers", sa.Column("phone_digits", sa.Unicode(30), nullable=True))
+    op.add_column("customers", sa.Column("email_normalized", sa.Unicode(254), nullable=True))
+    op.add_column("customers", sa.Column("name_key", sa.Unicode(201), nullable=True))
+
+    if context.is_offline_mode():
+        for statement in _OFFLINE_BACKFILL:
+            op.execute(statement)
+    else:
+        _backfill_online()
+
+    op.create_index("IX_customers_phone_digits", "customers", ["phone_digits"])
+    op.create_index("IX_customers_email_normalized", "customers", ["email_normalized"])
+    op.create_index("IX_customers_name_key", "customers", ["name_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("IX_customers_name_key", table_name="customers")
+    op.drop_index("IX_customers_email_normalized", table_name="customers")
+    op.drop_index("IX_customers_phone_digits", table_name="customers")
+    op.drop_column("customers", "name_key")
+    op.drop_column("customers", "email_normalized")
+    op.drop_column("customers", "phone_digits")
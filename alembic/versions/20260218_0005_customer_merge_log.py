@@ -0,0 +1,71 @@
+"""Add customer merge log
+
+Revision ID: 20260218_0005
+Revises: 20260218_0004
+Create Date: 2026-02-18 04:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260218_0005"
+down_revision = "20260218_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "customer_merges",
+        sa.Column("merge_id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("batch_id", sa.Unicode(36), nullable=False),
+        sa.Column("survivor_customer_id", sa.BigInteger(), nullable=False),
+        sa.Column("duplicate_customer_id", sa.BigInteger(), nullable=False),
+        sa.Column("duplicate_was_active", sa.Boolean(), nullable=False),
+        sa.Column(
+            "merged_at_utc",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("SYSUTCDATETIME()"),
+        ),
+        sa.Column("rolled_back_at_utc", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["survivor_customer_id"], ["customers.customer_id"], name="FK_customer_merges_survivor"
+        ),
+        sa.ForeignKeyConstraint(
+            ["duplicate_customer_id"],
+            ["customers.customer_id"],
+            name="FK_customer_merges_duplicate",
+        ),
+        sa.CheckConstraint(
+            "survivor_customer_id <> duplicate_customer_id",
+            name="CK_customer_merges_distinct",
+        ),
+    )
+    op.create_table(
+        "customer_merge_sales",
+        sa.Column("merge_id", sa.BigInteger(), nullable=False),
+        sa.Column("sale_id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("merge_id", "sale_id", name="PK_customer_merge_sales"),
+        sa.ForeignKeyConstraint(
+            ["merge_id"], ["customer_merges.merge_id"], name="FK_customer_merge_sales_merge"
+        ),
+        sa.ForeignKeyConstraint(
+            ["sale_id"], ["sales.sale_id"], name="FK_customer_merge_sales_sale"
+        ),
+    )
+
+    op.create_index(
+        "IX_customer_merges_batch_id", "customer_merges", ["batch_id", "duplicate_customer_id"]
+    )
+    op.create_index("IX_customer_merges_duplicate", "customer_merges", ["duplicate_customer_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("IX_customer_merges_duplicate", table_name="customer_merges")
+    op.drop_index("IX_customer_merges_batch_id", table_name="customer_merges")
+    op.drop_table("customer_merge_sales")
+    op.drop_table("customer_merges")
@@ -0,0 +1,28 @@
+"""Index sales by customer and sale time
+
+Revision ID: 20260218_0006
+Revises: 20260218_0005
+Create Date: 2026-02-18 05:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20260218_0006"
+down_revision = "20260218_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves purchase-history keyset pages; the leading customer_id column also covers
+    # every lookup the old single-column index did.
+    op.create_index("IX_sales_customer_sold_at", "sales", ["customer_id", "sold_at_utc", "sale_id"])
+    op.drop_index("IX_sales_customer_id", table_name="sales")
+
+
+def downgrade() -> None:
+    op.create_index("IX_sales_customer_id", "sales", ["customer_id"])
+    op.drop_index("IX_sales_customer_sold_at", table_name="sales")
@@ -7,6 +7,9 @@ CREATE TABLE customers (
     phone NVARCHAR(30) NULL,
     email NVARCHAR(254) NULL,
     notes NVARCHAR(500) NULL,
+    phone_digits NVARCHAR(30) NULL,
+    email_normalized NVARCHAR(254) NULL,
+    name_key NVARCHAR(201) NULL,
     is_active BIT NOT NULL CONSTRAINT DF_customers_is_active DEFAULT (1),
     created_at_utc DATETIME2 NOT NULL CONSTRAINT DF_customers_created_at DEFAULT (SYSUTCDATETIME()),
     updated_at_utc DATETIME2 NOT NULL CONSTRAINT DF_customers_updated_at DEFAULT (SYSUTCDATETIME())
@@ -80,9 +83,35 @@ CREATE TABLE app_settings (
     updated_at_utc DATETIME2 NOT NULL CONSTRAINT DF_app_settings_updated_at DEFAULT (SYSUTCDATETIME())
 );
 
+CREATE TABLE customer_merges (
+    merge_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    batch_id NVARCHAR(36) NOT NULL,
+    survivor_customer_id BIGINT NOT NULL,
+    duplicate_customer_id BIGINT NOT NULL,
+    duplicate_was_active BIT NOT NULL,
+    merged_at_utc DATETIME2 NOT NULL DEFAULT (SYSUTCDATETIME()),
+    rolled_back_at_utc DATETIME2 NULL,
+    CONSTRAINT FK_customer_merges_survivor FOREIGN KEY (survivor_customer_id) REFERENCES customers(customer_id),
+    CONSTRAINT FK_customer_merges_duplicate FOREIGN KEY (duplicate_customer_id) REFERENCES customers(customer_id),
+    CONSTRAINT CK_customer_merges_distinct CHECK (survivor_customer_id <> duplicate_customer_id)
+);
+
+CREATE TABLE customer_merge_sales (
+    merge_id BIGINT NOT NULL,
+    sale_id BIGINT NOT NULL,
+    CONSTRAINT PK_customer_merge_sales PRIMARY KEY (merge_id, sale_id),
+    CONSTRAINT FK_customer_merge_sales_merge FOREIGN KEY (merge_id) REFERENCES customer_merges(merge_id),
+    CONSTRAINT FK_customer_merge_sales_sale FOREIGN KEY (sale_id) REFERENCES sales(sale_id)
+);
+
 CREATE INDEX IX_sales_sold_at_utc ON sales(sold_at_utc);
-CREATE INDEX IX_sales_customer_id ON sales(customer_id);
+CREATE INDEX IX_sales_customer_sold_at ON sales(customer_id, sold_at_utc, sale_id);
 CREATE INDEX IX_sale_items_sale_id ON sale_items(sale_id);
 CREATE INDEX IX_products_name ON products(name);
 CREATE INDEX IX_customers_phone ON customers(phone);
 CREATE INDEX IX_customers_email ON customers(email);
+CREATE INDEX IX_customers_phone_digits ON customers(phone_digits);
+CREATE INDEX IX_customers_email_normalized ON customers(email_normalized);
+CREATE INDEX IX_customers_name_key ON customers(name_key);
+CREATE INDEX IX_customer_merges_batch_id ON customer_merges(batch_id, duplicate_customer_id);
+CREATE INDEX IX_customer_merges_duplicate ON customer_merges(duplicate_customer_id);
@@ -0,0 +1,64 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.services.receipt_archive import ReceiptArchiver
+from pecan_crm.services.receipt_storage import ReceiptStore
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Pack closed months of receipts into monthly archives"
+    )
+    parser.add_argument("--receipt-folder", required=True, type=Path)
+    parser.add_argument("--report-path", type=Path)
+    parser.add_argument(
+        "--today",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="Months before this date's month are treated as closed (default: today)",
+    )
+    parser.add_argument(
+        "--extract", metavar="RECEIPT_NUMBER", help="Extract one archived receipt and exit"
+    )
+    parser.add_argument("--dest", type=Path, help="Destination folder for --extract")
+    args = parser.parse_args()
+
+    store = ReceiptStore(args.receipt_folder)
+
+    if args.extract:
+        path = store.extract(args.extract, args.dest) if args.dest else store.extract(args.extract)
+        if path is None:
+            print(f"Receipt {args.extract} is not in an archive")
+            return 1
+        print(f"Extracted: {path}")
+        return 0
+
+    report = ReceiptArchiver(store).pack_closed_months(args.today)
+    payload = {
+        "months": report.months,
+        "receipts_packed": report.receipts_packed,
+        "bytes_loose": report.bytes_loose,
+        "bytes_packed": report.bytes_packed,
+    }
+
+    print(json.dumps(payload, indent=2))
+    if args.report_path:
+        args.report_path.parent.mkdir(parents=True, exist_ok=True)
+        args.report_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"Report written: {args.report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.services.customer_dedupe import CustomerDedupeEngine, DedupeRecord
+
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "Ann", "Ada"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Moss", "Lee"
+]
+
+
+def sample_records(count: int, duplicate_rate: float) -> tuple[list[DedupeRecord], int]:
+    """Distinct customers plus reformatted/misspelled copies of a fraction of them."""
+    rng = random.Random(1)
+    records: list[DedupeRecord] = []
+    planted = 0
+    while len(records) < count:
+        customer_id = str(len(records) + 1)
+        first = f"{rng.choice(FIRST_NAMES)}{rng.choice('abcdefghijklmnopqrstuvwxyz')}"
+        last = f"{rng.choice(LAST_NAMES)}{rng.randint(0, 999)}"
+        digits = f"{rng.randint(200, 999)}{rng.randint(0, 9_999_999):07d}"
+        email = f"{first}.{last}{rng.randint(0, 99)}@example.com"
+        record = DedupeRecord(customer_id, first, last, digits, email)
+        records.append(record)
+        if rng.random() < duplicate_rate and len(records) < count:
+            records.append(
+                DedupeRecord(
+                    str(len(records) + 1),
+                    first[:-1] if rng.random() < 0.5 else first.upper(),
+                    last,
+                    f"({digits[:3]}) {digits[3:6]}-{digits[6:]}",
+                    "" if rng.random() < 0.5 else record.email.upper(),
+                )
+            )
+            planted += 1
+    return records, planted
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark blocking-based customer dedupe")
+    parser.add_argument("--count", type=int, default=500_000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    records, planted = sample_records(args.count, args.duplicate_rate)
+    engine = CustomerDedupeEngine()
+    start = time.perf_counter()
+    engine.add_many(records)
+    blocked = time.perf_counter()
+    clusters = engine.clusters()
+    done = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "count": len(records),
+                "planted_duplicates": planted,
+                "found_pairs": sum(len(cluster.members) - 1 for cluster in clusters),
+                "block_seconds": round(blocked - start, 2),
+                "cluster_seconds": round(done - blocked, 2),
+                "stats": engine.stats.__dict__,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.services.customer_search import CustomerSearchIndex
+
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "Ann", "Ada"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Moss", "Lee"
+]
+
+
+def sample_customers(count: int) -> list[SimpleNamespace]:
+    rng = random.Random(1)
+    return [
+        SimpleNamespace(
+            customer_id=i,
+            first_name=f"{rng.choice(FIRST_NAMES)}{i % 97}",
+            last_name=rng.choice(LAST_NAMES),
+            phone=f"555-{rng.randint(0, 9_999_999):07d}",
+            email=f"user{i}@example.com",
+            is_active=True,
+            updated_at_utc=datetime(2026, 1, 1),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the in-process customer search index")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--query", action="append", default=None)
+    args = parser.parse_args()
+    queries = args.query or ["smith", "mary4", "user4242", "555-1234", "42"]
+
+    customers = sample_customers(args.count)
+    index = CustomerSearchIndex()
+    start = time.perf_counter()
+    index.upsert(customers)
+    build_seconds = time.perf_counter() - start
+
+    results = {}
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query)
+        results[query] = {"hits": len(hits), "ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    report = {"count": args.count, "build_seconds": round(build_seconds, 2), "queries": results}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
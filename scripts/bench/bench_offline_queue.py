@@ -0,0 +1,79 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.offline.queue import OfflineSaleQueue, QueuedSale
+
+
+def sample_payload(i: int) -> dict:
+    return {
+        "cart_lines": [
+            {"product_id": 1, "quantity": "2", "weight_lbs": None},
+            {"product_id": 2, "quantity": None, "weight_lbs": "1.250"},
+        ],
+        "payment_method": "CASH",
+        "customer_id": None,
+        "discount_type": "NONE",
+        "discount_value": "0",
+        "sequence": i,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark offline queue enqueue and drain throughput"
+    )
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--synchronous", default="NORMAL")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated server round trip")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = OfflineSaleQueue(Path(tmp) / "offline_queue.db", synchronous=args.synchronous)
+
+        start = time.perf_counter()
+        for i in range(args.count):
+            queue.enqueue(idempotency_key=f"bench-{i}", payload=sample_payload(i))
+        enqueue_seconds = time.perf_counter() - start
+
+        def batch_sender(batch: list[QueuedSale]) -> dict[str, Exception | None]:
+            if args.latency_ms:
+                time.sleep(args.latency_ms / 1000)
+            return {item.idempotency_key: None for item in batch}
+
+        start = time.perf_counter()
+        result = queue.replay(batch_sender, batch_size=args.batch_size, max_workers=args.workers)
+        drain_seconds = time.perf_counter() - start
+        queue.close()
+
+    payload = {
+        "count": args.count,
+        "synchronous": args.synchronous.upper(),
+        "latency_ms": args.latency_ms,
+        "batch_size": args.batch_size,
+        "workers": args.workers,
+        "enqueue_seconds": round(enqueue_seconds, 3),
+        "enqueue_per_second": round(args.count / enqueue_seconds),
+        "drain_seconds": round(drain_seconds, 3),
+        "drain_per_second": round(args.count / drain_seconds),
+        "sent": result["sent"],
+    }
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
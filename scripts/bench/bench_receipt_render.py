@@ -0,0 +1,142 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.services.receipts import ReceiptData, ReceiptLine, generate_receipt_pdf
+
+
+def sample_receipt(receipt_number: str, line_count: int) -> ReceiptData:
+    lines = [
+        ReceiptLine(
+            name=f"Pecan Halves {i}",
+            unit_type="WEIGHT" if i % 2 else "EACH",
+            quantity=None if i % 2 else Decimal("2"),
+            weight_lbs=Decimal("1.250") if i % 2 else None,
+            unit_price=Decimal("7.20"),
+            line_subtotal=Decimal("9.00") if i % 2 else Decimal("14.40"),
+        )
+        for i in range(line_count)
+    ]
+    return ReceiptData(
+        receipt_number=receipt_number,
+        sold_at_local=datetime(2026, 2, 18, 12, 30, 0),
+        business_name="Pecan Company",
+        business_address="123 Main St, Example City, ST",
+        business_phone="555-0100",
+        payment_method="CASH",
+        customer_summary="Jane Doe (555-0101)",
+        subtotal=Decimal("100.00"),
+        discount_total=Decimal("0.00"),
+        tax_total=Decimal("8.25"),
+        total=Decimal("108.25"),
+        lines=lines,
+    )
+
+
+def render_plain(receipt_dir: Path, data: ReceiptData) -> Path:
+    """Baseline: the pre-template renderer that draws every line with drawString."""
+    receipt_dir.mkdir(parents=True, exist_ok=True)
+    output_path = receipt_dir / f"receipt_{data.receipt_number}.pdf"
+
+    c = canvas.Canvas(str(output_path), pagesize=letter)
+    width, height = letter
+    y = height - 50
+
+    def write_line(text: str, step: int = 16) -> None:
+        nonlocal y
+        if y < 60:
+            c.showPage()
+            y = height - 50
+        c.drawString(50, y, text)
+        y -= step
+
+    write_line(data.business_name)
+    write_line(data.business_address)
+    write_line(data.business_phone)
+    write_line("-" * 70)
+    write_line(f"Receipt: {data.receipt_number}")
+    write_line(f"Date/Time: {data.sold_at_local.strftime('%Y-%m-%d %H:%M:%S')}")
+    write_line(f"Payment: {data.payment_method}")
+    if data.customer_summary:
+        write_line(f"Customer: {data.customer_summary}")
+    write_line("-" * 70)
+    for line in data.lines:
+        qty_weight = f"qty={line.quantity}" if line.unit_type == "EACH" else f"wt={line.weight_lbs}"
+        write_line(
+            f"{line.name} | {qty_weight} | ${line.unit_price:.2f} | ${line.line_subtotal:.2f}",
+            step=14,
+        )
+    write_line("-" * 70)
+    write_line(f"Subtotal: ${data.subtotal:.2f}")
+    write_line(f"Discount: ${data.discount_total:.2f}")
+    write_line(f"Tax: ${data.tax_total:.2f}")
+    write_line(f"Total: ${data.total:.2f}")
+
+    c.showPage()
+    c.save()
+    return output_path
+
+
+def measure(renderer, out_dir: Path, *, iterations: int, line_count: int) -> dict[str, float]:
+    timings_ms: list[float] = []
+    sizes: list[int] = []
+    for i in range(iterations):
+        data = sample_receipt(f"{i + 1:06d}", line_count)
+        start = time.perf_counter()
+        path = renderer(out_dir, data)
+        timings_ms.append((time.perf_counter() - start) * 1000)
+        sizes.append(path.stat().st_size)
+    return {
+        "mean_ms": round(statistics.mean(timings_ms), 3),
+        "median_ms": round(statistics.median(timings_ms), 3),
+        "mean_bytes": round(statistics.mean(sizes), 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark receipt PDF rendering approaches")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=8, help="Line items per receipt")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        # Warm-up so font and module setup is not charged to the first approach.
+        measure(generate_receipt_pdf, tmp_path / "warmup", iterations=5, line_count=args.lines)
+        payload = {
+            "iterations": args.iterations,
+            "lines_per_receipt": args.lines,
+            "plain_drawstring": measure(
+                render_plain, tmp_path / "plain", iterations=args.iterations, line_count=args.lines
+            ),
+            "cached_template": measure(
+                generate_receipt_pdf,
+                tmp_path / "template",
+                iterations=args.iterations,
+                line_count=args.lines,
+            ),
+        }
+
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
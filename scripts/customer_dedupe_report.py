@@ -1,98 +1,92 @@
+# ruff: noqa: E402
 from __future__ import annotations
 
 import argparse
 import csv
-from collections import defaultdict
+import json
+import sys
+import time
 from pathlib import Path
 
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
-def normalize_phone(value: str) -> str:
-    return "".join(ch for ch in (value or "") if ch.isdigit())
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
 
+from pecan_crm.services.customer_dedupe import (
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_THRESHOLD,
+    CustomerDedupeEngine,
+    iter_csv_records,
+    iter_db_records,
+)
 
-def normalize_text(value: str) -> str:
-    return (value or "").strip().lower()
 
-
-def pick(row: dict[str, str], *candidates: str) -> str:
-    for key in candidates:
-        if key in row and str(row[key]).strip():
-            return str(row[key]).strip()
-    return ""
+FIELDNAMES = [
+    "cluster_id",
+    "survivor_id",
+    "customer_id",
+    "score",
+    "reason",
+    "first_name",
+    "last_name",
+    "phone",
+    "email",
+]
 
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Generate duplicate-candidate report for customers")
-    parser.add_argument("--customers-csv", required=True, type=Path)
+    parser = argparse.ArgumentParser(description="Generate duplicate-cluster report for customers")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--customers-csv", type=Path)
+    source.add_argument(
+        "--connection-url", help="SQLAlchemy connection URL; reads the live customers table"
+    )
     parser.add_argument("--out-csv", required=True, type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--max-block-size", type=int, default=DEFAULT_MAX_BLOCK_SIZE)
     args = parser.parse_args()
 
-    with args.customers_csv.open("r", encoding="utf-8-sig", newline="") as f:
-        rows = list(csv.DictReader(f))
-
-    by_email: dict[str, list[dict[str, str]]] = defaultdict(list)
-    by_phone: dict[str, list[dict[str, str]]] = defaultdict(list)
-    by_name: dict[str, list[dict[str, str]]] = defaultdict(list)
-
-    for row in rows:
-        email = normalize_text(pick(row, "Email", "email"))
-        phone = normalize_phone(pick(row, "Phone", "phone"))
-        first = normalize_text(pick(row, "FirstName", "first_name"))
-        last = normalize_text(pick(row, "LastName", "last_name"))
-
-        if email:
-            by_email[email].append(row)
-        if phone:
-            by_phone[phone].append(row)
-        if first or last:
-            by_name[f"{first}|{last}"].append(row)
-
-    candidates: list[dict[str, str]] = []
-
-    def add_group(reason: str, key: str, group: list[dict[str, str]]) -> None:
-        if len(group) < 2:
-            return
-        for row in group:
-            candidates.append(
-                {
-                    "reason": reason,
-                    "match_key": key,
-                    "customer_id": pick(row, "CustomerID", "customer_id", "ID", "Id"),
-                    "first_name": pick(row, "FirstName", "first_name"),
-                    "last_name": pick(row, "LastName", "last_name"),
-                    "phone": pick(row, "Phone", "phone"),
-                    "email": pick(row, "Email", "email"),
-                }
-            )
+    if args.customers_csv is not None:
+        records = iter_csv_records(args.customers_csv)
+    else:
+        engine = create_engine(args.connection_url, future=True)
+        records = iter_db_records(sessionmaker(bind=engine, autoflush=False, autocommit=False))
 
-    for key, group in by_email.items():
-        add_group("email", key, group)
-    for key, group in by_phone.items():
-        add_group("phone", key, group)
-    for key, group in by_name.items():
-        add_group("name", key, group)
+    started = time.perf_counter()
+    dedupe = CustomerDedupeEngine(threshold=args.threshold, max_block_size=args.max_block_size)
+    dedupe.add_many(records)
+    clusters = dedupe.clusters()
 
     args.out_csv.parent.mkdir(parents=True, exist_ok=True)
     with args.out_csv.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "reason",
-                "match_key",
-                "customer_id",
-                "first_name",
-                "last_name",
-                "phone",
-                "email",
-            ],
-        )
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
-        writer.writerows(candidates)
+        for cluster in clusters:
+            for member in cluster.members:
+                record = member.record
+                writer.writerow(
+                    {
+                        "cluster_id": cluster.cluster_id,
+                        "survivor_id": cluster.survivor_id,
+                        "customer_id": record.customer_id,
+                        "score": f"{member.score:.4f}",
+                        "reason": member.reason,
+                        "first_name": record.first_name,
+                        "last_name": record.last_name,
+                        "phone": record.phone,
+                        "email": record.email,
+                    }
+                )
 
     print(f"Wrote duplicate report: {args.out_csv}")
-    print(f"Candidate rows: {len(candidates)}")
+    report = {**dedupe.stats.__dict__, "seconds": round(time.perf_counter() - started, 2)}
+    print(json.dumps(report, indent=2))
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
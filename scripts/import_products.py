@@ -0,0 +1,68 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.db.repositories.products import IMPORT_CHUNK_SIZE, ProductChange, ProductRepository
+from pecan_crm.services.product_import import read_product_csv
+
+
+def describe(change: ProductChange) -> dict[str, object]:
+    return {
+        "line": change.line_number,
+        "product_id": change.product_id,
+        "sku": change.after.sku,
+        "changes": {
+            name: {
+                "from": str(getattr(change.before, name)) if change.before is not None else None,
+                "to": str(getattr(change.after, name)),
+            }
+            for name in change.changed_fields
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk update product prices/catalog from a CSV")
+    parser.add_argument("--connection-url", required=True, help="SQLAlchemy connection URL")
+    parser.add_argument(
+        "--csv",
+        required=True,
+        type=Path,
+        help="Columns: product_id and/or sku, plus any of name, unit_type, unit_price, is_active",
+    )
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Print the diff without writing")
+    args = parser.parse_args()
+
+    engine = create_engine(args.connection_url, future=True)
+    repo = ProductRepository(sessionmaker(bind=engine, autoflush=False, autocommit=False))
+
+    plan = repo.plan_import(read_product_csv(args.csv))
+    report: dict[str, object] = {
+        "dry_run": args.dry_run,
+        "inserts": len(plan.inserts),
+        "updates": len(plan.updates),
+        "unchanged": plan.unchanged,
+        "changes": [describe(change) for change in plan.changes],
+    }
+    if not args.dry_run:
+        result = repo.apply_import(plan, chunk_size=args.chunk_size)
+        report["applied"] = result.__dict__
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.db.repositories.customers import MERGE_CHUNK_SIZE, CustomerRepository
+
+
+def load_pairs(path: Path) -> list[tuple[int, int]]:
+    """(survivor_id, duplicate_id) pairs from a pairs CSV or a customer_dedupe_report.py output."""
+    pairs: list[tuple[int, int]] = []
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        for line_number, row in enumerate(csv.DictReader(f), start=2):
+            survivor = (row.get("survivor_id") or "").strip()
+            duplicate = (row.get("duplicate_id") or row.get("customer_id") or "").strip()
+            if not survivor.isdigit() or not duplicate.isdigit():
+                raise SystemExit(
+                    f"{path}:{line_number}: ids must be database customer ids; "
+                    "run the dedupe report with --connection-url"
+                )
+            if survivor != duplicate:
+                pairs.append((int(survivor), int(duplicate)))
+    return pairs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Merge duplicate customers or roll back a merge batch"
+    )
+    parser.add_argument("--connection-url", required=True, help="SQLAlchemy connection URL")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument(
+        "--pairs-csv",
+        type=Path,
+        help=(
+            "CSV with survivor_id and duplicate_id "
+            "(or customer_id, as written by customer_dedupe_report.py)"
+        ),
+    )
+    action.add_argument("--rollback-batch", help="Batch id printed by a previous merge run")
+    parser.add_argument("--chunk-size", type=int, default=MERGE_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine(args.connection_url, future=True)
+    repo = CustomerRepository(sessionmaker(bind=engine, autoflush=False, autocommit=False))
+
+    if args.rollback_batch:
+        result = repo.rollback_merge(args.rollback_batch)
+    else:
+        result = repo.merge_customers(
+            load_pairs(args.pairs_csv), chunk_size=args.chunk_size, dry_run=args.dry_run
+        )
+
+    report = {
+        "batch_id": result.batch_id,
+        "merged": result.merged,
+        "sales_moved": result.sales_moved,
+        "dry_run": bool(args.dry_run and not args.rollback_batch),
+        "skipped": [skip.__dict__ for skip in result.skipped],
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
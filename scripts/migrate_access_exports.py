@@ -19,6 +19,8 @@ if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
 from pecan_crm.db.models import Customer, Product, Sale, SaleItem
+from pecan_crm.db.repositories.customers import apply_customer_keys
+from pecan_crm.domain.customer_keys import normalize_phone, normalize_text
 
 
 @dataclass
@@ -45,14 +47,6 @@ class MigrationReport:
         }
 
 
-def normalize_phone(value: str) -> str:
-    return "".join(ch for ch in (value or "") if ch.isdigit())
-
-
-def normalize_text(value: str) -> str:
-    return (value or "").strip().lower()
-
-
 def parse_decimal(value: str) -> Decimal:
     try:
         return Decimal((value or "0").strip() or "0")
@@ -129,6 +123,7 @@ def migrate(
                         notes=notes or None,
                         is_active=True,
                     )
+                    apply_customer_keys(entity)
                     session.add(entity)
                     session.flush()
                     report.customers.inserted += 1
@@ -0,0 +1,60 @@
+# ruff: noqa: E402
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pecan_crm.db.repositories.sales import SalesRepository
+from pecan_crm.services.receipt_storage import ReceiptStore
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="One-time move of flat receipt PDFs into YYYY/MM shards with an index"
+    )
+    parser.add_argument("--receipt-folder", required=True, type=Path)
+    parser.add_argument(
+        "--connection-url",
+        help="SQLAlchemy connection URL used to shard by sale date (file mtime is used otherwise)",
+    )
+    parser.add_argument("--report-path", required=True, type=Path)
+    args = parser.parse_args()
+
+    sold_at_by_receipt: dict[str, datetime] = {}
+    if args.connection_url:
+        engine = create_engine(args.connection_url, future=True)
+        session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        sold_at_by_receipt = {
+            ref.receipt_number: ref.sold_at_utc
+            for ref in SalesRepository(session_factory).list_receipt_refs()
+        }
+
+    report = ReceiptStore(args.receipt_folder).migrate_flat_layout(sold_at_by_receipt)
+    payload = {
+        "moved": report.moved,
+        "indexed": report.indexed,
+        "skipped": report.skipped,
+        "dated_from_sales": bool(sold_at_by_receipt),
+    }
+
+    args.report_path.parent.mkdir(parents=True, exist_ok=True)
+    args.report_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    print(json.dumps(payload, indent=2))
+    print(f"Report written: {args.report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,11 +3,12 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
-from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -15,16 +16,9 @@ SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
-from pecan_crm.db.models import Sale
 from pecan_crm.db.repositories.sales import SalesRepository
-
-
-@dataclass
-class ReconcileReport:
-    scanned: int = 0
-    missing: int = 0
-    regenerated: int = 0
-    errors: int = 0
+from pecan_crm.services.receipt_reconcile import reconcile
+from pecan_crm.services.receipt_storage import ReceiptStore
 
 
 def main() -> int:
@@ -36,45 +30,54 @@ def main() -> int:
     parser.add_argument("--business-phone", required=True)
     parser.add_argument("--report-path", required=True, type=Path)
     parser.add_argument("--no-repair", action="store_true", help="Detect only; do not regenerate")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only scan sales sold at or after this ISO timestamp (overrides --watermark-file)",
+    )
+    parser.add_argument(
+        "--watermark-file",
+        type=Path,
+        help="JSON file holding the last reconciled sale_id; advanced after a clean repair run",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Render processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Sales loaded per query batch")
+    parser.add_argument(
+        "--index-only",
+        action="store_true",
+        help="Trust the receipt index without walking the folder (fast, misses deleted files)",
+    )
     args = parser.parse_args()
 
     engine = create_engine(args.connection_url, future=True)
     session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    repo = SalesRepository(session_factory)
-
-    report = ReconcileReport()
-
-    with session_factory() as session:
-        sales = list(session.scalars(select(Sale).order_by(Sale.sale_id)).all())
-
-    for sale in sales:
-        report.scanned += 1
-        path = args.receipt_folder / f"receipt_{sale.receipt_number}.pdf"
-        if path.exists():
-            continue
-
-        report.missing += 1
-        if args.no_repair:
-            continue
 
-        try:
-            repo.regenerate_receipt(
-                sale_id=sale.sale_id,
-                receipt_folder=args.receipt_folder,
-                business_name=args.business_name,
-                business_address=args.business_address,
-                business_phone=args.business_phone,
-            )
-            report.regenerated += 1
-        except Exception:
-            report.errors += 1
+    report = reconcile(
+        SalesRepository(session_factory),
+        ReceiptStore(args.receipt_folder),
+        business_name=args.business_name,
+        business_address=args.business_address,
+        business_phone=args.business_phone,
+        repair=not args.no_repair,
+        since=args.since,
+        watermark_path=args.watermark_file,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        index_only=args.index_only,
+    )
 
     payload = {
         "scanned": report.scanned,
         "missing": report.missing,
         "regenerated": report.regenerated,
+        "vanished": report.vanished,
+        "render_failures": report.render_failures,
         "errors": report.errors,
         "repair_mode": not args.no_repair,
+        "since": args.since.isoformat() if args.since else None,
+        "after_sale_id": report.after_sale_id,
+        "watermark": report.watermark,
+        "watermark_advanced": report.watermark_advanced,
     }
 
     args.report_path.parent.mkdir(parents=True, exist_ok=True)
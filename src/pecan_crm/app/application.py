@@ -1,27 +1,100 @@
 from __future__ import annotations
 
+import argparse
 import logging
 import sys
+from pathlib import Path
 
-from PySide6.QtWidgets import QApplication
-
-from pecan_crm.config.env import load_env_file
-from pecan_crm.app.logging_utils import configure_logging
-from pecan_crm.app.main_window import MainWindow
+from pecan_crm.app.startup_profile import StartupProfile
 
 
 APP_NAME = "PecanCRM"
 
 
-def run() -> int:
-    load_env_file()
-    log_path = configure_logging(APP_NAME)
-    logging.getLogger(__name__).info("Starting app; log file: %s", log_path)
+def _parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(prog="pecan_crm", description="Pecan Company CRM")
+    parser.add_argument(
+        "--startup-profile",
+        type=Path,
+        metavar="REPORT",
+        help="Write a JSON report of time per import and per startup phase to REPORT",
+    )
+    parser.add_argument(
+        "--quit-after-startup",
+        action="store_true",
+        help="Exit once the main window has painted (for start-up timing checks)",
+    )
+    # Anything else (e.g. -platform) is left for Qt.
+    return parser.parse_known_args(argv)
+
+
+def run(argv: list[str] | None = None) -> int:
+    args, qt_args = _parse_args(sys.argv[1:] if argv is None else argv)
+    profile = StartupProfile(track_imports=args.startup_profile is not None)
+    # Page modules, SQLAlchemy and the offline sync stack are imported on first use, so
+    # the imports below are what stands between launch and the first paint.
+    profile.install()
+
+    with profile.phase("env_and_logging"):
+        from pecan_crm.app.logging_utils import configure_logging
+        from pecan_crm.config.env import load_env_file
+
+        load_env_file()
+        log_path = configure_logging(APP_NAME)
+    logger = logging.getLogger(__name__)
+    logger.info("Starting app; log file: %s", log_path)
+
+    with profile.phase("qt_application"):
+        from PySide6.QtCore import QEvent, QObject, QTimer
+        from PySide6.QtWidgets import QApplication
+
+        app = QApplication([sys.argv[0], *qt_args])
+        app.setApplicationName(APP_NAME)
+
+    with profile.phase("main_window"):
+        from pecan_crm.app.main_window import MainWindow
+        from pecan_crm.app.offline_sync import SyncStatusBridge, build_offline_sync
+
+        bridge = SyncStatusBridge()
+        window = MainWindow()
+        bridge.status_changed.connect(window.show_sync_status)
+
+    sync_services = []
+
+    def after_first_paint() -> None:
+        profile.mark("first_paint")
+        logger.info("Main window painted %.2fs after start", profile.marks["first_paint"])
+        with profile.phase("offline_sync"):
+            sync_service = build_offline_sync(bridge)
+            window.set_offline_sync(sync_service)
+            if sync_service is not None:
+                sync_service.start()
+                sync_services.append(sync_service)
+        profile.uninstall()
+        if args.startup_profile is not None:
+            profile.write(args.startup_profile)
+            logger.info("Startup profile written to %s", args.startup_profile)
+        if args.quit_after_startup:
+            app.quit()
 
-    app = QApplication(sys.argv)
-    app.setApplicationName(APP_NAME)
+    class FirstPaint(QObject):
+        def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+            if event.type() == QEvent.Type.Paint:
+                window.removeEventFilter(self)
+                # Let this paint finish before the deferred start-up work runs.
+                QTimer.singleShot(0, after_first_paint)
+            return False
 
-    window = MainWindow()
-    window.show()
+    first_paint = FirstPaint(window)
+    window.installEventFilter(first_paint)
+    with profile.phase("show_window"):
+        window.show()
 
-    return app.exec()
+    try:
+        return app.exec()
+    finally:
+        for sync_service in sync_services:
+            sync_service.stop()
+            sync_service.queue.close()
+            if sync_service.replica is not None:
+                sync_service.replica.close()
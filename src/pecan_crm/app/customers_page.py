@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+
 from PySide6.QtWidgets import (
     QCheckBox,
     QFormLayout,
@@ -8,15 +10,41 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QMessageBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
+from pecan_crm.app.table_models import (
+    RowFilterProxyModel,
+    RowTableModel,
+    TableColumn,
+    make_table_view,
+    selected_row,
+)
+from pecan_crm.app.tasks import ActionRunner, BusyIndicator, DebouncedSearch, LatestTaskRunner
 from pecan_crm.db.repositories.customers import CustomerInput, CustomerRepository
+from pecan_crm.db.repositories.sales import SalesRepository
 from pecan_crm.db.runtime import build_session_factory_from_settings
+from pecan_crm.services.purchase_history import PurchaseHistory
+
+CUSTOMER_COLUMNS = [
+    TableColumn("ID", align_right=True),
+    TableColumn("First"),
+    TableColumn("Last"),
+    TableColumn("Phone"),
+    TableColumn("Email"),
+    TableColumn("Active", lambda v: "Yes" if v else "No"),
+]
+CUSTOMER_ACTIVE = 5
+
+HISTORY_COLUMNS = [
+    TableColumn("Date/Time", lambda v: v.strftime("%Y-%m-%d %H:%M:%S")),
+    TableColumn("Receipt"),
+    TableColumn("Items"),
+    TableColumn("Total", lambda v: f"${v:.2f}", align_right=True),
+    TableColumn("Status"),
+]
 
 
 class CustomersPage(QWidget):
@@ -28,6 +56,13 @@ class CustomersPage(QWidget):
         self.search_input.setPlaceholderText("Search by name, phone, or email")
         self.include_inactive = QCheckBox("Include inactive")
         self.include_inactive.setChecked(True)
+        self.search = DebouncedSearch(
+            self.search_input,
+            self._customer_query,
+            on_result=self._show_customers,
+            on_error=lambda exc: QMessageBox.warning(self, "Customers", str(exc)),
+        )
+        self.include_inactive.toggled.connect(self._apply_active_filter)
 
         refresh_btn = QPushButton("Refresh")
         refresh_btn.clicked.connect(self._refresh)
@@ -38,10 +73,10 @@ class CustomersPage(QWidget):
         search_row.addWidget(self.include_inactive)
         search_row.addWidget(refresh_btn)
 
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels(["ID", "First", "Last", "Phone", "Email", "Active"])
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.itemSelectionChanged.connect(self._load_selected)
+        self.model = RowTableModel(CUSTOMER_COLUMNS, parent=self)
+        self.proxy = RowFilterProxyModel(self.model, parent=self)
+        self.table = make_table_view(self.proxy)
+        self.table.selectionModel().selectionChanged.connect(self._load_selected)
 
         self.first_name_input = QLineEdit()
         self.last_name_input = QLineEdit()
@@ -61,20 +96,50 @@ class CustomersPage(QWidget):
 
         new_btn = QPushButton("New")
         new_btn.clicked.connect(self._clear_form)
-        save_btn = QPushButton("Save")
-        save_btn.clicked.connect(self._save)
+        self.save_btn = QPushButton("Save")
+        self.save_btn.clicked.connect(self._save)
+        self.actions = ActionRunner(parent=self)
+        self.busy = BusyIndicator(self.actions)
 
         action_row = QHBoxLayout()
         action_row.addWidget(new_btn)
-        action_row.addWidget(save_btn)
+        action_row.addWidget(self.save_btn)
         action_row.addStretch(1)
 
+        # The view calls fetchMore() when scrolled to the end, which pulls the next page.
+        self.history_model = RowTableModel(
+            HISTORY_COLUMNS, load_more=lambda: self._load_history(load_more=True), parent=self
+        )
+        self.history_table = make_table_view(RowFilterProxyModel(self.history_model, parent=self))
+        self.history_status = QLabel("")
+        self.history_runner = LatestTaskRunner(
+            on_result=self._show_history,
+            on_error=self._history_failed,
+            parent=self,
+        )
+
+        history_column = QVBoxLayout()
+        history_column.addWidget(QLabel("Purchase History"))
+        history_column.addWidget(self.history_table)
+        history_column.addWidget(self.history_status)
+
+        edit_column = QVBoxLayout()
+        edit_column.addLayout(form)
+        edit_column.addLayout(action_row)
+        edit_column.addWidget(self.busy)
+
+        detail_row = QHBoxLayout()
+        detail_row.addLayout(edit_column, stretch=1)
+        detail_row.addLayout(history_column, stretch=1)
+
         layout = QVBoxLayout(self)
         layout.addLayout(search_row)
         layout.addWidget(self.table)
-        layout.addLayout(form)
-        layout.addLayout(action_row)
+        layout.addLayout(detail_row)
+
+        self._apply_active_filter()
 
+    def on_shown(self) -> None:
         self._refresh()
 
     def _repository(self) -> CustomerRepository | None:
@@ -85,82 +150,148 @@ class CustomersPage(QWidget):
             return None
 
     def _refresh(self) -> None:
-        repo = self._repository()
-        if repo is None:
-            return
+        self.search.run_now()
 
-        customers = repo.list_customers(
-            include_inactive=self.include_inactive.isChecked(),
-            search=self.search_input.text().strip(),
-        )
+    def _customer_query(self, search: str) -> Callable[[], list[tuple[object, ...]]]:
+        def query() -> list[tuple[object, ...]]:
+            # Inactive customers are always fetched and hidden by the proxy, so the
+            # checkbox never costs a query.
+            repo = CustomerRepository(build_session_factory_from_settings())
+            return [
+                (c.customer_id, c.first_name, c.last_name, c.phone, c.email, bool(c.is_active))
+                for c in repo.list_customers(include_inactive=True, search=search)
+            ]
+
+        return query
 
-        self.table.setRowCount(len(customers))
-        for row, c in enumerate(customers):
-            self.table.setItem(row, 0, QTableWidgetItem(str(c.customer_id)))
-            self.table.setItem(row, 1, QTableWidgetItem(c.first_name or ""))
-            self.table.setItem(row, 2, QTableWidgetItem(c.last_name or ""))
-            self.table.setItem(row, 3, QTableWidgetItem(c.phone or ""))
-            self.table.setItem(row, 4, QTableWidgetItem(c.email or ""))
-            self.table.setItem(row, 5, QTableWidgetItem("Yes" if c.is_active else "No"))
+    def _show_customers(self, rows: list[tuple[object, ...]]) -> None:
+        self.model.set_rows(rows)
+
+    def _apply_active_filter(self) -> None:
+        if self.include_inactive.isChecked():
+            self.proxy.set_row_filter(None)
+        else:
+            self.proxy.set_row_filter(lambda row: bool(row[CUSTOMER_ACTIVE]))
 
     def _load_selected(self) -> None:
-        selected = self.table.selectedItems()
-        if not selected:
+        row = selected_row(self.table)
+        if row is None:
             return
 
-        row = selected[0].row()
-        self.selected_customer_id = int(self.table.item(row, 0).text())
-        self.first_name_input.setText(self.table.item(row, 1).text())
-        self.last_name_input.setText(self.table.item(row, 2).text())
-        self.phone_input.setText(self.table.item(row, 3).text())
-        self.email_input.setText(self.table.item(row, 4).text())
-        self.active_input.setChecked(self.table.item(row, 5).text() == "Yes")
+        customer_id, first, last, phone, email, is_active = row
+        self.selected_customer_id = int(customer_id)
+        self.first_name_input.setText(first or "")
+        self.last_name_input.setText(last or "")
+        self.phone_input.setText(phone or "")
+        self.email_input.setText(email or "")
+        self.active_input.setChecked(bool(is_active))
+        self._load_history()
+
+    def _load_history(self, *, load_more: bool = False) -> None:
+        customer_id = self.selected_customer_id
+        if customer_id is None:
+            self.history_runner.cancel()
+            self.history_model.set_rows([])
+            self.history_status.setText("")
+            return
+        if not load_more:
+            self.history_model.set_rows([])
+        self.history_status.setText("Loading...")
+
+        def query() -> PurchaseHistory:
+            repo = SalesRepository(build_session_factory_from_settings())
+            return repo.customer_purchase_history(customer_id, load_more=load_more)
+
+        self.history_runner.submit(query)
+
+    def _show_history(self, history: PurchaseHistory) -> None:
+        # The cache returns every entry loaded so far; append only the new tail.
+        rows = [
+            (
+                entry.sold_at_utc,
+                entry.receipt_number,
+                entry.items_summary,
+                entry.total,
+                entry.status,
+            )
+            for entry in history.entries[self.history_model.loaded_count() :]
+        ]
+        self.history_model.append_rows(rows, has_more=history.has_more)
+        if not history.entries:
+            self.history_status.setText("No purchases yet.")
+        else:
+            more = " (scroll for more)" if history.has_more else ""
+            self.history_status.setText(f"{len(history.entries)} sale(s){more}")
+
+    def _history_failed(self, error: Exception) -> None:
+        self.history_model.page_failed()
+        self.history_status.setText(f"History unavailable: {error}")
 
     def _save(self) -> None:
         repo = self._repository()
         if repo is None:
             return
 
-        first = self.first_name_input.text().strip()
-        last = self.last_name_input.text().strip()
-        phone = self.phone_input.text().strip()
-        email = self.email_input.text().strip()
-
-        duplicates = repo.find_likely_duplicates(
-            phone=phone,
-            email=email,
-            first_name=first,
-            last_name=last,
-            exclude_customer_id=self.selected_customer_id,
-        )
-        if duplicates:
-            answer = QMessageBox.warning(
-                self,
-                "Possible duplicate",
-                f"Found {len(duplicates)} likely duplicate customer(s). Save anyway?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            )
-            if answer != QMessageBox.StandardButton.Yes:
-                return
-
+        customer_id = self.selected_customer_id
         payload = CustomerInput(
-            first_name=first,
-            last_name=last,
-            phone=phone,
-            email=email,
+            first_name=self.first_name_input.text().strip(),
+            last_name=self.last_name_input.text().strip(),
+            phone=self.phone_input.text().strip(),
+            email=self.email_input.text().strip(),
             notes=self.notes_input.toPlainText().strip(),
             is_active=self.active_input.isChecked(),
         )
 
-        try:
-            repo.save(payload, customer_id=self.selected_customer_id)
+        def check_duplicates() -> int:
+            return len(
+                repo.find_likely_duplicates(
+                    phone=payload.phone,
+                    email=payload.email,
+                    first_name=payload.first_name,
+                    last_name=payload.last_name,
+                    exclude_customer_id=customer_id,
+                )
+            )
+
+        def checked(duplicates: int) -> None:
+            if duplicates:
+                answer = QMessageBox.warning(
+                    self,
+                    "Possible duplicate",
+                    f"Found {duplicates} likely duplicate customer(s). Save anyway?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                )
+                if answer != QMessageBox.StandardButton.Yes:
+                    return
+            self.actions.run(
+                "save",
+                lambda: repo.save(payload, customer_id=customer_id),
+                on_result=saved,
+                on_error=failed,
+                label="Saving customer...",
+                controls=(self.save_btn,),
+                cancellable=False,
+            )
+
+        def saved(_: object) -> None:
             QMessageBox.information(self, "Customers", "Saved.")
             self._refresh()
-        except Exception as exc:
+
+        def failed(exc: Exception) -> None:
             QMessageBox.critical(self, "Customers", f"Save failed: {exc}")
 
+        self.actions.run(
+            "save",
+            check_duplicates,
+            on_result=checked,
+            on_error=failed,
+            label="Checking for duplicates...",
+            controls=(self.save_btn,),
+        )
+
     def _clear_form(self) -> None:
         self.selected_customer_id = None
+        self._load_history()
         self.first_name_input.clear()
         self.last_name_input.clear()
         self.phone_input.clear()
@@ -1,31 +1,53 @@
 from __future__ import annotations
 
+import importlib
 import logging
+from collections.abc import Callable
+from functools import partial
+from typing import TYPE_CHECKING
 
 from PySide6.QtWidgets import (
     QHBoxLayout,
+    QLabel,
     QListWidget,
     QListWidgetItem,
     QMainWindow,
+    QMessageBox,
     QStackedWidget,
     QWidget,
 )
 
+from pecan_crm.app.offline_sync import format_sync_status
 from pecan_crm.app.pages import PAGES, PlaceholderPage
-from pecan_crm.app.products_page import ProductsPage
-from pecan_crm.app.settings_page import SettingsPage
-from pecan_crm.app.customers_page import CustomersPage
-from pecan_crm.app.ring_up_page import RingUpPage
-from pecan_crm.app.sales_history_page import SalesHistoryPage
+from pecan_crm.app.settings_bridge import settings_bridge
 from pecan_crm import __version__
 
+if TYPE_CHECKING:
+    from pecan_crm.config.models import AppConfig
+    from pecan_crm.offline.sync import OfflineSyncService, SyncStatus
+
 
 LOGGER = logging.getLogger(__name__)
 
+# "module:Class" per page key. A page's module (and the repositories and libraries it
+# pulls in) is imported when the page is first opened, not at startup.
+PAGE_CLASSES: dict[str, str] = {
+    "settings": "pecan_crm.app.settings_page:SettingsPage",
+    "products": "pecan_crm.app.products_page:ProductsPage",
+    "customers": "pecan_crm.app.customers_page:CustomersPage",
+    "ring_up": "pecan_crm.app.ring_up_page:RingUpPage",
+    "sales_history": "pecan_crm.app.sales_history_page:SalesHistoryPage",
+}
+
+# Pages built with the offline sync service: Ring-Up queues sales through it and Sales
+# History looks up synced provisional receipt numbers.
+OFFLINE_SYNC_PAGES = ("ring_up", "sales_history")
+
 
 class MainWindow(QMainWindow):
-    def __init__(self) -> None:
+    def __init__(self, *, offline_sync: OfflineSyncService | None = None) -> None:
         super().__init__()
+        self.offline_sync = offline_sync
         self.setWindowTitle(f"Pecan Company CRM v{__version__}")
         self.resize(1200, 750)
 
@@ -37,38 +59,96 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
 
         self._page_keys: list[str] = []
+        self._page_factories: list[Callable[[], QWidget]] = []
+        self._loaded_pages: dict[str, QWidget] = {}
         self._build_pages()
 
-        self.nav.currentRowChanged.connect(self.stack.setCurrentIndex)
+        self.nav.currentRowChanged.connect(self._show_page)
         self.nav.currentRowChanged.connect(self._log_page_change)
+        bridge = settings_bridge()
+        self._database = bridge.service.config().database
+        bridge.changed.connect(self._settings_changed)
 
         layout.addWidget(self.nav)
         layout.addWidget(self.stack, stretch=1)
 
         self.setCentralWidget(root)
         self.statusBar().showMessage(f"Ready | Version {__version__}")
+        self.sync_status_label = QLabel()
+        self.statusBar().addPermanentWidget(self.sync_status_label)
 
         if self.nav.count() > 0:
             self.nav.setCurrentRow(0)
 
     def _build_pages(self) -> None:
-        self._add_page("settings", "Settings", SettingsPage())
-        self._add_page("products", "Products", ProductsPage())
-        self._add_page("customers", "Customers", CustomersPage())
-        self._add_page("ring_up", "Ring-Up", RingUpPage())
-        self._add_page("sales_history", "Sales History", SalesHistoryPage())
-
         for page in PAGES:
-            if page.key in {"settings", "products", "customers", "ring_up", "sales_history"}:
-                continue
-            widget = PlaceholderPage(page.title, page.placeholder_text)
-            self._add_page(page.key, page.title, widget)
-
-    def _add_page(self, key: str, title: str, widget: QWidget) -> None:
+            if page.key in PAGE_CLASSES:
+                factory: Callable[[], QWidget] = partial(self._create_page, page.key)
+            else:
+                factory = partial(PlaceholderPage, page.title, page.placeholder_text)
+            self._add_page(page.key, page.title, factory)
+
+    def _create_page(self, key: str) -> QWidget:
+        module_name, _, class_name = PAGE_CLASSES[key].partition(":")
+        page_class = getattr(importlib.import_module(module_name), class_name)
+        if key in OFFLINE_SYNC_PAGES:
+            return page_class(offline_sync=self.offline_sync)
+        return page_class()
+
+    def _add_page(self, key: str, title: str, factory: Callable[[], QWidget]) -> None:
+        # Pages are built on first navigation; until then the stack holds a stand-in.
         self._page_keys.append(key)
+        self._page_factories.append(factory)
         self.nav.addItem(QListWidgetItem(title))
-        self.stack.addWidget(widget)
+        self.stack.addWidget(PlaceholderPage(title, "Loading..."))
+
+    def page(self, key: str) -> QWidget | None:
+        """The page widget for key, or None if it hasn't been opened yet."""
+        return self._loaded_pages.get(key)
+
+    def _show_page(self, index: int) -> None:
+        if not 0 <= index < len(self._page_keys):
+            return
+        key = self._page_keys[index]
+        widget = self._loaded_pages.get(key)
+        if widget is None:
+            try:
+                widget = self._page_factories[index]()
+            except Exception as exc:
+                LOGGER.exception("Failed to open page: %s", key)
+                QMessageBox.critical(self, "Pecan CRM", f"Failed to open {key}: {exc}")
+                self.stack.setCurrentIndex(index)
+                return
+            stand_in = self.stack.widget(index)
+            self.stack.removeWidget(stand_in)
+            stand_in.deleteLater()
+            self.stack.insertWidget(index, widget)
+            self._loaded_pages[key] = widget
+        self.stack.setCurrentIndex(index)
+        # Pages with an on_shown() hook reload their data each time they're shown.
+        on_shown = getattr(widget, "on_shown", None)
+        if on_shown is not None:
+            on_shown()
 
     def _log_page_change(self, index: int) -> None:
         if 0 <= index < len(self._page_keys):
             LOGGER.info("Navigated to page: %s", self._page_keys[index])
+
+    def _settings_changed(self, config: AppConfig) -> None:
+        if config.database == self._database:
+            return
+        self._database = config.database
+        # Other pages reload when next shown; the one on screen reloads now.
+        on_shown = getattr(self.stack.currentWidget(), "on_shown", None)
+        if on_shown is not None:
+            on_shown()
+
+    def set_offline_sync(self, offline_sync: OfflineSyncService | None) -> None:
+        # Attached once the window has painted; pages pick it up when first opened.
+        for key in OFFLINE_SYNC_PAGES:
+            if self.page(key) is not None:
+                LOGGER.warning("Offline sync attached after %s was opened; it runs without it", key)
+        self.offline_sync = offline_sync
+
+    def show_sync_status(self, status: SyncStatus) -> None:
+        self.sync_status_label.setText(format_sync_status(status))
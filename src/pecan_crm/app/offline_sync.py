@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QObject, Signal
+
+from pecan_crm.config.settings_service import SettingsService, settings_service
+
+if TYPE_CHECKING:
+    from pecan_crm.offline.queue import BatchSender
+    from pecan_crm.offline.replica import LocalReplica
+    from pecan_crm.offline.sync import OfflineSyncService, SyncStatus
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SyncStatusBridge(QObject):
+    """Carries SyncStatus from the sync thread to the GUI thread via a queued signal."""
+
+    status_changed = Signal(object)
+
+    def publish(self, status: SyncStatus) -> None:
+        self.status_changed.emit(status)
+
+
+def format_sync_status(status: SyncStatus) -> str:
+    state = "Online" if status.online else "Offline"
+    last = (
+        status.last_sync_at_utc.astimezone().strftime("%H:%M:%S")
+        if status.last_sync_at_utc
+        else "never"
+    )
+    text = f"{state} | Queued sales: {status.depth} | Last sync: {last}"
+    oldest_age = status.oldest_pending_age_seconds
+    if status.queue_full:
+        text += " | QUEUE FULL - offline sales blocked"
+    elif oldest_age is not None and oldest_age >= 3600:
+        text += f" | Oldest unsynced: {oldest_age / 3600:.0f}h"
+    if status.last_error:
+        text += " | Sync error"
+    return text
+
+
+def build_offline_sync(
+    bridge: SyncStatusBridge,
+    settings: SettingsService | None = None,
+) -> OfflineSyncService | None:
+    service = settings or settings_service()
+    config = service.config()
+    if not config.offline_queue.enabled:
+        return None
+
+    # Imported here so the app can paint its window before SQLAlchemy and the
+    # repositories load; run() builds the sync service after first paint.
+    from pecan_crm.db.repositories.sales import SalesRepository
+    from pecan_crm.db.runtime import build_session_factory_from_settings
+    from pecan_crm.offline.queue import OfflineSaleQueue
+    from pecan_crm.offline.replica import LocalReplica
+    from pecan_crm.offline.sync import OfflineSyncService, sales_batch_sender, tcp_probe
+
+    def probe() -> bool:
+        # Read the snapshot each round so a server change in Settings takes effect.
+        return tcp_probe(service.config().database.server)
+
+    def sender_factory() -> BatchSender:
+        return sales_batch_sender(SalesRepository(build_session_factory_from_settings(service)))
+
+    try:
+        queue = OfflineSaleQueue(
+            Path(config.offline_queue.db_path),
+            max_pending=config.offline_queue.max_pending,
+        )
+    except Exception:
+        LOGGER.exception("Offline queue unavailable; background sync disabled")
+        return None
+
+    try:
+        replica: LocalReplica | None = LocalReplica(Path(config.offline_queue.replica_db_path))
+    except Exception:
+        LOGGER.exception("Local replica unavailable; lookups will query the database")
+        replica = None
+
+    return OfflineSyncService(
+        queue,
+        probe=probe,
+        sender_factory=sender_factory,
+        interval_seconds=config.offline_queue.sync_interval_seconds,
+        on_status=bridge.publish,
+        replica=replica,
+        replica_session_factory=lambda: build_session_factory_from_settings(service),
+        retention_days=config.offline_queue.retention_days,
+    )
@@ -1,25 +1,51 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from decimal import Decimal
+from pathlib import Path
 
 from PySide6.QtWidgets import (
     QCheckBox,
     QComboBox,
     QDoubleSpinBox,
+    QFileDialog,
     QFormLayout,
     QHBoxLayout,
     QLabel,
     QLineEdit,
     QMessageBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
 
-from pecan_crm.db.repositories.products import ProductInput, ProductRepository
+from pecan_crm.app.table_models import (
+    RowFilterProxyModel,
+    RowTableModel,
+    TableColumn,
+    make_table_view,
+    selected_row,
+)
+from pecan_crm.app.tasks import ActionRunner, BusyIndicator, DebouncedSearch
+from pecan_crm.db.repositories.products import (
+    ProductChange,
+    ProductImportPlan,
+    ProductImportResult,
+    ProductInput,
+    ProductRepository,
+)
 from pecan_crm.db.runtime import build_session_factory_from_settings
+from pecan_crm.services.product_import import read_product_csv
+
+PRODUCT_COLUMNS = [
+    TableColumn("ID", align_right=True),
+    TableColumn("Name"),
+    TableColumn("SKU"),
+    TableColumn("Unit Type"),
+    TableColumn("Price", lambda v: f"{v:.2f}", align_right=True),
+    TableColumn("Active", lambda v: "Yes" if v else "No"),
+]
+PRODUCT_ACTIVE = 5
 
 
 class ProductsPage(QWidget):
@@ -31,6 +57,13 @@ class ProductsPage(QWidget):
         self.search_input.setPlaceholderText("Search by name or SKU")
         self.include_inactive = QCheckBox("Include inactive")
         self.include_inactive.setChecked(True)
+        self.search = DebouncedSearch(
+            self.search_input,
+            self._product_query,
+            on_result=self._show_products,
+            on_error=lambda exc: QMessageBox.warning(self, "Products", str(exc)),
+        )
+        self.include_inactive.toggled.connect(self._apply_active_filter)
 
         refresh_btn = QPushButton("Refresh")
         refresh_btn.clicked.connect(self._refresh)
@@ -41,10 +74,10 @@ class ProductsPage(QWidget):
         search_row.addWidget(self.include_inactive)
         search_row.addWidget(refresh_btn)
 
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels(["ID", "Name", "SKU", "Unit Type", "Price", "Active"])
-        self.table.itemSelectionChanged.connect(self._load_selected)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.model = RowTableModel(PRODUCT_COLUMNS, parent=self)
+        self.proxy = RowFilterProxyModel(self.model, parent=self)
+        self.table = make_table_view(self.proxy)
+        self.table.selectionModel().selectionChanged.connect(self._load_selected)
 
         self.name_input = QLineEdit()
         self.sku_input = QLineEdit()
@@ -70,19 +103,29 @@ class ProductsPage(QWidget):
         save_btn.clicked.connect(self._save)
         archive_btn = QPushButton("Archive")
         archive_btn.clicked.connect(self._archive)
+        self.edit_controls = (save_btn, archive_btn)
+        self.import_btn = QPushButton("Import Prices CSV...")
+        self.import_btn.clicked.connect(self._import_csv)
+        self.actions = ActionRunner(parent=self)
+        self.busy = BusyIndicator(self.actions)
 
         action_row = QHBoxLayout()
         action_row.addWidget(new_btn)
         action_row.addWidget(save_btn)
         action_row.addWidget(archive_btn)
         action_row.addStretch(1)
+        action_row.addWidget(self.import_btn)
 
         layout = QVBoxLayout(self)
         layout.addLayout(search_row)
         layout.addWidget(self.table)
         layout.addLayout(form)
         layout.addLayout(action_row)
+        layout.addWidget(self.busy)
+
+        self._apply_active_filter()
 
+    def on_shown(self) -> None:
         self._refresh()
 
     def _repository(self) -> ProductRepository | None:
@@ -93,36 +136,47 @@ class ProductsPage(QWidget):
             return None
 
     def _refresh(self) -> None:
-        repo = self._repository()
-        if repo is None:
-            return
+        self.search.run_now()
 
-        products = repo.list_products(
-            include_inactive=self.include_inactive.isChecked(),
-            search=self.search_input.text().strip(),
-        )
+    def _product_query(self, search: str) -> Callable[[], list[tuple[object, ...]]]:
+        def query() -> list[tuple[object, ...]]:
+            # Archived products are always fetched and hidden by the proxy.
+            repo = ProductRepository(build_session_factory_from_settings())
+            return [
+                (
+                    p.product_id,
+                    p.name,
+                    p.sku,
+                    p.unit_type,
+                    Decimal(str(p.unit_price)),
+                    bool(p.is_active),
+                )
+                for p in repo.list_products(include_inactive=True, search=search)
+            ]
+
+        return query
 
-        self.table.setRowCount(len(products))
-        for row, p in enumerate(products):
-            self.table.setItem(row, 0, QTableWidgetItem(str(p.product_id)))
-            self.table.setItem(row, 1, QTableWidgetItem(p.name))
-            self.table.setItem(row, 2, QTableWidgetItem(p.sku or ""))
-            self.table.setItem(row, 3, QTableWidgetItem(p.unit_type))
-            self.table.setItem(row, 4, QTableWidgetItem(str(p.unit_price)))
-            self.table.setItem(row, 5, QTableWidgetItem("Yes" if p.is_active else "No"))
+    def _show_products(self, rows: list[tuple[object, ...]]) -> None:
+        self.model.set_rows(rows)
+
+    def _apply_active_filter(self) -> None:
+        if self.include_inactive.isChecked():
+            self.proxy.set_row_filter(None)
+        else:
+            self.proxy.set_row_filter(lambda row: bool(row[PRODUCT_ACTIVE]))
 
     def _load_selected(self) -> None:
-        selected = self.table.selectedItems()
-        if not selected:
+        row = selected_row(self.table)
+        if row is None:
             return
 
-        row = selected[0].row()
-        self.selected_product_id = int(self.table.item(row, 0).text())
-        self.name_input.setText(self.table.item(row, 1).text())
-        self.sku_input.setText(self.table.item(row, 2).text())
-        self.unit_type_input.setCurrentText(self.table.item(row, 3).text())
-        self.price_input.setValue(float(self.table.item(row, 4).text()))
-        self.active_input.setChecked(self.table.item(row, 5).text() == "Yes")
+        product_id, name, sku, unit_type, unit_price, is_active = row
+        self.selected_product_id = int(product_id)
+        self.name_input.setText(name)
+        self.sku_input.setText(sku or "")
+        self.unit_type_input.setCurrentText(unit_type)
+        self.price_input.setValue(float(unit_price))
+        self.active_input.setChecked(bool(is_active))
 
     def _save(self) -> None:
         repo = self._repository()
@@ -137,12 +191,16 @@ class ProductsPage(QWidget):
             is_active=self.active_input.isChecked(),
         )
 
-        try:
-            repo.save(payload, product_id=self.selected_product_id)
-            QMessageBox.information(self, "Products", "Saved.")
-            self._refresh()
-        except Exception as exc:
-            QMessageBox.critical(self, "Products", f"Save failed: {exc}")
+        product_id = self.selected_product_id
+        self.actions.run(
+            "edit",
+            lambda: repo.save(payload, product_id=product_id),
+            on_result=lambda _: self._edited("Saved."),
+            on_error=lambda exc: QMessageBox.critical(self, "Products", f"Save failed: {exc}"),
+            label="Saving product...",
+            controls=self.edit_controls,
+            cancellable=False,
+        )
 
     def _archive(self) -> None:
         if self.selected_product_id is None:
@@ -153,12 +211,74 @@ class ProductsPage(QWidget):
         if repo is None:
             return
 
-        try:
-            repo.archive(self.selected_product_id)
-            QMessageBox.information(self, "Products", "Archived.")
-            self._refresh()
-        except Exception as exc:
-            QMessageBox.critical(self, "Products", f"Archive failed: {exc}")
+        product_id = self.selected_product_id
+        self.actions.run(
+            "edit",
+            lambda: repo.archive(product_id),
+            on_result=lambda _: self._edited("Archived."),
+            on_error=lambda exc: QMessageBox.critical(self, "Products", f"Archive failed: {exc}"),
+            label="Archiving product...",
+            controls=self.edit_controls,
+            cancellable=False,
+        )
+
+    def _edited(self, message: str) -> None:
+        QMessageBox.information(self, "Products", message)
+        self._refresh()
+
+    def _import_csv(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import product prices", "", "CSV files (*.csv)"
+        )
+        if not path:
+            return
+        repo = self._repository()
+        if repo is None:
+            return
+
+        self.actions.run(
+            "import",
+            lambda: repo.plan_import(read_product_csv(Path(path))),
+            on_result=lambda plan: self._confirm_import(repo, plan),
+            on_error=lambda exc: QMessageBox.critical(self, "Products", f"Import failed:\n{exc}"),
+            label="Reading price file...",
+            controls=(self.import_btn,),
+        )
+
+    def _confirm_import(self, repo: ProductRepository, plan: ProductImportPlan) -> None:
+        if not plan.changes:
+            QMessageBox.information(
+                self, "Products", f"No changes ({plan.unchanged} products unchanged)."
+            )
+            return
+
+        preview = QMessageBox(self)
+        preview.setIcon(QMessageBox.Icon.Question)
+        preview.setWindowTitle("Import product prices")
+        preview.setText(
+            f"{len(plan.updates)} product(s) will be updated and {len(plan.inserts)} added; "
+            f"{plan.unchanged} unchanged. Apply?"
+        )
+        preview.setDetailedText("\n".join(_describe_change(change) for change in plan.changes))
+        preview.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if preview.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        self.actions.run(
+            "import",
+            lambda: repo.apply_import(plan),
+            on_result=self._imported,
+            on_error=lambda exc: QMessageBox.critical(self, "Products", f"Import failed: {exc}"),
+            label="Importing prices...",
+            controls=(self.import_btn,),
+            cancellable=False,
+        )
+
+    def _imported(self, result: ProductImportResult) -> None:
+        QMessageBox.information(
+            self, "Products", f"Imported: {result.updated} updated, {result.inserted} added."
+        )
+        self._refresh()
 
     def _clear_form(self) -> None:
         self.selected_product_id = None
@@ -166,4 +286,15 @@ class ProductsPage(QWidget):
         self.sku_input.clear()
         self.unit_type_input.setCurrentIndex(0)
         self.price_input.setValue(0.0)
-        self.active_input.setChecked(True)
\ No newline at end of file
+        self.active_input.setChecked(True)
+
+
+def _describe_change(change: ProductChange) -> str:
+    label = f"line {change.line_number}: {change.after.name}"
+    if change.before is None:
+        return f"{label} (new) {change.after.unit_type} ${change.after.unit_price}"
+    parts = [
+        f"{name} {getattr(change.before, name)} -> {getattr(change.after, name)}"
+        for name in change.changed_fields
+    ]
+    return f"{label}: " + ", ".join(parts)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from decimal import Decimal
 from pathlib import Path
 from uuid import uuid4
 
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QComboBox,
     QDoubleSpinBox,
@@ -19,16 +21,29 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
+from sqlalchemy.exc import InterfaceError, OperationalError
 
-from pecan_crm.config.store import ConfigStore
+from pecan_crm.app.tasks import ActionRunner, BusyIndicator, DebouncedSearch
+from pecan_crm.config.models import AppConfig
+from pecan_crm.app.settings_bridge import settings_bridge
+from pecan_crm.config.settings_service import settings_service
 from pecan_crm.db.repositories.sales import (
     CartLineInput,
     FinalizePartialFailure,
     FinalizeSaleInput,
+    FinalizeSaleResult,
+    PriceMismatchError,
     SalesRepository,
 )
+from pecan_crm.db.models import Customer
 from pecan_crm.db.runtime import build_session_factory_from_settings
 from pecan_crm.domain.pricing import SaleLine, calculate_totals, line_subtotal
+from pecan_crm.domain.scan_codes import ScanCodeError, parse_scan
+from pecan_crm.offline.checkout import LocalCartLine, finalize_locally
+from pecan_crm.offline.queue import QueueFullError
+from pecan_crm.offline.replica import ReplicaCustomer
+from pecan_crm.offline.sync import OfflineSyncService
+from pecan_crm.services.product_catalog import CatalogProduct, ProductCatalog
 
 
 @dataclass
@@ -42,17 +57,35 @@ class CartRow:
 
 
 class RingUpPage(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, *, offline_sync: OfflineSyncService | None = None) -> None:
         super().__init__()
-        self.config_store = ConfigStore()
+        self.offline_sync = offline_sync
+        self.replica = offline_sync.replica if offline_sync is not None else None
+        self.settings = settings_service()
+        self.catalog = ProductCatalog()
+        self._force_catalog_refresh = True
         self.cart: list[CartRow] = []
         self.pending_finalize_key: str | None = None
 
         self.product_search_input = QLineEdit()
         self.product_search_input.setPlaceholderText("Search products")
+        self.product_search = DebouncedSearch(
+            self.product_search_input,
+            self._product_query,
+            on_result=self._show_products,
+            on_error=lambda exc: QMessageBox.warning(self, "Ring-Up", str(exc)),
+        )
         refresh_products_btn = QPushButton("Refresh Products")
         refresh_products_btn.clicked.connect(self._refresh_products)
 
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan barcode or type qty*SKU, then Enter")
+        self.scan_input.returnPressed.connect(self._scan_to_cart)
+
+        scan_row = QHBoxLayout()
+        scan_row.addWidget(QLabel("Scan:"))
+        scan_row.addWidget(self.scan_input, stretch=1)
+
         product_search_row = QHBoxLayout()
         product_search_row.addWidget(QLabel("Products:"))
         product_search_row.addWidget(self.product_search_input, stretch=1)
@@ -91,6 +124,12 @@ class RingUpPage(QWidget):
 
         self.customer_search_input = QLineEdit()
         self.customer_search_input.setPlaceholderText("Search customer (optional)")
+        self.customer_search = DebouncedSearch(
+            self.customer_search_input,
+            self._customer_query,
+            on_result=self._show_customers,
+            on_error=lambda exc: QMessageBox.warning(self, "Ring-Up", str(exc)),
+        )
         customer_refresh_btn = QPushButton("Find")
         customer_refresh_btn.clicked.connect(self._refresh_customers)
 
@@ -130,8 +169,22 @@ class RingUpPage(QWidget):
 
         finalize_btn = QPushButton("Finalize Sale")
         finalize_btn.clicked.connect(self._finalize_sale)
+        self.actions = ActionRunner(parent=self)
+        self.busy = BusyIndicator(self.actions)
+        # Locked while a finalize is in flight so the cart it was built from can't change.
+        self.sale_controls = (
+            finalize_btn,
+            self.scan_input,
+            add_to_cart_btn,
+            remove_line_btn,
+            self.customer_combo,
+            self.payment_method_combo,
+            self.discount_type_combo,
+            self.discount_value_input,
+        )
 
         layout = QVBoxLayout(self)
+        layout.addLayout(scan_row)
         layout.addLayout(product_search_row)
         layout.addWidget(self.product_table)
         layout.addLayout(add_row)
@@ -141,13 +194,29 @@ class RingUpPage(QWidget):
         layout.addLayout(form)
         layout.addLayout(totals_form)
         layout.addWidget(finalize_btn)
+        layout.addWidget(self.busy)
         layout.addStretch(1)
 
         self.discount_type_combo.currentIndexChanged.connect(self._recalculate_totals)
         self.discount_value_input.valueChanged.connect(self._recalculate_totals)
-
-        self._refresh_products()
-        self._refresh_customers()
+        self._database = self.settings.config().database
+        settings_bridge().changed.connect(self._settings_changed)
+
+    def on_shown(self) -> None:
+        # Unforced, the catalog only re-reads products if their version moved. Customers
+        # are left alone once one is picked for the sale in progress.
+        self.product_search.run_now()
+        if self.customer_combo.currentData() is None:
+            self._refresh_customers()
+
+    def _settings_changed(self, config: AppConfig) -> None:
+        if config.database != self._database:
+            # A different database: its catalog versions mean nothing against this one.
+            self._database = config.database
+            self.catalog = ProductCatalog()
+            self._refresh_products()
+            self._refresh_customers()
+        self._recalculate_totals()
 
     def _repository(self) -> SalesRepository | None:
         try:
@@ -157,25 +226,51 @@ class RingUpPage(QWidget):
             return None
 
     def _refresh_products(self) -> None:
-        repo = self._repository()
-        if repo is None:
-            return
-        products = repo.list_active_products(search=self.product_search_input.text().strip())
-
+        self._force_catalog_refresh = True
+        self.product_search.run_now()
+
+    def _product_query(self, search: str) -> Callable[[], Sequence[CatalogProduct]]:
+        replica = self.replica
+        catalog = self.catalog
+        force = self._force_catalog_refresh
+        self._force_catalog_refresh = False
+
+        def query() -> Sequence[CatalogProduct]:
+            # Keystrokes filter the in-memory catalog; the database is only asked whether
+            # the catalog version moved (throttled unless Refresh was pressed).
+            if replica is not None and replica.is_populated():
+                catalog.refresh_from_replica(replica, force=force)
+            else:
+                catalog.refresh(build_session_factory_from_settings(), force=force)
+            return catalog.search(search)
+
+        return query
+
+    def _show_products(self, products: Sequence[CatalogProduct]) -> None:
         self.product_table.setRowCount(len(products))
         for row, p in enumerate(products):
-            self.product_table.setItem(row, 0, QTableWidgetItem(str(p.product_id)))
+            id_item = QTableWidgetItem(str(p.product_id))
+            id_item.setData(Qt.ItemDataRole.UserRole, p.product_id)
+            self.product_table.setItem(row, 0, id_item)
             self.product_table.setItem(row, 1, QTableWidgetItem(p.name))
             self.product_table.setItem(row, 2, QTableWidgetItem(p.sku or ""))
             self.product_table.setItem(row, 3, QTableWidgetItem(p.unit_type))
             self.product_table.setItem(row, 4, QTableWidgetItem(str(p.unit_price)))
 
     def _refresh_customers(self) -> None:
-        repo = self._repository()
-        if repo is None:
-            return
+        self.customer_search.run_now()
+
+    def _customer_query(self, search: str) -> Callable[[], Sequence[Customer | ReplicaCustomer]]:
+        replica = self.replica
 
-        customers = repo.search_customers(self.customer_search_input.text().strip())
+        def query() -> Sequence[Customer | ReplicaCustomer]:
+            if replica is not None and replica.is_populated():
+                return replica.search_customers(search)
+            return SalesRepository(build_session_factory_from_settings()).search_customers(search)
+
+        return query
+
+    def _show_customers(self, customers: Sequence[Customer | ReplicaCustomer]) -> None:
         self.customer_combo.clear()
         self.customer_combo.addItem("No customer", None)
         for c in customers:
@@ -189,28 +284,70 @@ class RingUpPage(QWidget):
             QMessageBox.warning(self, "Ring-Up", "Select a product first.")
             return
 
-        row = selected[0].row()
-        product_id = int(self.product_table.item(row, 0).text())
-        product_name = self.product_table.item(row, 1).text()
-        unit_type = self.product_table.item(row, 3).text()
-        unit_price = Decimal(self.product_table.item(row, 4).text())
+        product_id = self.product_table.item(selected[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+        product = self.catalog.get(product_id)
+        if product is None:
+            QMessageBox.warning(
+                self, "Ring-Up", "That product is no longer available. Refresh products."
+            )
+            self._refresh_products()
+            return
+        quantity = (
+            Decimal(str(self.quantity_input.value())) if product.unit_type == "EACH" else None
+        )
+        weight = Decimal(str(self.weight_input.value())) if product.unit_type == "WEIGHT" else None
+        self._append_to_cart(product, quantity=quantity, weight=weight)
+
+    def _scan_to_cart(self) -> None:
+        # Resolved entirely from the in-memory catalog so a scan never waits on the network.
+        text = self.scan_input.text()
+        self.scan_input.clear()
+        if not text.strip():
+            return
+        try:
+            code = parse_scan(text)
+        except ScanCodeError as exc:
+            QMessageBox.warning(self, "Ring-Up", str(exc))
+            return
 
-        quantity = Decimal(str(self.quantity_input.value())) if unit_type == "EACH" else None
-        weight = Decimal(str(self.weight_input.value())) if unit_type == "WEIGHT" else None
+        weight = None
+        product = self.catalog.by_sku(code.sku)
+        if product is None and code.embedded_sku is not None:
+            product = self.catalog.by_sku(code.embedded_sku)
+            weight = code.weight_lbs
+        if product is None:
+            QMessageBox.warning(self, "Ring-Up", f"No active product with code {code.sku}.")
+            return
 
-        if unit_type == "EACH" and quantity <= 0:
+        if product.unit_type == "EACH":
+            if weight is not None:
+                QMessageBox.warning(self, "Ring-Up", f"{product.name} is sold each, not by weight.")
+                return
+            self._append_to_cart(product, quantity=code.quantity or Decimal("1"), weight=None)
+        else:
+            if code.quantity is not None:
+                QMessageBox.warning(self, "Ring-Up", f"{product.name} is sold by weight.")
+                return
+            if weight is None:
+                weight = Decimal(str(self.weight_input.value()))
+            self._append_to_cart(product, quantity=None, weight=weight)
+
+    def _append_to_cart(
+        self, product: CatalogProduct, *, quantity: Decimal | None, weight: Decimal | None
+    ) -> None:
+        if product.unit_type == "EACH" and quantity <= 0:
             QMessageBox.warning(self, "Ring-Up", "Quantity must be greater than zero.")
             return
-        if unit_type == "WEIGHT" and weight <= 0:
+        if product.unit_type == "WEIGHT" and weight <= 0:
             QMessageBox.warning(self, "Ring-Up", "Weight must be greater than zero.")
             return
 
         self.cart.append(
             CartRow(
-                product_id=product_id,
-                product_name=product_name,
-                unit_type=unit_type,
-                unit_price=unit_price,
+                product_id=product.product_id,
+                product_name=product.name,
+                unit_type=product.unit_type,
+                unit_price=product.unit_price,
                 quantity=quantity,
                 weight_lbs=weight,
             )
@@ -247,7 +384,7 @@ class RingUpPage(QWidget):
         self._recalculate_totals()
 
     def _recalculate_totals(self) -> None:
-        config = self.config_store.load()
+        config = self.settings.config()
         lines = [
             SaleLine(
                 unit_type=item.unit_type,
@@ -283,14 +420,79 @@ class RingUpPage(QWidget):
             QMessageBox.warning(self, "Ring-Up", "Cart is empty.")
             return
 
+        config = self.settings.config()
+        payload = self._build_finalize_input(config)
+
+        if config.offline_queue.offline_first and self.offline_sync is not None:
+            self._finalize_offline(payload)
+            return
+
         repo = self._repository()
         if repo is None:
             return
 
-        config = self.config_store.load()
-        customer_id = self.customer_combo.currentData()
+        self.actions.run(
+            "finalize",
+            lambda: repo.finalize_sale(payload),
+            on_result=self._sale_finalized,
+            on_error=lambda exc: self._finalize_failed(exc, payload),
+            label="Finalizing sale...",
+            controls=self.sale_controls,
+            cancellable=False,
+        )
+
+    def _sale_finalized(self, result: FinalizeSaleResult) -> None:
+        QMessageBox.information(
+            self,
+            "Sale Complete",
+            (
+                f"Sale #{result.sale_id} saved. Receipt {result.receipt_number} generated at:\n"
+                f"{result.receipt_path}"
+            ),
+        )
+        self._clear_sale()
 
-        payload = FinalizeSaleInput(
+    def _finalize_failed(self, error: Exception, payload: FinalizeSaleInput) -> None:
+        if isinstance(error, PriceMismatchError):
+            self._apply_server_prices(error.server_prices)
+            QMessageBox.warning(
+                self,
+                "Prices Changed",
+                (
+                    f"{error}.\nThe cart now shows current prices. "
+                    "Review the total and finalize again."
+                ),
+            )
+        elif isinstance(error, FinalizePartialFailure):
+            QMessageBox.warning(
+                self,
+                "Finalize Partial Success",
+                (
+                    "Sale was saved but receipt generation failed.\n"
+                    "Retry Finalize to regenerate using the same correlation key.\n\n"
+                    f"{error}"
+                ),
+            )
+        elif isinstance(error, (OperationalError, InterfaceError)):
+            if self.offline_sync is None:
+                QMessageBox.critical(self, "Finalize Sale", f"Failed to finalize sale: {error}")
+                return
+            answer = QMessageBox.question(
+                self,
+                "Database Unreachable",
+                (
+                    "The database could not be reached. "
+                    "Save this sale offline with a provisional receipt?"
+                ),
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            )
+            if answer == QMessageBox.StandardButton.Yes:
+                self._finalize_offline(payload)
+        else:
+            QMessageBox.critical(self, "Finalize Sale", f"Failed to finalize sale: {error}")
+
+    def _build_finalize_input(self, config: AppConfig) -> FinalizeSaleInput:
+        return FinalizeSaleInput(
             cart_lines=[
                 CartLineInput(
                     product_id=item.product_id,
@@ -300,7 +502,7 @@ class RingUpPage(QWidget):
                 for item in self.cart
             ],
             payment_method=self.payment_method_combo.currentText(),
-            customer_id=customer_id,
+            customer_id=self.customer_combo.currentData(),
             discount_type=self.discount_type_combo.currentText(),
             discount_value=Decimal(str(self.discount_value_input.value())),
             tax_enabled=config.tax.enabled,
@@ -310,31 +512,62 @@ class RingUpPage(QWidget):
             business_address=config.business.address,
             business_phone=config.business.phone,
             idempotency_key=self._current_finalize_key(),
+            expected_unit_prices={item.product_id: item.unit_price for item in self.cart},
         )
 
-        try:
-            result = repo.finalize_sale(payload)
-            QMessageBox.information(
-                self,
-                "Sale Complete",
-                f"Sale #{result.sale_id} saved. Receipt {result.receipt_number} generated at:\n{result.receipt_path}",
+    def _apply_server_prices(self, server_prices: dict[int, Decimal]) -> None:
+        for row in self.cart:
+            if row.product_id in server_prices:
+                row.unit_price = server_prices[row.product_id]
+        self.pending_finalize_key = None
+        self._refresh_cart_table()
+        self._recalculate_totals()
+        self._refresh_products()
+        if self.offline_sync is not None:
+            self.offline_sync.wake()
+
+    def _finalize_offline(self, payload: FinalizeSaleInput) -> None:
+        assert self.offline_sync is not None
+        cart = [
+            LocalCartLine(
+                product_name=item.product_name,
+                unit_type=item.unit_type,
+                unit_price=item.unit_price,
+                quantity=item.quantity,
+                weight_lbs=item.weight_lbs,
             )
-            self.pending_finalize_key = None
-            self.cart.clear()
-            self._refresh_cart_table()
-            self._recalculate_totals()
-        except FinalizePartialFailure as exc:
-            QMessageBox.warning(
-                self,
-                "Finalize Partial Success",
-                (
-                    "Sale was saved but receipt generation failed.\n"
-                    "Retry Finalize to regenerate using the same correlation key.\n\n"
-                    f"{exc}"
-                ),
+            for item in self.cart
+        ]
+        customer_summary = (
+            self.customer_combo.currentText() if payload.customer_id is not None else ""
+        )
+        try:
+            result = finalize_locally(
+                self.offline_sync.queue, payload, cart, customer_summary=customer_summary
             )
+        except QueueFullError as exc:
+            QMessageBox.critical(self, "Offline Queue Full", str(exc))
+            return
         except Exception as exc:
-            QMessageBox.critical(self, "Finalize Sale", f"Failed to finalize sale: {exc}")
+            QMessageBox.critical(self, "Finalize Sale", f"Failed to save sale locally: {exc}")
+            return
+
+        self.offline_sync.wake()
+        QMessageBox.information(
+            self,
+            "Sale Complete",
+            (
+                f"Sale saved locally. Provisional receipt {result.receipt_number} generated at:\n"
+                f"{result.receipt_path}\n\nIt will sync to the database automatically."
+            ),
+        )
+        self._clear_sale()
+
+    def _clear_sale(self) -> None:
+        self.pending_finalize_key = None
+        self.cart.clear()
+        self._refresh_cart_table()
+        self._recalculate_totals()
 
     def _current_finalize_key(self) -> str:
         if not self.pending_finalize_key:
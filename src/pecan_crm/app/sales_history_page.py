@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import subprocess
+from collections.abc import Callable
 from pathlib import Path
 
 from PySide6.QtCore import QDate
@@ -15,22 +16,49 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QMessageBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-from pecan_crm.config.store import ConfigStore
-from pecan_crm.db.repositories.sales import SalesRepository
+from pecan_crm.app.table_models import (
+    RowFilterProxyModel,
+    RowTableModel,
+    TableColumn,
+    make_table_view,
+    selected_row,
+)
+from pecan_crm.app.tasks import ActionRunner, BusyIndicator, LatestTaskRunner
+from pecan_crm.config.settings_service import settings_service
+from pecan_crm.db.models import Customer, Sale, SaleItem
+from pecan_crm.db.repositories.sales import SaleListItem, SalesRepository
 from pecan_crm.db.runtime import build_session_factory_from_settings
+from pecan_crm.domain.receipt_numbers import is_provisional_receipt_number
+from pecan_crm.offline.sync import OfflineSyncService
+from pecan_crm.services.receipt_storage import ReceiptStore
+
+# Sales fetched per keyset page as the list is scrolled.
+SALES_PAGE_SIZE = 500
+
+SALE_COLUMNS = [
+    TableColumn("Sale ID", align_right=True),
+    TableColumn("Receipt"),
+    TableColumn("Date/Time", lambda v: v.strftime("%Y-%m-%d %H:%M:%S")),
+    TableColumn("Payment"),
+    TableColumn("Status"),
+    TableColumn("Total", lambda v: f"${v:.2f}", align_right=True),
+    TableColumn("Customer"),
+]
 
 
 class SalesHistoryPage(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, *, offline_sync: OfflineSyncService | None = None) -> None:
         super().__init__()
-        self.config_store = ConfigStore()
+        self.settings = settings_service()
+        self.offline_sync = offline_sync
+        # Receipt filter of the current listing; a provisional number is swapped for the
+        # server receipt number its offline sale was given when it synced.
+        self.receipt_search = ""
 
         self.date_from = QDateEdit()
         self.date_from.setCalendarPopup(True)
@@ -43,7 +71,7 @@ class SalesHistoryPage(QWidget):
         self.payment_filter.addItems(["ANY", "CASH", "CARD", "OTHER"])
 
         self.receipt_filter = QLineEdit()
-        self.receipt_filter.setPlaceholderText("Receipt contains")
+        self.receipt_filter.setPlaceholderText("Receipt contains, or provisional P number")
 
         refresh_btn = QPushButton("Refresh")
         refresh_btn.clicked.connect(self._refresh)
@@ -59,53 +87,70 @@ class SalesHistoryPage(QWidget):
         filter_row.addWidget(self.receipt_filter)
         filter_row.addWidget(refresh_btn)
 
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels(
-            ["Sale ID", "Receipt", "Date/Time", "Payment", "Status", "Total", "Customer"]
+        self.model = RowTableModel(SALE_COLUMNS, load_more=self._load_more, parent=self)
+        self.proxy = RowFilterProxyModel(self.model, parent=self)
+        self.table = make_table_view(self.proxy)
+        self.table.selectionModel().selectionChanged.connect(self._load_detail)
+        self.last_loaded: SaleListItem | None = None
+        self.list_status = QLabel("")
+        self.list_runner = LatestTaskRunner(
+            on_result=self._show_sales,
+            on_error=self._sales_failed,
+            parent=self,
         )
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.itemSelectionChanged.connect(self._load_detail)
+        self.detail_runner = LatestTaskRunner(
+            on_result=self._show_detail,
+            on_error=lambda exc: QMessageBox.critical(
+                self, "Sales History", f"Failed to load detail: {exc}"
+            ),
+            parent=self,
+        )
+        self.actions = ActionRunner(parent=self)
+        self.busy = BusyIndicator(self.actions)
 
         self.detail_text = QTextEdit()
         self.detail_text.setReadOnly(True)
 
-        regenerate_btn = QPushButton("Open/Regen Receipt")
-        regenerate_btn.clicked.connect(self._open_or_regen_receipt)
-        print_btn = QPushButton("Print Receipt")
-        print_btn.clicked.connect(self._print_receipt)
-        void_btn = QPushButton("Void Sale")
-        void_btn.clicked.connect(self._void_sale)
-        export_btn = QPushButton("Export CSV")
-        export_btn.clicked.connect(self._export_csv)
+        self.regenerate_btn = QPushButton("Open/Regen Receipt")
+        self.regenerate_btn.clicked.connect(self._open_or_regen_receipt)
+        self.print_btn = QPushButton("Print Receipt")
+        self.print_btn.clicked.connect(self._print_receipt)
+        self.void_btn = QPushButton("Void Sale")
+        self.void_btn.clicked.connect(self._void_sale)
+        self.export_btn = QPushButton("Export CSV")
+        self.export_btn.clicked.connect(self._export_csv)
 
         action_row = QHBoxLayout()
-        action_row.addWidget(regenerate_btn)
-        action_row.addWidget(print_btn)
-        action_row.addWidget(void_btn)
-        action_row.addWidget(export_btn)
+        action_row.addWidget(self.regenerate_btn)
+        action_row.addWidget(self.print_btn)
+        action_row.addWidget(self.void_btn)
+        action_row.addWidget(self.export_btn)
         action_row.addStretch(1)
 
         self.summary_date = QDateEdit()
         self.summary_date.setCalendarPopup(True)
         self.summary_date.setDate(QDate.currentDate())
-        summary_btn = QPushButton("Daily Summary")
-        summary_btn.clicked.connect(self._daily_summary)
+        self.summary_btn = QPushButton("Daily Summary")
+        self.summary_btn.clicked.connect(self._daily_summary)
         self.summary_output = QLabel("-")
 
         summary_row = QHBoxLayout()
         summary_row.addWidget(QLabel("Date"))
         summary_row.addWidget(self.summary_date)
-        summary_row.addWidget(summary_btn)
+        summary_row.addWidget(self.summary_btn)
         summary_row.addWidget(self.summary_output, stretch=1)
 
         layout = QVBoxLayout(self)
         layout.addLayout(filter_row)
         layout.addWidget(self.table)
+        layout.addWidget(self.list_status)
         layout.addWidget(QLabel("Sale Detail"))
         layout.addWidget(self.detail_text)
         layout.addLayout(action_row)
         layout.addLayout(summary_row)
+        layout.addWidget(self.busy)
 
+    def on_shown(self) -> None:
         self._refresh()
 
     def _repository(self) -> SalesRepository | None:
@@ -116,36 +161,95 @@ class SalesHistoryPage(QWidget):
             return None
 
     def _refresh(self) -> None:
-        repo = self._repository()
-        if repo is None:
+        self.last_loaded = None
+        self.model.set_rows([])
+        self.detail_text.clear()
+        receipt_filter = self.receipt_filter.text().strip()
+        receipt_search = self._receipt_search(receipt_filter)
+        if receipt_search is None:
+            self.list_status.setText(
+                f"Provisional receipt {receipt_filter.upper()} has not synced yet"
+            )
             return
-
-        items = repo.list_sales(
-            date_from=self.date_from.date().toPython(),
-            date_to=self.date_to.date().toPython(),
-            payment_method=self.payment_filter.currentText(),
-            receipt_number_contains=self.receipt_filter.text().strip(),
-        )
-
-        self.table.setRowCount(len(items))
-        for row, item in enumerate(items):
-            self.table.setItem(row, 0, QTableWidgetItem(str(item.sale_id)))
-            self.table.setItem(row, 1, QTableWidgetItem(item.receipt_number))
-            self.table.setItem(row, 2, QTableWidgetItem(item.sold_at_utc.strftime("%Y-%m-%d %H:%M:%S")))
-            self.table.setItem(row, 3, QTableWidgetItem(item.payment_method))
-            self.table.setItem(row, 4, QTableWidgetItem(item.status))
-            self.table.setItem(row, 5, QTableWidgetItem(f"${item.total:.2f}"))
-            self.table.setItem(row, 6, QTableWidgetItem(item.customer_name))
+        self.receipt_search = receipt_search
+        self.list_status.setText("Loading...")
+        self.list_runner.submit(self._sales_query(after=None))
+
+    def _receipt_search(self, receipt_filter: str) -> str | None:
+        """Receipt number filter to query; None for a provisional receipt that has not synced."""
+        provisional = receipt_filter.upper()
+        if not is_provisional_receipt_number(provisional):
+            return receipt_filter
+        if self.offline_sync is None:
+            return None
+        ack = self.offline_sync.queue.server_receipt_for(provisional)
+        return ack.receipt_number if ack is not None else None
+
+    def _load_more(self) -> None:
+        # Called by the model's fetchMore() once the view scrolls past the loaded sales.
+        self.list_status.setText("Loading more...")
+        self.list_runner.submit(self._sales_query(after=self.last_loaded))
+
+    def _sales_query(
+        self, *, after: SaleListItem | None
+    ) -> Callable[[], tuple[SaleListItem | None, list[tuple[object, ...]], bool]]:
+        date_from = self.date_from.date().toPython()
+        date_to = self.date_to.date().toPython()
+        payment_method = self.payment_filter.currentText()
+        receipt_contains = self.receipt_search
+
+        def query() -> tuple[SaleListItem | None, list[tuple[object, ...]], bool]:
+            items = SalesRepository(build_session_factory_from_settings()).list_sales(
+                date_from=date_from,
+                date_to=date_to,
+                payment_method=payment_method,
+                receipt_number_contains=receipt_contains,
+                after=after,
+                limit=SALES_PAGE_SIZE + 1,
+            )
+            has_more = len(items) > SALES_PAGE_SIZE
+            items = items[:SALES_PAGE_SIZE]
+            rows = [
+                (
+                    item.sale_id,
+                    item.receipt_number,
+                    item.sold_at_utc,
+                    item.payment_method,
+                    item.status,
+                    item.total,
+                    item.customer_name,
+                )
+                for item in items
+            ]
+            return (items[-1] if items else after), rows, has_more
+
+        return query
+
+    def _show_sales(self, page: tuple[SaleListItem | None, list[tuple[object, ...]], bool]) -> None:
+        last, rows, has_more = page
+        if self.last_loaded is None:
+            self.model.set_rows(rows, has_more=has_more)
+        else:
+            self.model.append_rows(rows, has_more=has_more)
+        self.last_loaded = last
+        more = " (scroll for more)" if has_more else ""
+        self.list_status.setText(f"{self.model.loaded_count()} sale(s){more}")
+
+    def _sales_failed(self, error: Exception) -> None:
+        # Let the next scroll to the end retry a page that failed.
+        self.model.page_failed()
+        more = " (scroll to retry)" if self.model.has_more else ""
+        self.list_status.setText(f"{self.model.loaded_count()} sale(s){more}")
+        QMessageBox.warning(self, "Sales History", str(error))
 
     def _selected_sale_id(self) -> int | None:
-        selected = self.table.selectedItems()
-        if not selected:
-            return None
-        return int(self.table.item(selected[0].row(), 0).text())
+        row = selected_row(self.table)
+        return int(row[0]) if row is not None else None
 
     def _load_detail(self) -> None:
         sale_id = self._selected_sale_id()
         if sale_id is None:
+            self.detail_runner.cancel()
             self.detail_text.clear()
             return
 
@@ -153,12 +257,11 @@ class SalesHistoryPage(QWidget):
         if repo is None:
             return
 
-        try:
-            sale, items, customer = repo.get_sale_detail(sale_id)
-        except Exception as exc:
-            QMessageBox.critical(self, "Sales History", f"Failed to load detail: {exc}")
-            return
+        self.detail_text.setPlainText("Loading...")
+        self.detail_runner.submit(lambda: repo.get_sale_detail(sale_id))
 
+    def _show_detail(self, detail: tuple[Sale, list[SaleItem], Customer | None]) -> None:
+        sale, items, _ = detail
         lines = [
             f"Sale ID: {sale.sale_id}",
             f"Receipt: {sale.receipt_number}",
@@ -192,22 +295,23 @@ class SalesHistoryPage(QWidget):
         if repo is None:
             return
 
-        config = self.config_store.load()
-
-        try:
-            sale, _, _ = repo.get_sale_detail(sale_id)
-            receipt_path = Path(config.receipt_folder) / f"receipt_{sale.receipt_number}.pdf"
-            if not receipt_path.exists():
-                receipt_path = repo.regenerate_receipt(
-                    sale_id=sale_id,
-                    receipt_folder=Path(config.receipt_folder),
-                    business_name=config.business.name,
-                    business_address=config.business.address,
-                    business_phone=config.business.phone,
-                )
-            self._open_file(receipt_path)
-        except Exception as exc:
-            QMessageBox.critical(self, "Sales History", f"Receipt open/regenerate failed: {exc}")
+        def opened(receipt_path: Path) -> None:
+            try:
+                self._open_file(receipt_path)
+            except Exception as exc:
+                QMessageBox.critical(self, "Sales History", f"Receipt open failed: {exc}")
+
+        resolve = self._receipt_resolver(repo, sale_id)
+        self.actions.run(
+            "receipt",
+            resolve,
+            on_result=opened,
+            on_error=lambda exc: QMessageBox.critical(
+                self, "Sales History", f"Receipt open/regenerate failed: {exc}"
+            ),
+            label="Preparing receipt...",
+            controls=(self.regenerate_btn, self.print_btn),
+        )
 
     def _print_receipt(self) -> None:
         sale_id = self._selected_sale_id()
@@ -219,28 +323,48 @@ class SalesHistoryPage(QWidget):
         if repo is None:
             return
 
-        config = self.config_store.load()
-
-        try:
-            sale, _, _ = repo.get_sale_detail(sale_id)
-            receipt_path = Path(config.receipt_folder) / f"receipt_{sale.receipt_number}.pdf"
-            if not receipt_path.exists():
-                receipt_path = repo.regenerate_receipt(
-                    sale_id=sale_id,
-                    receipt_folder=Path(config.receipt_folder),
-                    business_name=config.business.name,
-                    business_address=config.business.address,
-                    business_phone=config.business.phone,
-                )
+        resolve = self._receipt_resolver(repo, sale_id)
 
+        def print_receipt() -> None:
+            receipt_path = resolve()
             if hasattr(os, "startfile"):
                 os.startfile(str(receipt_path), "print")  # type: ignore[attr-defined]
             else:
                 raise RuntimeError("Print action is only supported on Windows")
 
-            QMessageBox.information(self, "Sales History", "Print command sent.")
-        except Exception as exc:
-            QMessageBox.critical(self, "Sales History", f"Print failed: {exc}")
+        self.actions.run(
+            "receipt",
+            print_receipt,
+            on_result=lambda _: QMessageBox.information(
+                self, "Sales History", "Print command sent."
+            ),
+            on_error=lambda exc: QMessageBox.critical(
+                self, "Sales History", f"Print failed: {exc}"
+            ),
+            label="Sending receipt to printer...",
+            controls=(self.regenerate_btn, self.print_btn),
+        )
+
+    def _receipt_resolver(self, repo: SalesRepository, sale_id: int) -> Callable[[], Path]:
+        # Config is read here, in the GUI thread; the returned callable runs on a worker.
+        config = self.settings.config()
+        receipt_folder = Path(config.receipt_folder)
+
+        def resolve() -> Path:
+            sale, _, _ = repo.get_sale_detail(sale_id)
+            receipt_path = ReceiptStore(receipt_folder).resolve(sale.receipt_number)
+            if receipt_path is not None:
+                return receipt_path
+
+            return repo.regenerate_receipt(
+                sale_id=sale_id,
+                receipt_folder=receipt_folder,
+                business_name=config.business.name,
+                business_address=config.business.address,
+                business_phone=config.business.phone,
+            )
+
+        return resolve
 
     def _void_sale(self) -> None:
         sale_id = self._selected_sale_id()
@@ -256,12 +380,19 @@ class SalesHistoryPage(QWidget):
         if repo is None:
             return
 
-        try:
-            repo.void_sale(sale_id=sale_id, reason=reason)
+        def voided(_: object) -> None:
             QMessageBox.information(self, "Sales History", "Sale voided.")
             self._refresh()
-        except Exception as exc:
-            QMessageBox.critical(self, "Sales History", f"Void failed: {exc}")
+
+        self.actions.run(
+            "void",
+            lambda: repo.void_sale(sale_id=sale_id, reason=reason),
+            on_result=voided,
+            on_error=lambda exc: QMessageBox.critical(self, "Sales History", f"Void failed: {exc}"),
+            label="Voiding sale...",
+            controls=(self.void_btn,),
+            cancellable=False,
+        )
 
     def _export_csv(self) -> None:
         repo = self._repository()
@@ -272,28 +403,39 @@ class SalesHistoryPage(QWidget):
         if not directory:
             return
 
-        try:
-            files = repo.export_csv(Path(directory))
-            QMessageBox.information(
+        self.actions.run(
+            "export",
+            lambda: repo.export_csv(Path(directory)),
+            on_result=lambda files: QMessageBox.information(
                 self,
                 "Sales History",
                 "Export complete:\n" + "\n".join(f"{k}: {v}" for k, v in files.items()),
-            )
-        except Exception as exc:
-            QMessageBox.critical(self, "Sales History", f"Export failed: {exc}")
+            ),
+            on_error=lambda exc: QMessageBox.critical(
+                self, "Sales History", f"Export failed: {exc}"
+            ),
+            label="Exporting CSV...",
+            controls=(self.export_btn,),
+        )
 
     def _daily_summary(self) -> None:
         repo = self._repository()
         if repo is None:
             return
 
-        try:
-            summary = repo.daily_summary(for_date=self.summary_date.date().toPython())
-            self.summary_output.setText(
+        for_date = self.summary_date.date().toPython()
+        self.actions.run(
+            "summary",
+            lambda: repo.daily_summary(for_date=for_date),
+            on_result=lambda summary: self.summary_output.setText(
                 f"Gross ${summary.gross:.2f} | Tax ${summary.tax_total:.2f} | Discounts ${summary.discounts:.2f} | Net ${summary.net:.2f} | Txns {summary.transaction_count}"
-            )
-        except Exception as exc:
-            QMessageBox.critical(self, "Sales History", f"Summary failed: {exc}")
+            ),
+            on_error=lambda exc: QMessageBox.critical(
+                self, "Sales History", f"Summary failed: {exc}"
+            ),
+            label="Building daily summary...",
+            controls=(self.summary_btn,),
+        )
 
     @staticmethod
     def _open_file(path: Path) -> None:
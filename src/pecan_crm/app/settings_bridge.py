@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QObject, Signal
+
+from pecan_crm.config.settings_service import SettingsService, settings_service
+
+
+class SettingsBridge(QObject):
+    """Re-emits SettingsService changes as a Qt signal.
+
+    The service may notice a change on a worker thread; receivers living in the GUI
+    thread get the AppConfig through a queued connection.
+    """
+
+    changed = Signal(object)
+
+    def __init__(self, service: SettingsService, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.service = service
+        service.add_listener(self.changed.emit)
+
+
+_BRIDGE: SettingsBridge | None = None
+
+
+def settings_bridge() -> SettingsBridge:
+    """The bridge for the process-wide settings service; create it from the GUI thread."""
+    global _BRIDGE
+    if _BRIDGE is None:
+        _BRIDGE = SettingsBridge(settings_service())
+    return _BRIDGE
@@ -15,17 +15,15 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from pecan_crm.app.tasks import ActionRunner, BusyIndicator
 from pecan_crm.config.models import AppConfig, BusinessProfileConfig, DatabaseConfig, TaxConfig
-from pecan_crm.config.secret_store import SecretStore
-from pecan_crm.config.store import ConfigStore
-from pecan_crm.db.health import test_connection
+from pecan_crm.config.settings_service import settings_service
 
 
 class SettingsPage(QWidget):
     def __init__(self) -> None:
         super().__init__()
-        self.config_store = ConfigStore()
-        self.secret_store = SecretStore()
+        self.settings = settings_service()
 
         self.server_input = QLineEdit()
         self.database_input = QLineEdit()
@@ -44,6 +42,8 @@ class SettingsPage(QWidget):
         self.tax_rate_input.setSingleStep(0.01)
         self.tax_rate_input.setSuffix(" %")
 
+        self.offline_first_checkbox = QCheckBox("Finalize locally first and sync in the background")
+
         self.receipt_folder_input = QLineEdit()
         browse_receipt_btn = QPushButton("Browse")
         browse_receipt_btn.clicked.connect(self._choose_receipt_folder)
@@ -51,8 +51,10 @@ class SettingsPage(QWidget):
         save_btn = QPushButton("Save Settings")
         save_btn.clicked.connect(self._save)
 
-        test_btn = QPushButton("Test Connection")
-        test_btn.clicked.connect(self._test_connection)
+        self.test_btn = QPushButton("Test Connection")
+        self.test_btn.clicked.connect(self._test_connection)
+        self.actions = ActionRunner(parent=self)
+        self.busy = BusyIndicator(self.actions)
 
         form = QFormLayout()
         form.addRow("Azure SQL Server", self.server_input)
@@ -71,25 +73,27 @@ class SettingsPage(QWidget):
         receipt_row_widget = QWidget()
         receipt_row_widget.setLayout(receipt_row)
         form.addRow("Receipt Folder", receipt_row_widget)
+        form.addRow("Offline-First Checkout", self.offline_first_checkbox)
 
         action_row = QHBoxLayout()
         action_row.addWidget(save_btn)
-        action_row.addWidget(test_btn)
+        action_row.addWidget(self.test_btn)
         action_row.addStretch(1)
 
         layout = QVBoxLayout(self)
         layout.addLayout(form)
         layout.addLayout(action_row)
+        layout.addWidget(self.busy)
         layout.addStretch(1)
 
         self._load()
 
     def _load(self) -> None:
-        config = self.config_store.load()
+        config = self.settings.config()
         self.server_input.setText(config.database.server)
         self.database_input.setText(config.database.database)
         self.username_input.setText(config.database.username)
-        self.password_input.setText(self.secret_store.get_db_password())
+        self.password_input.setText(self.settings.db_password())
 
         self.business_name_input.setText(config.business.name)
         self.business_address_input.setText(config.business.address)
@@ -98,6 +102,7 @@ class SettingsPage(QWidget):
         self.tax_enabled_checkbox.setChecked(config.tax.enabled)
         self.tax_rate_input.setValue(config.tax.rate_percent)
         self.receipt_folder_input.setText(config.receipt_folder)
+        self.offline_first_checkbox.setChecked(config.offline_queue.offline_first)
 
     def _build_config(self) -> AppConfig:
         return AppConfig(
@@ -116,12 +121,14 @@ class SettingsPage(QWidget):
                 rate_percent=float(self.tax_rate_input.value()),
             ),
             receipt_folder=self.receipt_folder_input.text().strip(),
+            offline_queue=self.settings.config().offline_queue.model_copy(
+                update={"offline_first": self.offline_first_checkbox.isChecked()}
+            ),
         )
 
     def _save(self) -> None:
         config = self._build_config()
-        self.config_store.save(config)
-        self.secret_store.set_db_password(self.password_input.text())
+        self.settings.save(config, db_password=self.password_input.text())
 
         receipt_dir = Path(config.receipt_folder)
         receipt_dir.mkdir(parents=True, exist_ok=True)
@@ -129,17 +136,27 @@ class SettingsPage(QWidget):
         QMessageBox.information(self, "Saved", "Settings saved successfully.")
 
     def _test_connection(self) -> None:
-        try:
-            test_connection(
-                server=self.server_input.text().strip(),
-                database=self.database_input.text().strip(),
-                username=self.username_input.text().strip(),
-                password=self.password_input.text(),
-                attempts=3,
-            )
-            QMessageBox.information(self, "Connection", "Connection successful.")
-        except Exception as exc:
-            QMessageBox.critical(self, "Connection", f"Connection failed: {exc}")
+        # Deferred: it loads SQLAlchemy, which the landing page otherwise doesn't need.
+        from pecan_crm.db.health import test_connection
+
+        server = self.server_input.text().strip()
+        database = self.database_input.text().strip()
+        username = self.username_input.text().strip()
+        password = self.password_input.text()
+        self.actions.run(
+            "test_connection",
+            lambda: test_connection(
+                server=server, database=database, username=username, password=password, attempts=3
+            ),
+            on_result=lambda _: QMessageBox.information(
+                self, "Connection", "Connection successful."
+            ),
+            on_error=lambda exc: QMessageBox.critical(
+                self, "Connection", f"Connection failed: {exc}"
+            ),
+            label="Testing connection...",
+            controls=(self.test_btn,),
+        )
 
     def _choose_receipt_folder(self) -> None:
         current = self.receipt_folder_input.text().strip() or str(Path.home())
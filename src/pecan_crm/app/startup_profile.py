@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import importlib.abc
+import json
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from importlib.machinery import ModuleSpec
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+# Only needed for printing or once the database is used; the report says whether any of
+# these were already imported when the window first painted.
+DEFERRED_MODULES = ("reportlab", "sqlalchemy", "pyodbc")
+
+
+class _TimedLoader:
+    """Wraps a module's loader so executing the module is timed; all else is delegated."""
+
+    def __init__(self, loader: Any, profile: StartupProfile) -> None:
+        self._loader = loader
+        self._profile = profile
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType | None:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        with self._profile._timing_import(module.__name__):
+            self._loader.exec_module(module)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self, profile: StartupProfile) -> None:
+        self.profile = profile
+
+    def find_spec(
+        self, fullname: str, path: Sequence[str] | None, target: ModuleType | None = None
+    ) -> ModuleSpec | None:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self.profile)  # type: ignore[assignment]
+                return spec
+        return None
+
+
+class StartupProfile:
+    """Times app start-up: named init phases, and optionally every module import.
+
+    Phases are always recorded (they are cheap) so the log can report time to first
+    paint. With track_imports, install() puts a finder at the front of sys.meta_path
+    that times each module's execution, like `python -X importtime`: "total" includes
+    the modules it imported in turn, "self" does not.
+    """
+
+    def __init__(self, *, track_imports: bool = False) -> None:
+        self.started = time.perf_counter()
+        self.track_imports = track_imports
+        self.phases: list[dict[str, Any]] = []
+        self.marks: dict[str, float] = {}
+        self.imports: dict[str, dict[str, float]] = {}
+        self.loaded_at_first_paint: list[str] = []
+        self._import_stack: list[float] = []
+        self._finder: _ImportTimer | None = None
+
+    def install(self) -> None:
+        if self.track_imports and self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append(
+                {
+                    "name": name,
+                    "start_seconds": round(start - self.started, 4),
+                    "seconds": round(end - start, 4),
+                }
+            )
+
+    def mark(self, name: str) -> None:
+        self.marks[name] = round(self.elapsed(), 4)
+        if name == "first_paint":
+            self.loaded_at_first_paint = [m for m in DEFERRED_MODULES if m in sys.modules]
+
+    def report(self) -> dict[str, Any]:
+        imports = sorted(self.imports.items(), key=lambda item: item[1]["total"], reverse=True)
+        return {
+            "marks": self.marks,
+            "phases": self.phases,
+            "deferred_modules_loaded_at_first_paint": self.loaded_at_first_paint,
+            "imports": [
+                {"module": name, "total_seconds": t["total"], "self_seconds": t["self"]}
+                for name, t in imports
+            ],
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+
+    @contextmanager
+    def _timing_import(self, name: str) -> Iterator[None]:
+        # Each stack entry accumulates the time spent in nested imports.
+        self._import_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            nested = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += total
+            self.imports[name] = {"total": round(total, 5), "self": round(total - nested, 5)}
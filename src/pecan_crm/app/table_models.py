@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+)
+from PySide6.QtWidgets import QAbstractItemView, QTableView
+
+# Rows handed to the view per fetchMore() call.
+FETCH_BATCH_ROWS = 200
+
+_Index = QModelIndex | QPersistentModelIndex
+_Row = tuple[Any, ...]
+_ROOT = QModelIndex()
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _sort_key(value: Any) -> tuple[bool, Any]:
+    # Blanks sort first; text sorts case-insensitively.
+    if value is None:
+        return (False, 0)
+    return (True, value.lower() if isinstance(value, str) else value)
+
+
+@dataclass(frozen=True)
+class TableColumn:
+    title: str
+    format: Callable[[Any], str] = _text
+    align_right: bool = False
+
+
+class RowTableModel(QAbstractTableModel):
+    """Read-only table over plain tuples, one value per column.
+
+    Cells are formatted only when the view paints them, so a row costs one tuple instead
+    of a QTableWidgetItem per cell. Loaded rows are exposed to the view FETCH_BATCH_ROWS
+    at a time through canFetchMore()/fetchMore(); once they run out and has_more is set,
+    fetchMore() calls load_more so the page can fetch the next page from the database
+    and hand it to append_rows(), or call page_failed() so the next scroll retries.
+
+    Sorting happens here with one list sort on the raw values; a proxy sorting through
+    data() would call into Python for every comparison. Rows are sorted in full, so the
+    first window shown is the true top of the order.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[TableColumn],
+        *,
+        load_more: Callable[[], None] | None = None,
+        batch_size: int = FETCH_BATCH_ROWS,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.load_more = load_more
+        self.batch_size = batch_size
+        self.has_more = False
+        self._page_pending = False
+        self._rows: list[_Row] = []
+        self._visible = 0
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    def set_rows(self, rows: Sequence[_Row], *, has_more: bool = False) -> None:
+        self.beginResetModel()
+        self._rows = list(rows)
+        if self._sort_column >= 0:
+            self._rows.sort(key=self._key(), reverse=self._descending())
+        self._visible = min(len(self._rows), self.batch_size)
+        self.has_more = has_more
+        self._page_pending = False
+        self.endResetModel()
+
+    def append_rows(self, rows: Sequence[_Row], *, has_more: bool = False) -> None:
+        self.has_more = has_more
+        self._page_pending = False
+        if self._sort_column >= 0:
+            # Keep the user's sort: slot the new page in rather than tacking it on the end.
+            self.layoutAboutToBeChanged.emit()
+            self._rows.extend(rows)
+            self._reorder()
+            self.layoutChanged.emit()
+        else:
+            self._rows.extend(rows)
+        self._expose(self.batch_size)
+
+    def page_failed(self) -> None:
+        """Re-arm paging after the page requested through load_more failed to load."""
+        if self._page_pending:
+            self._page_pending = False
+            self.has_more = True
+
+    def expose_all(self) -> None:
+        self._expose(len(self._rows))
+
+    def row_at(self, row: int) -> _Row:
+        return self._rows[row]
+
+    def loaded_count(self) -> int:
+        return len(self._rows)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        self._sort_column = column
+        self._sort_order = order
+        if column < 0:
+            return
+        # Every loaded row is sorted, but only the current window stays exposed; the rest
+        # follows through fetchMore() as the user scrolls.
+        self.layoutAboutToBeChanged.emit()
+        self._reorder()
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent: _Index = _ROOT) -> int:
+        return 0 if parent.isValid() else self._visible
+
+    def columnCount(self, parent: _Index = _ROOT) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: _Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return column.format(self._rows[index.row()][index.column()])
+        if role == Qt.ItemDataRole.TextAlignmentRole and column.align_right:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section].title
+        return None
+
+    def canFetchMore(self, parent: _Index = _ROOT) -> bool:
+        if parent.isValid():
+            return False
+        return self._visible < len(self._rows) or (self.has_more and self.load_more is not None)
+
+    def fetchMore(self, parent: _Index = _ROOT) -> None:
+        if parent.isValid():
+            return
+        if self._visible < len(self._rows):
+            self._expose(self.batch_size)
+        elif self.has_more and self.load_more is not None:
+            # Cleared until append_rows() reports whether yet another page exists, or
+            # page_failed() re-arms it.
+            self.has_more = False
+            self._page_pending = True
+            self.load_more()
+
+    def _descending(self) -> bool:
+        return self._sort_order == Qt.SortOrder.DescendingOrder
+
+    def _key(self) -> Callable[[_Row], tuple[bool, Any]]:
+        column = self._sort_column
+        return lambda row: _sort_key(row[column])
+
+    def _reorder(self) -> None:
+        # Sort positions rather than rows so persistent indexes (the selection) follow.
+        key = self._key()
+        rows = self._rows
+        order = sorted(range(len(rows)), key=lambda i: key(rows[i]), reverse=self._descending())
+        new_position = [0] * len(order)
+        for new, old in enumerate(order):
+            new_position[old] = new
+        self._rows = [rows[i] for i in order]
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(new_position[index.row()], index.column()) for index in persistent],
+        )
+
+    def _expose(self, count: int) -> None:
+        target = min(len(self._rows), self._visible + count)
+        if target > self._visible:
+            self.beginInsertRows(QModelIndex(), self._visible, target - 1)
+            self._visible = target
+            self.endInsertRows()
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """Filters a RowTableModel by a row predicate and/or a text match on any cell.
+
+    Sorting is passed through to the source model. Filtering first exposes every loaded
+    row so it covers all of them, not just the batches scrolled into view.
+    """
+
+    def __init__(self, source: RowTableModel, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.setSourceModel(source)
+        # Held directly: sourceModel() costs a wrapper lookup per call, and filterAcceptsRow
+        # runs once per row.
+        self._model = source
+        self._row_filter: Callable[[_Row], bool] | None = None
+        self._needle = ""
+
+    def set_row_filter(self, row_filter: Callable[[_Row], bool] | None) -> None:
+        self._begin_filter_change()
+        self._row_filter = row_filter
+        self._end_filter_change()
+
+    def set_text_filter(self, text: str) -> None:
+        self._begin_filter_change()
+        self._needle = text.strip().lower()
+        self._end_filter_change()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        self._model.sort(column, order)
+
+    def source_row(self, proxy_row: int) -> _Row:
+        return self._model.row_at(self.mapToSource(self.index(proxy_row, 0)).row())
+
+    def filterAcceptsRow(self, source_row: int, source_parent: _Index) -> bool:
+        if self._row_filter is None and not self._needle:
+            return True
+        row = self._model.row_at(source_row)
+        if self._row_filter is not None and not self._row_filter(row):
+            return False
+        if self._needle:
+            cells = (column.format(value) for column, value in zip(self._model.columns, row))
+            return any(self._needle in cell.lower() for cell in cells)
+        return True
+
+    def _begin_filter_change(self) -> None:
+        if hasattr(self, "beginFilterChange"):  # Qt 6.9+
+            self.beginFilterChange()
+
+    def _end_filter_change(self) -> None:
+        # Re-check the exposed window, then let the remaining rows arrive already filtered,
+        # so each row goes through filterAcceptsRow once.
+        if hasattr(self, "endFilterChange"):
+            self.endFilterChange()
+        else:
+            self.invalidateFilter()
+        self._model.expose_all()
+
+
+def make_table_view(proxy: RowFilterProxyModel) -> QTableView:
+    view = QTableView()
+    view.setModel(proxy)
+    view.setSortingEnabled(True)
+    # Start in source (query) order until a header is clicked.
+    view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+    view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    view.verticalHeader().setVisible(False)
+    # Fixed row heights let the view skip measuring every row.
+    view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 8)
+    view.horizontalHeader().setStretchLastSection(True)
+    return view
+
+
+def selected_row(view: QTableView) -> _Row | None:
+    """The source tuple behind the view's current selection, if any."""
+    rows = view.selectionModel().selectedRows()
+    if not rows:
+        return None
+    proxy: RowFilterProxyModel = view.model()  # type: ignore[assignment]
+    return proxy.source_row(rows[0].row())
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QProgressBar, QPushButton, QWidget
+
+LOGGER = logging.getLogger(__name__)
+
+SEARCH_DEBOUNCE_MS = 250
+
+
+class _TaskSignals(QObject):
+    # Emitted from the worker thread; receivers in the GUI thread get queued delivery.
+    succeeded = Signal(int, object)
+    failed = Signal(int, object)
+
+
+class _Task(QRunnable):
+    def __init__(
+        self,
+        generation: int,
+        fn: Callable[[], Any],
+        signals: _TaskSignals,
+        is_current: Callable[[int], bool],
+    ) -> None:
+        super().__init__()
+        self.generation = generation
+        self.fn = fn
+        self.signals = signals
+        self.is_current = is_current
+
+    def run(self) -> None:
+        # Superseded while still queued: skip the query entirely.
+        if not self.is_current(self.generation):
+            return
+        try:
+            result = self.fn()
+        except Exception as exc:
+            self.signals.failed.emit(self.generation, exc)
+        else:
+            self.signals.succeeded.emit(self.generation, result)
+
+
+class LatestTaskRunner(QObject):
+    """Runs callables on a thread pool and delivers only the newest submission's outcome.
+
+    Every submit() or cancel() bumps a generation counter. Tasks still queued for an older
+    generation never start, and results from older generations that finish late are
+    dropped, so callers only ever see the answer to the latest request. A query already
+    executing on the server is left to finish; its result is simply discarded.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_result: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        pool: QThreadPool | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.on_result = on_result
+        self.on_error = on_error
+        self.pool = pool or QThreadPool.globalInstance()
+        self._generation = 0
+        self._waiting = False
+        self._signals = _TaskSignals()
+        self._signals.succeeded.connect(self._deliver_result)
+        self._signals.failed.connect(self._deliver_error)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def is_busy(self) -> bool:
+        return self._waiting
+
+    def submit(self, fn: Callable[[], Any]) -> int:
+        self._generation += 1
+        self._waiting = True
+        self.pool.start(_Task(self._generation, fn, self._signals, self._is_current))
+        return self._generation
+
+    def cancel(self) -> None:
+        self._generation += 1
+        self._waiting = False
+
+    def _is_current(self, generation: int) -> bool:
+        # Read from worker threads; a stale answer only means one extra query or one skip.
+        return generation == self._generation
+
+    def _deliver_result(self, generation: int, result: object) -> None:
+        if generation == self._generation:
+            self._waiting = False
+            self.on_result(result)
+
+    def _deliver_error(self, generation: int, error: object) -> None:
+        if generation == self._generation:
+            self._waiting = False
+            self.on_error(error)  # type: ignore[arg-type]
+
+
+class DebouncedSearch(QObject):
+    """Search-as-you-type for a QLineEdit.
+
+    Each edit cancels the in-flight query and restarts a single-shot timer. When typing
+    pauses for delay_ms, make_query(text) is called in the GUI thread (read any other
+    widget state there) and the callable it returns runs on a worker; on_result receives
+    its value back in the GUI thread. Repeats of the same error are reported once until a
+    query succeeds, so an unreachable server doesn't raise a dialog per keystroke.
+    """
+
+    def __init__(
+        self,
+        line_edit: QLineEdit,
+        make_query: Callable[[str], Callable[[], Any]],
+        *,
+        on_result: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        delay_ms: int = SEARCH_DEBOUNCE_MS,
+        pool: QThreadPool | None = None,
+    ) -> None:
+        super().__init__(line_edit)
+        self.line_edit = line_edit
+        self.make_query = make_query
+        self.on_result = on_result
+        self.on_error = on_error
+        self._last_error = ""
+        self.runner = LatestTaskRunner(
+            on_result=self._result, on_error=self._error, pool=pool, parent=self
+        )
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.run_now)
+        line_edit.textChanged.connect(self.schedule)
+        line_edit.returnPressed.connect(self.run_now)
+
+    def schedule(self) -> None:
+        self.runner.cancel()
+        self.timer.start()
+
+    def run_now(self) -> None:
+        self.timer.stop()
+        self.runner.submit(self.make_query(self.line_edit.text().strip()))
+
+    def _result(self, result: object) -> None:
+        self._last_error = ""
+        self.on_result(result)
+
+    def _error(self, error: Exception) -> None:
+        LOGGER.warning("Search failed: %s", error)
+        if str(error) != self._last_error:
+            self._last_error = str(error)
+            self.on_error(error)
+
+
+@dataclass
+class _Action:
+    key: str
+    label: str
+    on_result: Callable[[Any], None]
+    on_error: Callable[[Exception], None]
+    controls: tuple[QWidget, ...]
+    cancellable: bool
+
+
+class ActionRunner(QObject):
+    """Runs a page's blocking calls (repository work, exports, connection tests) on a pool.
+
+    Each action has a key, and run() refuses a second action with the same key while the
+    first is still in flight, so a double-clicked Finalize submits once. The controls
+    passed along are disabled until the outcome is delivered. on_result/on_error are
+    called back in the GUI thread.
+
+    cancel() drops the outcome of the cancellable actions in flight and hands their
+    controls back; the call itself is left to finish on the worker (a statement already
+    sent to the server can't be recalled), which is why writes such as Finalize are run
+    with cancellable=False.
+    """
+
+    busy_changed = Signal()
+
+    def __init__(self, *, pool: QThreadPool | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._next_generation = 0
+        self._actions: dict[int, _Action] = {}
+        self._disabled: dict[QWidget, int] = {}
+        self._signals = _TaskSignals()
+        self._signals.succeeded.connect(self._deliver_result)
+        self._signals.failed.connect(self._deliver_error)
+
+    def run(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        *,
+        on_result: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        label: str = "Working...",
+        controls: Iterable[QWidget] = (),
+        cancellable: bool = True,
+    ) -> bool:
+        if self.is_running(key):
+            return False
+        self._next_generation += 1
+        action = _Action(key, label, on_result, on_error, tuple(controls), cancellable)
+        self._actions[self._next_generation] = action
+        for control in action.controls:
+            self._disabled[control] = self._disabled.get(control, 0) + 1
+            control.setEnabled(False)
+        self.pool.start(_Task(self._next_generation, fn, self._signals, self._is_current))
+        self.busy_changed.emit()
+        return True
+
+    def is_running(self, key: str) -> bool:
+        return any(action.key == key for action in self._actions.values())
+
+    def is_busy(self) -> bool:
+        return bool(self._actions)
+
+    def can_cancel(self) -> bool:
+        return any(action.cancellable for action in self._actions.values())
+
+    def labels(self) -> list[str]:
+        return [action.label for action in self._actions.values()]
+
+    def cancel(self) -> None:
+        for generation, action in list(self._actions.items()):
+            if action.cancellable:
+                self._finish(generation)
+
+    def _is_current(self, generation: int) -> bool:
+        return generation in self._actions
+
+    def _finish(self, generation: int) -> _Action | None:
+        action = self._actions.pop(generation, None)
+        if action is None:
+            return None
+        for control in action.controls:
+            remaining = self._disabled.pop(control, 1) - 1
+            if remaining:
+                self._disabled[control] = remaining
+            else:
+                control.setEnabled(True)
+        self.busy_changed.emit()
+        return action
+
+    def _deliver_result(self, generation: int, result: object) -> None:
+        action = self._finish(generation)
+        if action is not None:
+            action.on_result(result)
+
+    def _deliver_error(self, generation: int, error: object) -> None:
+        action = self._finish(generation)
+        if action is not None:
+            LOGGER.warning("%s failed: %s", action.key, error)
+            action.on_error(error)  # type: ignore[arg-type]
+
+
+class BusyIndicator(QWidget):
+    """Shows what a page's ActionRunner is doing, with Cancel when that's possible.
+
+    Hidden while the runner is idle.
+    """
+
+    def __init__(self, runner: ActionRunner, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.runner = runner
+        self.label = QLabel("")
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setMaximumWidth(120)
+        self.progress.setTextVisible(False)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(runner.cancel)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.label)
+        layout.addStretch(1)
+        layout.addWidget(self.cancel_button)
+
+        runner.busy_changed.connect(self._update)
+        self._update()
+
+    def _update(self) -> None:
+        self.label.setText(" | ".join(self.runner.labels()))
+        self.cancel_button.setVisible(self.runner.can_cancel())
+        self.setVisible(self.runner.is_busy())
@@ -38,4 +38,14 @@ def env_float(name: str, default: float = 0.0) -> float:
     try:
         return float(raw)
     except ValueError:
-        return default
\ No newline at end of file
+        return default
+
+
+def env_int(name: str, default: int = 0) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
@@ -5,7 +5,7 @@ import os
 
 from pydantic import BaseModel, Field
 
-from pecan_crm.config.env import env_bool, env_float, env_str
+from pecan_crm.config.env import env_bool, env_float, env_int, env_str
 
 
 def default_receipt_folder() -> str:
@@ -13,6 +13,16 @@ def default_receipt_folder() -> str:
     return env_str("APP_RECEIPT_FOLDER", str(Path(program_data) / "PecanCRM" / "receipts"))
 
 
+def default_offline_queue_path() -> str:
+    app_data = Path(os.getenv("PROGRAMDATA", r"C:\ProgramData")) / "PecanCRM"
+    return env_str("OFFLINE_QUEUE_DB_PATH", str(app_data / "offline_queue.db"))
+
+
+def default_replica_path() -> str:
+    app_data = Path(os.getenv("PROGRAMDATA", r"C:\ProgramData")) / "PecanCRM"
+    return env_str("OFFLINE_REPLICA_DB_PATH", str(app_data / "local_replica.db"))
+
+
 class DatabaseConfig(BaseModel):
     server: str = Field(default_factory=lambda: env_str("AZURE_SQL_SERVER_FQDN"))
     database: str = Field(default_factory=lambda: env_str("AZURE_SQL_DATABASE"))
@@ -35,8 +45,29 @@ class TaxConfig(BaseModel):
     )
 
 
+class OfflineQueueConfig(BaseModel):
+    enabled: bool = Field(default_factory=lambda: env_bool("OFFLINE_QUEUE_ENABLED", False))
+    db_path: str = Field(default_factory=default_offline_queue_path)
+    replica_db_path: str = Field(default_factory=default_replica_path)
+    max_pending: int = Field(
+        default_factory=lambda: env_int("OFFLINE_QUEUE_MAX_PENDING", 5000),
+        gt=0,
+    )
+    retention_days: int = Field(
+        default_factory=lambda: env_int("OFFLINE_QUEUE_RETENTION_DAYS", 30),
+        ge=1,
+    )
+    # Commit checkouts locally with a provisional receipt and let the sync worker push them.
+    offline_first: bool = Field(default_factory=lambda: env_bool("OFFLINE_FIRST_FINALIZE", False))
+    sync_interval_seconds: float = Field(
+        default_factory=lambda: env_float("OFFLINE_QUEUE_SYNC_INTERVAL_SECONDS", 15.0),
+        gt=0.0,
+    )
+
+
 class AppConfig(BaseModel):
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     business: BusinessProfileConfig = Field(default_factory=BusinessProfileConfig)
     tax: TaxConfig = Field(default_factory=TaxConfig)
     receipt_folder: str = Field(default_factory=default_receipt_folder)
+    offline_queue: OfflineQueueConfig = Field(default_factory=OfflineQueueConfig)
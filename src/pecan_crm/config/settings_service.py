@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+
+from pecan_crm.config.models import AppConfig
+from pecan_crm.config.secret_store import SecretStore
+from pecan_crm.config.store import ConfigStore
+
+LOGGER = logging.getLogger(__name__)
+
+SettingsListener = Callable[[AppConfig], None]
+
+
+class SettingsService:
+    """In-memory settings snapshot shared by the whole app.
+
+    config() returns the validated AppConfig from the last read of settings.json and only
+    re-reads it when the file's mtime or size changed (one stat per call instead of a
+    read and a pydantic validation). The database password is read from the keyring
+    once and kept until save() or invalidate().
+
+    Listeners are called with the new AppConfig after a save or when an outside change
+    to the file is picked up. They run on whichever thread noticed the change; Qt code
+    should connect through SettingsBridge rather than touching widgets directly.
+    """
+
+    def __init__(
+        self,
+        config_store: ConfigStore | None = None,
+        secret_store: SecretStore | None = None,
+    ) -> None:
+        self.config_store = config_store or ConfigStore()
+        self.secret_store = secret_store or SecretStore()
+        self._lock = threading.RLock()
+        self._config: AppConfig | None = None
+        self._stamp: tuple[int, int] | None = None
+        self._password: str | None = None
+        self._listeners: list[SettingsListener] = []
+
+    def config(self) -> AppConfig:
+        stamp = self._file_stamp()
+        with self._lock:
+            if self._config is not None and stamp == self._stamp:
+                return self._config
+            previous = self._config
+            self._config = self.config_store.load()
+            self._stamp = stamp
+            current = self._config
+            changed = previous is not None and current != previous
+            if changed:
+                # Edited outside this process; the keyring entry may have moved with it.
+                self._password = None
+        if changed:
+            LOGGER.info("Settings file changed on disk; reloaded")
+            self._notify(current)
+        return current
+
+    def db_password(self) -> str:
+        with self._lock:
+            if self._password is None:
+                self._password = self.secret_store.get_db_password()
+            return self._password
+
+    def save(self, config: AppConfig, *, db_password: str | None = None) -> None:
+        with self._lock:
+            self.config_store.save(config)
+            self._config = config
+            self._stamp = self._file_stamp()
+        try:
+            if db_password is not None:
+                with self._lock:
+                    self.secret_store.set_db_password(db_password)
+                    self._password = db_password
+        finally:
+            # The file is saved either way, so listeners hear about it even if the
+            # keyring write failed.
+            self._notify(config)
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot and password; the next read goes to disk/keyring."""
+        with self._lock:
+            self._config = None
+            self._stamp = None
+            self._password = None
+
+    def add_listener(self, listener: SettingsListener) -> Callable[[], None]:
+        """Register listener; returns a callable that removes it again."""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def remove() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return remove
+
+    def _notify(self, config: AppConfig) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(config)
+            except Exception:
+                LOGGER.exception("Settings listener failed")
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = self.config_store.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+_DEFAULT: SettingsService | None = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def settings_service() -> SettingsService:
+    """The process-wide service over the default settings file and keyring entry."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = SettingsService()
+        return _DEFAULT
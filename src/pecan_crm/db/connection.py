@@ -26,4 +26,5 @@ def create_db_engine(*, server: str, database: str, username: str, password: str
         username=username,
         password=password,
     )
-    return create_engine(url, pool_pre_ping=True, future=True)
\ No newline at end of file
+    # fast_executemany sends a whole executemany batch (bulk imports, merges) in one round trip.
+    return create_engine(url, pool_pre_ping=True, future=True, fast_executemany=True)
\ No newline at end of file
@@ -19,6 +19,9 @@ class Customer(Base):
     phone: Mapped[str | None] = mapped_column(Unicode(30))
     email: Mapped[str | None] = mapped_column(Unicode(254))
     notes: Mapped[str | None] = mapped_column(Unicode(500))
+    phone_digits: Mapped[str | None] = mapped_column(Unicode(30))
+    email_normalized: Mapped[str | None] = mapped_column(Unicode(254))
+    name_key: Mapped[str | None] = mapped_column(Unicode(201))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at_utc: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at_utc: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -71,6 +74,25 @@ class SaleItem(Base):
     created_at_utc: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class CustomerMerge(Base):
+    __tablename__ = "customer_merges"
+
+    merge_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    batch_id: Mapped[str] = mapped_column(Unicode(36))
+    survivor_customer_id: Mapped[int] = mapped_column(ForeignKey("customers.customer_id"))
+    duplicate_customer_id: Mapped[int] = mapped_column(ForeignKey("customers.customer_id"))
+    duplicate_was_active: Mapped[bool] = mapped_column(Boolean)
+    merged_at_utc: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    rolled_back_at_utc: Mapped[datetime | None] = mapped_column(DateTime)
+
+
+class CustomerMergeSale(Base):
+    __tablename__ = "customer_merge_sales"
+
+    merge_id: Mapped[int] = mapped_column(ForeignKey("customer_merges.merge_id"), primary_key=True)
+    sale_id: Mapped[int] = mapped_column(ForeignKey("sales.sale_id"), primary_key=True)
+
+
 class AppSetting(Base):
     __tablename__ = "app_settings"
 
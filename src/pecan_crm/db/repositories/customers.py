@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import datetime
+from uuid import uuid4
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import and_, insert, or_, select, update
 from sqlalchemy.orm import Session, sessionmaker
 
-from pecan_crm.db.models import Customer
+from pecan_crm.db.models import Customer, CustomerMerge, CustomerMergeSale, Sale
+from pecan_crm.domain.customer_keys import customer_keys
+from pecan_crm.services.customer_search import customer_search_index, load_customers_ranked
+from pecan_crm.services.purchase_history import purchase_history_cache
 
 
 @dataclass(frozen=True)
@@ -19,28 +24,62 @@ class CustomerInput:
     is_active: bool = True
 
 
+# Keeps each chunk's IN lists well under SQL Server's 2100-parameter cap.
+MERGE_CHUNK_SIZE = 500
+
+
+class CustomerMergeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CustomerMergeSkip:
+    survivor_id: int
+    duplicate_id: int
+    reason: str
+
+
+@dataclass(frozen=True)
+class CustomerMergeResult:
+    batch_id: str
+    merged: int
+    sales_moved: int
+    skipped: list[CustomerMergeSkip] = field(default_factory=list)
+
+
 class CustomerRepository:
     def __init__(self, session_factory: sessionmaker[Session]) -> None:
         self.session_factory = session_factory
 
     def list_customers(self, *, include_inactive: bool = True, search: str = "") -> list[Customer]:
+        if search.strip():
+            return self.search_ranked(search, include_inactive=include_inactive)
+
         with self.session_factory() as session:
             query = select(Customer)
             if not include_inactive:
                 query = query.where(Customer.is_active.is_(True))
-            if search:
-                wildcard = f"%{search.strip()}%"
-                query = query.where(
-                    or_(
-                        Customer.first_name.ilike(wildcard),
-                        Customer.last_name.ilike(wildcard),
-                        Customer.phone.ilike(wildcard),
-                        Customer.email.ilike(wildcard),
-                    )
-                )
             query = query.order_by(Customer.last_name.asc(), Customer.first_name.asc())
             return list(session.scalars(query).all())
 
+    def search_ranked(
+        self, search: str, *, include_inactive: bool = True, limit: int | None = None
+    ) -> list[Customer]:
+        """Substring/prefix search served by the in-process trigram index, best match first."""
+        index = customer_search_index(self.session_factory)
+        index.refresh(self.session_factory)
+        ids = index.search(search, include_inactive=include_inactive, limit=limit)
+        return load_customers_ranked(self.session_factory, ids)
+
+    def changed_since(self, since: datetime | None) -> list[Customer]:
+        """Customers (active or not) updated at or after since, oldest change first."""
+        with self.session_factory() as session:
+            query = select(Customer)
+            if since is not None:
+                query = query.where(Customer.updated_at_utc >= since)
+            query = query.order_by(Customer.updated_at_utc.asc(), Customer.customer_id.asc())
+            return list(session.scalars(query).all())
+
     def find_likely_duplicates(
         self,
         *,
@@ -50,27 +89,233 @@ class CustomerRepository:
         last_name: str,
         exclude_customer_id: int | None = None,
     ) -> list[Customer]:
-        with self.session_factory() as session:
-            clauses = []
-            if phone.strip():
-                clauses.append(Customer.phone == phone.strip())
-            if email.strip():
-                clauses.append(func.lower(Customer.email) == email.strip().lower())
-            if first_name.strip() and last_name.strip():
-                clauses.append(
-                    (func.lower(Customer.first_name) == first_name.strip().lower())
-                    & (func.lower(Customer.last_name) == last_name.strip().lower())
-                )
-
-            if not clauses:
-                return []
+        """Customers sharing a normalized phone, email or full name (seeks on the key indexes)."""
+        keys = customer_keys(first_name=first_name, last_name=last_name, phone=phone, email=email)
+        clauses = []
+        if keys.phone_digits:
+            clauses.append(Customer.phone_digits == keys.phone_digits)
+        if keys.email_normalized:
+            clauses.append(Customer.email_normalized == keys.email_normalized)
+        if keys.name_key:
+            clauses.append(Customer.name_key == keys.name_key)
+        if not clauses:
+            return []
 
+        with self.session_factory() as session:
             query = select(Customer).where(or_(*clauses))
             if exclude_customer_id is not None:
                 query = query.where(Customer.customer_id != exclude_customer_id)
 
             return list(session.scalars(query).all())
 
+    def merge_customers(
+        self,
+        pairs: Iterable[tuple[int, int]],
+        *,
+        chunk_size: int = MERGE_CHUNK_SIZE,
+        dry_run: bool = False,
+    ) -> CustomerMergeResult:
+        """Merge (survivor_id, duplicate_id) pairs under one batch id.
+
+        Each chunk runs in its own transaction with set-based statements: log the merges,
+        log which sales move, repoint those sales at the survivor and deactivate the
+        duplicates. Chains (A into B, B into C) resolve to the final survivor. Pairs that
+        can't be merged are skipped and reported rather than failing the batch.
+        """
+        plan, skipped = self._plan_merges(pairs)
+        batch_id = str(uuid4())
+        merged = 0
+        sales_moved = 0
+        items = sorted(plan.items())
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start : start + chunk_size]
+            duplicate_ids = [duplicate_id for duplicate_id, _ in chunk]
+            with self.session_factory() as session:
+                now = datetime.utcnow()
+                was_active = dict(
+                    session.execute(
+                        select(Customer.customer_id, Customer.is_active).where(
+                            Customer.customer_id.in_(duplicate_ids)
+                        )
+                    ).all()
+                )
+                session.execute(
+                    insert(CustomerMerge),
+                    [
+                        {
+                            "batch_id": batch_id,
+                            "survivor_customer_id": survivor_id,
+                            "duplicate_customer_id": duplicate_id,
+                            "duplicate_was_active": bool(was_active[duplicate_id]),
+                            "merged_at_utc": now,
+                        }
+                        for duplicate_id, survivor_id in chunk
+                    ],
+                )
+                in_chunk = and_(
+                    CustomerMerge.batch_id == batch_id,
+                    CustomerMerge.duplicate_customer_id.in_(duplicate_ids),
+                )
+                session.execute(
+                    insert(CustomerMergeSale).from_select(
+                        ["merge_id", "sale_id"],
+                        select(CustomerMerge.merge_id, Sale.sale_id)
+                        .join(Sale, Sale.customer_id == CustomerMerge.duplicate_customer_id)
+                        .where(in_chunk),
+                    )
+                )
+                survivor = (
+                    select(CustomerMerge.survivor_customer_id)
+                    .where(CustomerMerge.batch_id == batch_id)
+                    .where(CustomerMerge.duplicate_customer_id == Sale.customer_id)
+                    .scalar_subquery()
+                )
+                moved = session.execute(
+                    update(Sale)
+                    .where(Sale.customer_id.in_(duplicate_ids))
+                    .values(customer_id=survivor, updated_at_utc=now)
+                    .execution_options(synchronize_session=False)
+                )
+                session.execute(
+                    update(Customer)
+                    .where(Customer.customer_id.in_(duplicate_ids))
+                    .values(is_active=False, updated_at_utc=now)
+                    .execution_options(synchronize_session=False)
+                )
+                if dry_run:
+                    session.rollback()
+                else:
+                    session.commit()
+            merged += len(chunk)
+            sales_moved += moved.rowcount
+        if merged and not dry_run:
+            purchase_history_cache(self.session_factory).invalidate()
+        return CustomerMergeResult(
+            batch_id=batch_id, merged=merged, sales_moved=sales_moved, skipped=skipped
+        )
+
+    def rollback_merge(self, batch_id: str) -> CustomerMergeResult:
+        """Undo a merge batch: move its logged sales back and restore duplicates' active flag.
+
+        Refuses while a later, still-applied merge consumed one of this batch's survivors,
+        so batches roll back newest first.
+        """
+        with self.session_factory() as session:
+            open_merges = and_(
+                CustomerMerge.batch_id == batch_id, CustomerMerge.rolled_back_at_utc.is_(None)
+            )
+            survivors = select(CustomerMerge.survivor_customer_id).where(open_merges)
+            later = session.scalar(
+                select(CustomerMerge.batch_id)
+                .where(CustomerMerge.batch_id != batch_id)
+                .where(CustomerMerge.rolled_back_at_utc.is_(None))
+                .where(CustomerMerge.duplicate_customer_id.in_(survivors))
+                .limit(1)
+            )
+            if later is not None:
+                raise CustomerMergeError(
+                    f"Roll back batch {later} first; it merged away a survivor of this batch"
+                )
+
+            now = datetime.utcnow()
+            original_customer = (
+                select(CustomerMerge.duplicate_customer_id)
+                .join(CustomerMergeSale, CustomerMergeSale.merge_id == CustomerMerge.merge_id)
+                .where(open_merges)
+                .where(CustomerMergeSale.sale_id == Sale.sale_id)
+                .scalar_subquery()
+            )
+            logged_sales = (
+                select(CustomerMergeSale.sale_id)
+                .join(CustomerMerge, CustomerMerge.merge_id == CustomerMergeSale.merge_id)
+                .where(open_merges)
+            )
+            moved = session.execute(
+                update(Sale)
+                .where(Sale.sale_id.in_(logged_sales))
+                .values(customer_id=original_customer, updated_at_utc=now)
+                .execution_options(synchronize_session=False)
+            )
+            was_active = (
+                select(CustomerMerge.duplicate_was_active)
+                .where(open_merges)
+                .where(CustomerMerge.duplicate_customer_id == Customer.customer_id)
+                .scalar_subquery()
+            )
+            session.execute(
+                update(Customer)
+                .where(Customer.customer_id.in_(select(CustomerMerge.duplicate_customer_id).where(open_merges)))
+                .values(is_active=was_active, updated_at_utc=now)
+                .execution_options(synchronize_session=False)
+            )
+            restored = session.execute(
+                update(CustomerMerge)
+                .where(open_merges)
+                .values(rolled_back_at_utc=now)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        purchase_history_cache(self.session_factory).invalidate()
+        return CustomerMergeResult(
+            batch_id=batch_id, merged=restored.rowcount, sales_moved=moved.rowcount
+        )
+
+    def _plan_merges(
+        self, pairs: Iterable[tuple[int, int]]
+    ) -> tuple[dict[int, int], list[CustomerMergeSkip]]:
+        skipped: list[CustomerMergeSkip] = []
+        requested: dict[int, int] = {}
+        for survivor_id, duplicate_id in pairs:
+            if survivor_id == duplicate_id:
+                continue
+            if requested.get(duplicate_id, survivor_id) != survivor_id:
+                skipped.append(
+                    CustomerMergeSkip(survivor_id, duplicate_id, "conflicting survivors")
+                )
+                continue
+            requested[duplicate_id] = survivor_id
+
+        plan: dict[int, int] = {}
+        for duplicate_id, survivor_id in requested.items():
+            seen = {duplicate_id}
+            while survivor_id in requested and survivor_id not in seen:
+                seen.add(survivor_id)
+                survivor_id = requested[survivor_id]
+            if survivor_id in seen:
+                skipped.append(
+                    CustomerMergeSkip(requested[duplicate_id], duplicate_id, "merge cycle")
+                )
+            else:
+                plan[duplicate_id] = survivor_id
+
+        ids = sorted(set(plan) | set(plan.values()))
+        existing: set[int] = set()
+        merged_away: set[int] = set()
+        with self.session_factory() as session:
+            for start in range(0, len(ids), MERGE_CHUNK_SIZE):
+                chunk = ids[start : start + MERGE_CHUNK_SIZE]
+                existing.update(session.scalars(select(Customer.customer_id).where(Customer.customer_id.in_(chunk))))
+                merged_away.update(
+                    session.scalars(
+                        select(CustomerMerge.duplicate_customer_id)
+                        .where(CustomerMerge.duplicate_customer_id.in_(chunk))
+                        .where(CustomerMerge.rolled_back_at_utc.is_(None))
+                    )
+                )
+
+        for duplicate_id, survivor_id in list(plan.items()):
+            reason = ""
+            if duplicate_id not in existing or survivor_id not in existing:
+                reason = "customer not found"
+            elif duplicate_id in merged_away:
+                reason = "already merged"
+            elif survivor_id in merged_away:
+                reason = "survivor already merged"
+            if reason:
+                skipped.append(CustomerMergeSkip(survivor_id, duplicate_id, reason))
+                del plan[duplicate_id]
+        return plan, skipped
+
     def save(self, data: CustomerInput, *, customer_id: int | None = None) -> Customer:
         with self.session_factory() as session:
             if customer_id is None:
@@ -95,6 +340,22 @@ class CustomerRepository:
                 entity.is_active = data.is_active
                 entity.updated_at_utc = datetime.utcnow()
 
+            apply_customer_keys(entity)
             session.commit()
             session.refresh(entity)
-            return entity
\ No newline at end of file
+            # Make the edit searchable now instead of at the next index refresh.
+            customer_search_index(self.session_factory).upsert([entity])
+            return entity
+
+
+def apply_customer_keys(entity: Customer) -> None:
+    """Refresh the persisted match keys from the customer's current contact fields."""
+    keys = customer_keys(
+        first_name=entity.first_name,
+        last_name=entity.last_name,
+        phone=entity.phone,
+        email=entity.email,
+    )
+    entity.phone_digits = keys.phone_digits
+    entity.email_normalized = keys.email_normalized
+    entity.name_key = keys.name_key
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
 from decimal import Decimal
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session, sessionmaker
 
 from pecan_crm.db.models import Product
+from pecan_crm.domain.pricing import round_money
+from pecan_crm.domain.scan_codes import normalize_sku
+from pecan_crm.services.product_import import ProductImportError, ProductImportRow
 
 
 @dataclass(frozen=True)
@@ -19,6 +23,74 @@ class ProductInput:
     is_active: bool = True
 
 
+# Rows per executemany batch and per locking SELECT (well under SQL Server's 2100-parameter cap).
+IMPORT_CHUNK_SIZE = 500
+
+
+class ProductImportConflictError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class ProductChange:
+    line_number: int
+    product_id: int | None
+    before: ProductInput | None
+    after: ProductInput
+    seen_updated_at_utc: datetime | None = None
+
+    @property
+    def changed_fields(self) -> list[str]:
+        if self.before is None:
+            return [f.name for f in fields(ProductInput)]
+        return [
+            f.name
+            for f in fields(ProductInput)
+            if getattr(self.before, f.name) != getattr(self.after, f.name)
+        ]
+
+
+@dataclass(frozen=True)
+class ProductImportPlan:
+    changes: list[ProductChange]
+    unchanged: int
+
+    @property
+    def inserts(self) -> list[ProductChange]:
+        return [change for change in self.changes if change.product_id is None]
+
+    @property
+    def updates(self) -> list[ProductChange]:
+        return [change for change in self.changes if change.product_id is not None]
+
+
+@dataclass(frozen=True)
+class ProductImportResult:
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+def _product_input(entity: Product) -> ProductInput:
+    return ProductInput(
+        name=entity.name,
+        sku=entity.sku or "",
+        unit_type=entity.unit_type,
+        unit_price=Decimal(str(entity.unit_price)),
+        is_active=bool(entity.is_active),
+    )
+
+
+def _values(data: ProductInput) -> dict[str, object]:
+    return {
+        "name": data.name,
+        "sku": data.sku or None,
+        "unit_type": data.unit_type,
+        "unit_price": data.unit_price,
+        "is_active": data.is_active,
+    }
+
+
 class ProductRepository:
     def __init__(self, session_factory: sessionmaker[Session]) -> None:
         self.session_factory = session_factory
@@ -34,6 +106,15 @@ class ProductRepository:
             query = query.order_by(Product.name.asc())
             return list(session.scalars(query).all())
 
+    def changed_since(self, since: datetime | None) -> list[Product]:
+        """Products (active or not) updated at or after since, oldest change first."""
+        with self.session_factory() as session:
+            query = select(Product)
+            if since is not None:
+                query = query.where(Product.updated_at_utc >= since)
+            query = query.order_by(Product.updated_at_utc.asc(), Product.product_id.asc())
+            return list(session.scalars(query).all())
+
     def save(self, data: ProductInput, *, product_id: int | None = None) -> Product:
         self._validate(data)
         with self.session_factory() as session:
@@ -70,6 +151,154 @@ class ProductRepository:
             entity.updated_at_utc = datetime.utcnow()
             session.commit()
 
+    def plan_import(self, rows: Iterable[ProductImportRow]) -> ProductImportPlan:
+        """Diff CSV rows against the catalog without writing anything.
+
+        Rows match by product_id, else by normalized SKU; blank cells keep the current
+        value, and an unmatched SKU with name, unit_type and unit_price is a new product.
+        Every problem is collected into one ProductImportError.
+        """
+        with self.session_factory() as session:
+            products = list(session.scalars(select(Product)))
+        by_id = {p.product_id: p for p in products}
+        by_sku: dict[str, list[Product]] = {}
+        for p in products:
+            if p.sku:
+                by_sku.setdefault(normalize_sku(p.sku), []).append(p)
+
+        changes: list[ProductChange] = []
+        unchanged = 0
+        errors: list[str] = []
+        seen_ids: dict[int, int] = {}
+        new_skus: dict[str, int] = {}
+        for row in rows:
+            where = f"line {row.line_number}"
+            if row.product_id is not None:
+                entity = by_id.get(row.product_id)
+                if entity is None:
+                    errors.append(f"{where}: product {row.product_id} not found")
+                    continue
+            else:
+                matches = by_sku.get(normalize_sku(row.sku), [])
+                if len(matches) > 1:
+                    errors.append(f"{where}: SKU {row.sku} is on several products; use product_id")
+                    continue
+                entity = matches[0] if matches else None
+
+            price = round_money(row.unit_price) if row.unit_price is not None else None
+            if entity is None:
+                if row.name is None or row.unit_type is None or price is None:
+                    errors.append(f"{where}: new SKU {row.sku} needs name, unit_type, unit_price")
+                    continue
+                key = normalize_sku(row.sku)
+                if key in new_skus:
+                    errors.append(f"{where}: SKU {row.sku} also on line {new_skus[key]}")
+                    continue
+                new_skus[key] = row.line_number
+                before = None
+                after = ProductInput(
+                    name=row.name,
+                    sku=row.sku or "",
+                    unit_type=row.unit_type,
+                    unit_price=price,
+                    is_active=row.is_active if row.is_active is not None else True,
+                )
+            else:
+                first_line = seen_ids.setdefault(entity.product_id, row.line_number)
+                if first_line != row.line_number:
+                    errors.append(f"{where}: product {entity.product_id} also on line {first_line}")
+                    continue
+                before = _product_input(entity)
+                # A SKU that only differs in spacing or case is not a change.
+                sku = before.sku
+                if row.sku is not None and normalize_sku(row.sku) != normalize_sku(before.sku):
+                    sku = row.sku
+                owners = by_sku.get(normalize_sku(sku), [])
+                if sku != before.sku and any(p is not entity for p in owners):
+                    errors.append(f"{where}: SKU {sku} already belongs to another product")
+                    continue
+                after = ProductInput(
+                    name=row.name if row.name is not None else before.name,
+                    sku=sku,
+                    unit_type=row.unit_type if row.unit_type is not None else before.unit_type,
+                    unit_price=price if price is not None else before.unit_price,
+                    is_active=row.is_active if row.is_active is not None else before.is_active,
+                )
+                if after == before:
+                    unchanged += 1
+                    continue
+            try:
+                self._validate(after)
+            except ValueError as exc:
+                errors.append(f"{where}: {exc}")
+                continue
+            changes.append(
+                ProductChange(
+                    line_number=row.line_number,
+                    product_id=entity.product_id if entity is not None else None,
+                    before=before,
+                    after=after,
+                    seen_updated_at_utc=entity.updated_at_utc if entity is not None else None,
+                )
+            )
+        if errors:
+            raise ProductImportError("\n".join(errors))
+        return ProductImportPlan(changes=changes, unchanged=unchanged)
+
+    def apply_import(
+        self, plan: ProductImportPlan, *, chunk_size: int = IMPORT_CHUNK_SIZE
+    ) -> ProductImportResult:
+        """Write a previewed plan in a single transaction.
+
+        Updates and inserts go out as executemany batches of chunk_size. Each update batch
+        first locks its rows and checks updated_at_utc against what the preview saw; if
+        anything changed in between, the whole import rolls back with
+        ProductImportConflictError.
+        """
+        updates = plan.updates
+        inserts = plan.inserts
+        with self.session_factory() as session:
+            now = datetime.utcnow()
+            for start in range(0, len(updates), chunk_size):
+                chunk = updates[start : start + chunk_size]
+                current = dict(
+                    session.execute(
+                        select(Product.product_id, Product.updated_at_utc)
+                        .where(Product.product_id.in_([change.product_id for change in chunk]))
+                        .with_for_update()
+                    ).all()
+                )
+                stale = [
+                    str(change.product_id)
+                    for change in chunk
+                    if current.get(change.product_id) != change.seen_updated_at_utc
+                ]
+                if stale:
+                    session.rollback()
+                    raise ProductImportConflictError(
+                        f"Products changed since the preview ({', '.join(stale[:10])}); "
+                        "preview again"
+                    )
+                session.execute(
+                    update(Product),
+                    [
+                        {"product_id": c.product_id, **_values(c.after), "updated_at_utc": now}
+                        for c in chunk
+                    ],
+                )
+            for start in range(0, len(inserts), chunk_size):
+                session.execute(
+                    insert(Product),
+                    [
+                        {**_values(change.after), "created_at_utc": now, "updated_at_utc": now}
+                        for change in inserts[start : start + chunk_size]
+                    ],
+                )
+            session.commit()
+        return ProductImportResult(
+            inserted=len(inserts), updated=len(updates), unchanged=plan.unchanged
+        )
+
     @staticmethod
     def _validate(data: ProductInput) -> None:
         if not data.name.strip():
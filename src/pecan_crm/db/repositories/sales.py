@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import csv
 import logging
+from collections import defaultdict
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import date, datetime, time
 from decimal import Decimal
 from pathlib import Path
 
-from sqlalchemy import func, or_, select, text
+from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.orm import Session, sessionmaker
 
 from pecan_crm.db.models import Customer, Product, Sale, SaleItem
-from pecan_crm.domain.pricing import SaleLine, calculate_totals, line_subtotal
+from pecan_crm.db.repositories.customers import CustomerRepository
+from pecan_crm.domain.pricing import SaleLine, SaleTotals, calculate_totals, line_subtotal
 from pecan_crm.domain.receipt_numbers import format_receipt_number
-from pecan_crm.services.receipts import ReceiptData, ReceiptLine, generate_receipt_pdf
+from pecan_crm.services.purchase_history import PurchaseHistory, purchase_history_cache
+from pecan_crm.services.receipt_storage import ReceiptStore
+from pecan_crm.services.receipts import ReceiptData, ReceiptLine
 
 
 LOGGER = logging.getLogger(__name__)
@@ -24,6 +29,9 @@ class CartLineInput:
     product_id: int
     quantity: Decimal | None
     weight_lbs: Decimal | None
+    # Price the customer was charged, set for sales rung up offline. Only a replay
+    # (finalize_sale(..., replay=True)) persists it instead of the current product price.
+    unit_price: Decimal | None = None
 
 
 @dataclass(frozen=True)
@@ -40,6 +48,14 @@ class FinalizeSaleInput:
     business_address: str
     business_phone: str
     idempotency_key: str
+    # Set for sales rung up offline so replay keeps the original sale time.
+    sold_at_utc: datetime | None = None
+    # Prices shown at ring-up (e.g. from the local replica). When set, finalize refuses to
+    # charge a different server price instead of silently re-pricing.
+    expected_unit_prices: dict[int, Decimal] | None = None
+    # Totals printed on the provisional receipt of an offline sale. Replay checks them
+    # against the charged line prices before persisting them.
+    charged_totals: SaleTotals | None = None
 
 
 @dataclass(frozen=True)
@@ -60,6 +76,15 @@ class FinalizePartialFailure(RuntimeError):
         self.error = error
 
 
+class PriceMismatchError(ValueError):
+    def __init__(self, server_prices: dict[int, Decimal]) -> None:
+        super().__init__(
+            "Prices changed since ring-up for product(s) "
+            + ", ".join(str(product_id) for product_id in sorted(server_prices))
+        )
+        self.server_prices = server_prices
+
+
 @dataclass(frozen=True)
 class SaleListItem:
     sale_id: int
@@ -71,6 +96,13 @@ class SaleListItem:
     customer_name: str
 
 
+@dataclass(frozen=True)
+class SaleReceiptRef:
+    sale_id: int
+    receipt_number: str
+    sold_at_utc: datetime
+
+
 @dataclass(frozen=True)
 class DailySummary:
     gross: Decimal
@@ -94,27 +126,35 @@ class SalesRepository:
             return list(session.scalars(query).all())
 
     def search_customers(self, search: str) -> list[Customer]:
+        if search.strip():
+            return CustomerRepository(self.session_factory).search_ranked(
+                search, include_inactive=False
+            )
+
         with self.session_factory() as session:
             query = select(Customer).where(Customer.is_active.is_(True))
-            if search.strip():
-                wildcard = f"%{search.strip()}%"
-                query = query.where(
-                    or_(
-                        Customer.first_name.ilike(wildcard),
-                        Customer.last_name.ilike(wildcard),
-                        Customer.phone.ilike(wildcard),
-                        Customer.email.ilike(wildcard),
-                    )
-                )
             query = query.order_by(Customer.last_name.asc(), Customer.first_name.asc())
             return list(session.scalars(query).all())
 
-    def finalize_sale(self, payload: FinalizeSaleInput) -> FinalizeSaleResult:
+    def finalize_sale(
+        self, payload: FinalizeSaleInput, *, replay: bool = False
+    ) -> FinalizeSaleResult:
+        """Persist a sale priced on the server, then write its receipt.
+
+        replay is set only by the offline queue's sender: the sale was already charged at
+        ring-up, so the payload's charged prices and totals are persisted even if server
+        prices have changed since. Any other caller passing charged prices is refused.
+        """
         payment_method = payload.payment_method.upper().strip()
         if payment_method not in {"CASH", "CARD", "OTHER"}:
             raise ValueError("Payment method must be CASH, CARD, or OTHER")
         if not payload.cart_lines:
             raise ValueError("Cart is empty")
+        has_charged_prices = payload.charged_totals is not None or any(
+            line.unit_price is not None for line in payload.cart_lines
+        )
+        if has_charged_prices and not replay:
+            raise ValueError("Charged prices are only accepted when replaying offline sales")
 
         correlation_id = payload.idempotency_key.strip()
         if not correlation_id:
@@ -153,14 +193,29 @@ class SalesRepository:
             if len(product_map) != len(set(product_ids)):
                 raise ValueError("One or more selected products no longer exist")
 
+            if payload.expected_unit_prices is not None:
+                changed = {
+                    product_id: Decimal(str(product.unit_price))
+                    for product_id, product in product_map.items()
+                    if payload.expected_unit_prices.get(product_id)
+                    != Decimal(str(product.unit_price))
+                }
+                if changed:
+                    raise PriceMismatchError(changed)
+
             pricing_lines: list[SaleLine] = []
+            repriced: dict[int, str] = {}
 
             for cart_line in payload.cart_lines:
                 product = product_map[cart_line.product_id]
+                current_price = Decimal(str(product.unit_price))
+                unit_price = current_price if cart_line.unit_price is None else cart_line.unit_price
+                if unit_price != current_price:
+                    repriced[product.product_id] = f"{unit_price} (now {current_price})"
                 pricing_lines.append(
                     SaleLine(
                         unit_type=product.unit_type,
-                        unit_price=Decimal(str(product.unit_price)),
+                        unit_price=unit_price,
                         quantity=cart_line.quantity,
                         weight_lbs=cart_line.weight_lbs,
                     )
@@ -173,6 +228,20 @@ class SalesRepository:
                 discount_type=payload.discount_type,
                 discount_value=payload.discount_value,
             )
+            if payload.charged_totals is not None and payload.charged_totals != totals:
+                # Drift cannot cause this: totals are recomputed from the charged prices.
+                raise ValueError(
+                    f"Charged totals do not match the charged line prices "
+                    f"(charged {payload.charged_totals.total}, recomputed {totals.total})"
+                )
+            if repriced:
+                # The sale was already paid at these prices; keep them and leave a trail.
+                LOGGER.warning(
+                    "Finalize kept charged prices that differ from current prices. "
+                    "correlation_id=%s prices=%s",
+                    correlation_id,
+                    repriced,
+                )
 
             next_seq = session.execute(text("SELECT NEXT VALUE FOR receipt_number_seq")).scalar_one()
             receipt_number = format_receipt_number(int(next_seq))
@@ -187,7 +256,7 @@ class SalesRepository:
                 discount_total=totals.discount_total,
                 tax_total=totals.tax_total,
                 total=totals.total,
-                sold_at_utc=datetime.utcnow(),
+                sold_at_utc=payload.sold_at_utc or datetime.utcnow(),
             )
             session.add(sale)
             session.flush()
@@ -202,12 +271,14 @@ class SalesRepository:
                         unit_type=product.unit_type,
                         quantity=cart_line.quantity,
                         weight_lbs=cart_line.weight_lbs,
-                        unit_price=Decimal(str(product.unit_price)),
+                        unit_price=sale_line.unit_price,
                         line_subtotal=line_subtotal(sale_line),
                     )
                 )
 
             session.commit()
+            if sale.customer_id is not None:
+                purchase_history_cache(self.session_factory).invalidate(sale.customer_id)
             LOGGER.info(
                 "Sale persisted successfully. correlation_id=%s sale_id=%s receipt=%s",
                 correlation_id,
@@ -251,7 +322,10 @@ class SalesRepository:
         date_to: date | None,
         payment_method: str | None,
         receipt_number_contains: str,
+        after: SaleListItem | None = None,
+        limit: int | None = None,
     ) -> list[SaleListItem]:
+        """Sales newest first. With limit, pass the last item back as after for the next page."""
         with self.session_factory() as session:
             query = select(Sale, Customer).outerjoin(Customer, Sale.customer_id == Customer.customer_id)
 
@@ -270,7 +344,18 @@ class SalesRepository:
                 wildcard = f"%{receipt_number_contains.strip()}%"
                 query = query.where(Sale.receipt_number.ilike(wildcard))
 
-            rows = session.execute(query.order_by(Sale.sold_at_utc.desc())).all()
+            if after is not None:
+                query = query.where(
+                    or_(
+                        Sale.sold_at_utc < after.sold_at_utc,
+                        and_(Sale.sold_at_utc == after.sold_at_utc, Sale.sale_id < after.sale_id),
+                    )
+                )
+            query = query.order_by(Sale.sold_at_utc.desc(), Sale.sale_id.desc())
+            if limit is not None:
+                query = query.limit(limit)
+
+            rows = session.execute(query).all()
             items: list[SaleListItem] = []
             for sale, customer in rows:
                 customer_name = ""
@@ -291,6 +376,13 @@ class SalesRepository:
                 )
             return items
 
+    def customer_purchase_history(
+        self, customer_id: int, *, load_more: bool = False
+    ) -> PurchaseHistory:
+        """The customer's sales newest first, one keyset page at a time, cached for the session."""
+        cache = purchase_history_cache(self.session_factory)
+        return cache.load_more(customer_id) if load_more else cache.get(customer_id)
+
     def get_sale_detail(self, sale_id: int) -> tuple[Sale, list[SaleItem], Customer | None]:
         with self.session_factory() as session:
             sale = session.get(Sale, sale_id)
@@ -326,6 +418,84 @@ class SalesRepository:
                 business_phone=business_phone,
             )
 
+    def list_receipt_refs(
+        self,
+        *,
+        since: datetime | None = None,
+        after_sale_id: int | None = None,
+    ) -> list[SaleReceiptRef]:
+        """Receipt refs in sale_id order.
+
+        since filters on sold_at_utc. Incremental callers should pass after_sale_id instead:
+        offline sales replay with their original sold_at_utc but always get a new sale_id.
+        """
+        with self.session_factory() as session:
+            query = select(Sale.sale_id, Sale.receipt_number, Sale.sold_at_utc)
+            if since is not None:
+                query = query.where(Sale.sold_at_utc >= since)
+            if after_sale_id is not None:
+                query = query.where(Sale.sale_id > after_sale_id)
+            rows = session.execute(query.order_by(Sale.sale_id)).all()
+            return [
+                SaleReceiptRef(
+                    sale_id=row.sale_id,
+                    receipt_number=row.receipt_number,
+                    sold_at_utc=row.sold_at_utc,
+                )
+                for row in rows
+            ]
+
+    def load_receipt_data(
+        self,
+        sale_ids: list[int],
+        *,
+        business_name: str,
+        business_address: str,
+        business_phone: str,
+        chunk_size: int = 500,
+    ) -> Iterator[ReceiptData]:
+        """Bulk-load receipt data with three queries per chunk instead of three per sale."""
+        for start in range(0, len(sale_ids), chunk_size):
+            chunk = sale_ids[start : start + chunk_size]
+            with self.session_factory() as session:
+                sales = list(
+                    session.scalars(
+                        select(Sale).where(Sale.sale_id.in_(chunk)).order_by(Sale.sale_id)
+                    )
+                )
+
+                items_by_sale: dict[int, list[SaleItem]] = defaultdict(list)
+                item_query = (
+                    select(SaleItem)
+                    .where(SaleItem.sale_id.in_(chunk))
+                    .order_by(SaleItem.sale_id, SaleItem.sale_item_id)
+                )
+                for item in session.scalars(item_query):
+                    items_by_sale[item.sale_id].append(item)
+
+                customer_ids = {sale.customer_id for sale in sales if sale.customer_id}
+                customers: dict[int, Customer] = {}
+                if customer_ids:
+                    customers = {
+                        c.customer_id: c
+                        for c in session.scalars(
+                            select(Customer).where(Customer.customer_id.in_(customer_ids))
+                        )
+                    }
+
+                batch = [
+                    self._receipt_data(
+                        sale=sale,
+                        items=items_by_sale[sale.sale_id],
+                        customer=customers.get(sale.customer_id) if sale.customer_id else None,
+                        business_name=business_name,
+                        business_address=business_address,
+                        business_phone=business_phone,
+                    )
+                    for sale in sales
+                ]
+            yield from batch
+
     def void_sale(self, *, sale_id: int, reason: str) -> None:
         reason = reason.strip()
         if not reason:
@@ -340,6 +510,8 @@ class SalesRepository:
             sale.void_reason = reason
             sale.updated_at_utc = datetime.utcnow()
             session.commit()
+            if sale.customer_id is not None:
+                purchase_history_cache(self.session_factory).invalidate(sale.customer_id)
 
     def daily_summary(self, *, for_date: date) -> DailySummary:
         start_dt = datetime.combine(for_date, time.min)
@@ -469,8 +641,29 @@ class SalesRepository:
                 select(SaleItem).where(SaleItem.sale_id == sale.sale_id).order_by(SaleItem.sale_item_id)
             )
         )
-        customer_summary = self._customer_summary(session, sale.customer_id)
+        customer = session.get(Customer, sale.customer_id) if sale.customer_id else None
+
+        receipt_data = self._receipt_data(
+            sale=sale,
+            items=items,
+            customer=customer,
+            business_name=business_name,
+            business_address=business_address,
+            business_phone=business_phone,
+        )
+        return ReceiptStore(receipt_folder).save(receipt_data)
 
+    @classmethod
+    def _receipt_data(
+        cls,
+        *,
+        sale: Sale,
+        items: list[SaleItem],
+        customer: Customer | None,
+        business_name: str,
+        business_address: str,
+        business_phone: str,
+    ) -> ReceiptData:
         receipt_lines = [
             ReceiptLine(
                 name=item.product_name_snapshot,
@@ -483,27 +676,23 @@ class SalesRepository:
             for item in items
         ]
 
-        receipt_data = ReceiptData(
+        return ReceiptData(
             receipt_number=sale.receipt_number,
             sold_at_local=sale.sold_at_utc,
             business_name=business_name,
             business_address=business_address,
             business_phone=business_phone,
             payment_method=sale.payment_method,
-            customer_summary=customer_summary,
+            customer_summary=cls._customer_summary(customer),
             subtotal=Decimal(str(sale.subtotal)),
             discount_total=Decimal(str(sale.discount_total)),
             tax_total=Decimal(str(sale.tax_total)),
             total=Decimal(str(sale.total)),
             lines=receipt_lines,
         )
-        return generate_receipt_pdf(receipt_folder, receipt_data)
 
     @staticmethod
-    def _customer_summary(session: Session, customer_id: int | None) -> str:
-        if not customer_id:
-            return ""
-        customer = session.get(Customer, customer_id)
+    def _customer_summary(customer: Customer | None) -> str:
         if customer is None:
             return ""
 
@@ -512,4 +701,4 @@ class SalesRepository:
         ).strip()
         if customer.phone:
             customer_summary = f"{customer_summary} ({customer.phone})" if customer_summary else customer.phone
-        return customer_summary
\ No newline at end of file
+        return customer_summary
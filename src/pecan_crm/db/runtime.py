@@ -1,32 +1,69 @@
 from __future__ import annotations
 
+import logging
+import threading
+import weakref
+
 from sqlalchemy.orm import Session, sessionmaker
 
-from pecan_crm.config.secret_store import SecretStore
-from pecan_crm.config.store import ConfigStore
+from pecan_crm.config.settings_service import SettingsService, settings_service
 from pecan_crm.db.session import make_session_factory
 
+LOGGER = logging.getLogger(__name__)
+
+_ConnectionKey = tuple[str, str, str, str]
+
+# One engine (and so one connection pool) per set of connection settings, shared by every
+# page and worker instead of a fresh engine and login per repository call.
+_FACTORIES: dict[_ConnectionKey, sessionmaker[Session]] = {}
+_FACTORIES_LOCK = threading.Lock()
+_WATCHED: weakref.WeakSet[SettingsService] = weakref.WeakSet()
 
-def build_session_factory_from_settings(
-    config_store: ConfigStore | None = None,
-    secret_store: SecretStore | None = None,
-) -> sessionmaker[Session]:
-    config_store = config_store or ConfigStore()
-    secret_store = secret_store or SecretStore()
 
-    config = config_store.load()
-    password = secret_store.get_db_password()
+def _connection_key(settings: SettingsService) -> _ConnectionKey:
+    database = settings.config().database
+    return (
+        database.server.strip(),
+        database.database.strip(),
+        database.username.strip(),
+        settings.db_password(),
+    )
 
-    server = config.database.server.strip()
-    database = config.database.database.strip()
-    username = config.database.username.strip()
+
+def build_session_factory_from_settings(
+    settings: SettingsService | None = None,
+) -> sessionmaker[Session]:
+    settings = settings or settings_service()
+    key = _connection_key(settings)
+    server, database, username, password = key
 
     if not (server and database and username and password):
         raise RuntimeError("Database settings are incomplete. Update Settings and save first.")
 
-    return make_session_factory(
-        server=server,
-        database=database,
-        username=username,
-        password=password,
-    )
\ No newline at end of file
+    with _FACTORIES_LOCK:
+        factory = _FACTORIES.get(key)
+        if factory is None:
+            if settings not in _WATCHED:
+                _WATCHED.add(settings)
+                settings.add_listener(lambda _config: _drop_stale_engines(settings))
+            factory = _FACTORIES[key] = make_session_factory(
+                server=server,
+                database=database,
+                username=username,
+                password=password,
+            )
+        return factory
+
+
+def _drop_stale_engines(settings: SettingsService) -> None:
+    # Called on a settings change: close the pools of every engine that no longer
+    # matches the saved connection settings.
+    current = _connection_key(settings)
+    with _FACTORIES_LOCK:
+        stale = [key for key in _FACTORIES if key != current]
+        factories = [_FACTORIES.pop(key) for key in stale]
+    for factory in factories:
+        bind = factory.kw.get("bind")
+        if bind is not None:
+            LOGGER.info("Database settings changed; disposing engine for %s", bind.url.host)
+            bind.dispose()
@@ -12,4 +12,12 @@ def make_session_factory(*, server: str, database: str, username: str, password:
         username=username,
         password=password,
     )
-    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
\ No newline at end of file
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def database_key(session_factory: sessionmaker[Session]) -> str:
+    """Identifies the database behind a session factory, for per-database process caches."""
+    bind = session_factory.kw.get("bind")
+    if bind is None:
+        return str(id(session_factory))
+    return bind.url.render_as_string(hide_password=True)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+# A leading US country code is dropped so "+1 555 123 4567" and "(555) 123-4567" match.
+_NANP_LENGTH = 10
+
+
+@dataclass(frozen=True)
+class CustomerKeys:
+    phone_digits: str | None
+    email_normalized: str | None
+    name_key: str | None
+
+
+def normalize_phone(value: str | None) -> str:
+    digits = "".join(ch for ch in (value or "") if ch.isdigit())
+    if len(digits) == _NANP_LENGTH + 1 and digits.startswith("1"):
+        return digits[1:]
+    return digits
+
+
+def normalize_text(value: str | None) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def make_name_key(first_name: str | None, last_name: str | None) -> str:
+    first = normalize_text(first_name)
+    last = normalize_text(last_name)
+    if not first or not last:
+        return ""
+    return f"{first}|{last}"
+
+
+def customer_keys(
+    *,
+    first_name: str | None,
+    last_name: str | None,
+    phone: str | None,
+    email: str | None,
+) -> CustomerKeys:
+    """Normalized match keys persisted on customers; empty keys are stored as NULL."""
+    return CustomerKeys(
+        phone_digits=normalize_phone(phone) or None,
+        email_normalized=normalize_text(email) or None,
+        name_key=make_name_key(first_name, last_name) or None,
+    )
@@ -4,6 +4,10 @@ import re
 
 
 _RECEIPT_PATTERN = re.compile(r"^\d{6}$")
+_PROVISIONAL_PATTERN = re.compile(r"^P\d{6,}$")
+
+# Offline-first sales print a local receipt before the server assigns the real number.
+PROVISIONAL_PREFIX = "P"
 
 
 class ReceiptNumberError(ValueError):
@@ -19,4 +23,14 @@ def format_receipt_number(sequence_value: int) -> str:
 def parse_receipt_number(receipt_number: str) -> int:
     if not _RECEIPT_PATTERN.match(receipt_number):
         raise ReceiptNumberError("Receipt number must be a 6-digit string")
-    return int(receipt_number)
\ No newline at end of file
+    return int(receipt_number)
+
+
+def format_provisional_receipt_number(local_sequence: int) -> str:
+    if local_sequence <= 0:
+        raise ReceiptNumberError("Local sequence value must be positive")
+    return f"{PROVISIONAL_PREFIX}{local_sequence:06d}"
+
+
+def is_provisional_receipt_number(receipt_number: str) -> bool:
+    return bool(_PROVISIONAL_PATTERN.match(receipt_number))
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+
+
+# Keyboard-wedge input: an optional "<qty>*" prefix, then the code the scanner sent.
+_SCAN_PATTERN = re.compile(r"^(?:(?P<qty>\d{1,3})\s*\*\s*)?(?P<code>\S+)$")
+
+# In-store UPC-A "2 IIIII WWWWW C": number system 2, item code, weight in 1/100 lb, check digit.
+VARIABLE_WEIGHT_PREFIX = "2"
+WEIGHT_SCALE = Decimal("0.01")
+
+
+class ScanCodeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ScanCode:
+    sku: str
+    quantity: Decimal | None = None
+    # Set for variable-weight labels: the product is looked up by embedded_sku ("2IIIII").
+    embedded_sku: str | None = None
+    weight_lbs: Decimal | None = None
+
+
+def normalize_sku(sku: str | None) -> str:
+    return "".join((sku or "").split()).upper()
+
+
+def upc_check_digit(digits: str) -> int:
+    odd = sum(int(d) for d in digits[0::2])
+    even = sum(int(d) for d in digits[1::2])
+    return (10 - (odd * 3 + even) % 10) % 10
+
+
+def is_valid_upc_a(code: str) -> bool:
+    return len(code) == 12 and code.isdigit() and upc_check_digit(code[:11]) == int(code[11])
+
+
+def parse_scan(text: str) -> ScanCode:
+    match = _SCAN_PATTERN.match(text.strip())
+    if match is None:
+        raise ScanCodeError("Scan a code or type <qty>*<sku>")
+    code = match.group("code")
+    quantity = Decimal(match.group("qty")) if match.group("qty") else None
+    if quantity is not None and quantity <= 0:
+        raise ScanCodeError("Quantity must be positive")
+
+    # Scanners configured for EAN-13 report UPC-A codes with a leading zero.
+    upc = code[1:] if len(code) == 13 and code.startswith("0") else code
+    if not (upc.startswith(VARIABLE_WEIGHT_PREFIX) and is_valid_upc_a(upc)):
+        return ScanCode(sku=code, quantity=quantity)
+
+    if quantity is not None:
+        raise ScanCodeError("Weighed labels cannot take a quantity")
+    weight = Decimal(int(upc[6:11])) * WEIGHT_SCALE
+    if weight <= 0:
+        raise ScanCodeError("Label weight must be positive")
+    return ScanCode(sku=code, embedded_sku=upc[:6], weight_lbs=weight)
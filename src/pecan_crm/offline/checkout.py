@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from pecan_crm.db.repositories.sales import FinalizeSaleInput
+from pecan_crm.domain.pricing import SaleLine, calculate_totals, line_subtotal
+from pecan_crm.offline.payloads import finalize_payload_to_json
+from pecan_crm.offline.queue import OfflineSaleQueue
+from pecan_crm.services.receipt_storage import ReceiptStore
+from pecan_crm.services.receipts import ReceiptData, ReceiptLine
+
+
+@dataclass(frozen=True)
+class LocalCartLine:
+    product_name: str
+    unit_type: str
+    unit_price: Decimal
+    quantity: Decimal | None
+    weight_lbs: Decimal | None
+
+
+@dataclass(frozen=True)
+class LocalFinalizeResult:
+    queue_id: int
+    receipt_number: str
+    receipt_path: Path
+    total: Decimal
+
+
+def finalize_locally(
+    queue: OfflineSaleQueue,
+    payload: FinalizeSaleInput,
+    cart: list[LocalCartLine],
+    *,
+    customer_summary: str = "",
+) -> LocalFinalizeResult:
+    """Price a sale from the cart, commit it to the offline queue and write a provisional receipt.
+
+    Prices come from the cart as rung up. The queued payload carries those prices and totals,
+    so replay records what the customer was charged; the server's receipt (with the
+    authoritative number) replaces this one.
+    """
+    if not cart:
+        raise ValueError("Cart is empty")
+    if len(cart) != len(payload.cart_lines):
+        raise ValueError("Cart does not match the sale being finalized")
+    payment_method = payload.payment_method.upper().strip()
+    if payment_method not in {"CASH", "CARD", "OTHER"}:
+        raise ValueError("Payment method must be CASH, CARD, or OTHER")
+
+    sale_lines = [
+        SaleLine(
+            unit_type=line.unit_type,
+            unit_price=line.unit_price,
+            quantity=line.quantity,
+            weight_lbs=line.weight_lbs,
+        )
+        for line in cart
+    ]
+    totals = calculate_totals(
+        sale_lines,
+        tax_enabled=payload.tax_enabled,
+        tax_rate_percent=payload.tax_rate_percent,
+        discount_type=payload.discount_type,
+        discount_value=payload.discount_value,
+    )
+
+    payload = replace(
+        payload,
+        cart_lines=[
+            replace(cart_line, unit_price=line.unit_price)
+            for cart_line, line in zip(payload.cart_lines, cart, strict=True)
+        ],
+        charged_totals=totals,
+        sold_at_utc=payload.sold_at_utc or datetime.utcnow(),
+    )
+    queue_id, receipt_number = queue.enqueue_provisional(
+        idempotency_key=payload.idempotency_key,
+        payload=finalize_payload_to_json(payload),
+    )
+
+    receipt = ReceiptData(
+        receipt_number=receipt_number,
+        sold_at_local=payload.sold_at_utc,
+        business_name=payload.business_name,
+        business_address=payload.business_address,
+        business_phone=payload.business_phone,
+        payment_method=payment_method,
+        customer_summary=customer_summary,
+        subtotal=totals.subtotal,
+        discount_total=totals.discount_total,
+        tax_total=totals.tax_total,
+        total=totals.total,
+        lines=[
+            ReceiptLine(
+                name=line.product_name,
+                unit_type=line.unit_type,
+                quantity=line.quantity,
+                weight_lbs=line.weight_lbs,
+                unit_price=line.unit_price,
+                line_subtotal=line_subtotal(sale_line),
+            )
+            for line, sale_line in zip(cart, sale_lines, strict=True)
+        ],
+    )
+    receipt_path = ReceiptStore(payload.receipt_folder).save(receipt)
+    return LocalFinalizeResult(
+        queue_id=queue_id,
+        receipt_number=receipt_number,
+        receipt_path=receipt_path,
+        total=totals.total,
+    )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from pecan_crm.db.repositories.sales import CartLineInput, FinalizeSaleInput
+from pecan_crm.domain.pricing import SaleTotals
+
+_TOTAL_FIELDS = ("subtotal", "discount_total", "taxable_subtotal", "tax_total", "total")
+
+
+def _decimal_or_none(value: Any) -> Decimal | None:
+    return None if value is None else Decimal(str(value))
+
+
+def finalize_payload_to_json(payload: FinalizeSaleInput) -> dict[str, Any]:
+    """JSON-safe form of a finalize request; Decimals travel as strings so nothing is rounded."""
+    return {
+        "cart_lines": [
+            {
+                "product_id": line.product_id,
+                "quantity": None if line.quantity is None else str(line.quantity),
+                "weight_lbs": None if line.weight_lbs is None else str(line.weight_lbs),
+                "unit_price": None if line.unit_price is None else str(line.unit_price),
+            }
+            for line in payload.cart_lines
+        ],
+        "payment_method": payload.payment_method,
+        "customer_id": payload.customer_id,
+        "discount_type": payload.discount_type,
+        "discount_value": str(payload.discount_value),
+        "tax_enabled": payload.tax_enabled,
+        "tax_rate_percent": str(payload.tax_rate_percent),
+        "receipt_folder": str(payload.receipt_folder),
+        "business_name": payload.business_name,
+        "business_address": payload.business_address,
+        "business_phone": payload.business_phone,
+        "idempotency_key": payload.idempotency_key,
+        "sold_at_utc": None if payload.sold_at_utc is None else payload.sold_at_utc.isoformat(),
+        "charged_totals": (
+            None
+            if payload.charged_totals is None
+            else {name: str(getattr(payload.charged_totals, name)) for name in _TOTAL_FIELDS}
+        ),
+    }
+
+
+def finalize_payload_from_json(data: dict[str, Any]) -> FinalizeSaleInput:
+    try:
+        return FinalizeSaleInput(
+            cart_lines=[
+                CartLineInput(
+                    product_id=int(line["product_id"]),
+                    quantity=_decimal_or_none(line.get("quantity")),
+                    weight_lbs=_decimal_or_none(line.get("weight_lbs")),
+                    unit_price=_decimal_or_none(line.get("unit_price")),
+                )
+                for line in data["cart_lines"]
+            ],
+            payment_method=str(data["payment_method"]),
+            customer_id=None if data.get("customer_id") is None else int(data["customer_id"]),
+            discount_type=str(data["discount_type"]),
+            discount_value=Decimal(str(data["discount_value"])),
+            tax_enabled=bool(data["tax_enabled"]),
+            tax_rate_percent=Decimal(str(data["tax_rate_percent"])),
+            receipt_folder=Path(data["receipt_folder"]),
+            business_name=str(data.get("business_name", "")),
+            business_address=str(data.get("business_address", "")),
+            business_phone=str(data.get("business_phone", "")),
+            idempotency_key=str(data["idempotency_key"]),
+            sold_at_utc=(
+                datetime.fromisoformat(data["sold_at_utc"]) if data.get("sold_at_utc") else None
+            ),
+            charged_totals=(
+                SaleTotals(
+                    **{name: Decimal(str(data["charged_totals"][name])) for name in _TOTAL_FIELDS}
+                )
+                if data.get("charged_totals")
+                else None
+            ),
+        )
+    except (KeyError, TypeError, ArithmeticError) as exc:
+        raise ValueError(f"Queued sale payload is malformed: {exc}") from exc
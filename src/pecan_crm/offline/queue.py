@@ -1,12 +1,32 @@
 from __future__ import annotations
 
 import json
+import os
 import sqlite3
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any, Callable
 
+from pecan_crm.domain.receipt_numbers import format_provisional_receipt_number
+
+DEFAULT_MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 5.0
+BACKOFF_MAX_SECONDS = 900.0
+DEFAULT_RETENTION_DAYS = 30
+
+_ADDED_COLUMNS = {
+    "attempt_count": "INTEGER NOT NULL DEFAULT 0",
+    "next_attempt_at_utc": "TEXT NULL",
+    "provisional_receipt_number": "TEXT NULL",
+    "server_sale_id": "INTEGER NULL",
+    "server_receipt_number": "TEXT NULL",
+    "sent_at_utc": "TEXT NULL",
+}
+
 
 @dataclass(frozen=True)
 class QueuedSale:
@@ -14,22 +34,95 @@ class QueuedSale:
     idempotency_key: str
     payload_json: str
     created_at_utc: str
+    attempt_count: int = 0
+
+
+@dataclass(frozen=True)
+class ReplayAck:
+    """Server identity of a replayed sale, recorded against its provisional receipt."""
+
+    sale_id: int
+    receipt_number: str
+
+
+SaleSender = Callable[[str, dict[str, Any]], None]
+# Ships several queued sales in one round trip. Returns idempotency key -> error, or
+# None/ReplayAck on success; keys missing from the result count as failed attempts.
+BatchSender = Callable[[list[QueuedSale]], Mapping[str, ReplayAck | Exception | None]]
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    depth: int
+    dead: int
+    sent: int
+    oldest_pending_age_seconds: float | None
+    bytes_on_disk: int
+    max_pending: int | None
+
+    @property
+    def is_full(self) -> bool:
+        return self.max_pending is not None and self.depth >= self.max_pending
+
+
+class QueueFullError(RuntimeError):
+    """Raised by enqueue when max_pending unsent sales are already waiting."""
+
+
+class PermanentReplayError(Exception):
+    """Raised by a sender when a payload can never succeed; the item is dead-lettered."""
+
+
+def backoff_delay(attempt_count: int) -> timedelta:
+    seconds = BACKOFF_BASE_SECONDS * (2 ** max(attempt_count - 1, 0))
+    return timedelta(seconds=min(seconds, BACKOFF_MAX_SECONDS))
+
+
+def _utc_iso(value: datetime) -> str:
+    # Fixed precision keeps the stored text lexically ordered for due-time comparisons.
+    return value.astimezone(UTC).isoformat(timespec="microseconds")
 
 
 class OfflineSaleQueue:
-    def __init__(self, db_path: Path) -> None:
+    """Local SQLite queue of finalize payloads awaiting replay.
+
+    One connection is held for the queue's lifetime in WAL mode. With WAL,
+    synchronous=NORMAL only fsyncs at checkpoints: a committed enqueue survives an
+    app crash, and the database is never corrupted by power loss (the most recent
+    commits may be lost in that case). Pass synchronous="FULL" to fsync every commit.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        synchronous: str = "NORMAL",
+        max_pending: int | None = None,
+    ) -> None:
         self.db_path = db_path
+        self.max_pending = max_pending
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = self._connect(synchronous)
         self._init_db()
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self, synchronous: str) -> sqlite3.Connection:
+        if synchronous.upper() not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+            raise ValueError("synchronous must be OFF, NORMAL, FULL, or EXTRA")
+        # The sync worker replays from a background thread; access is serialized by _lock.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
         conn.row_factory = sqlite3.Row
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # auto_vacuum only changes on a rebuild; free for a new file, one-time for old ones.
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={synchronous.upper()}")
         return conn
 
     def _init_db(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
+        with self._lock, self._conn:
+            self._conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS queued_sales (
                     queue_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -41,61 +134,364 @@ class OfflineSaleQueue:
                 )
                 """
             )
-            conn.commit()
+            columns = {
+                str(r["name"]) for r in self._conn.execute("PRAGMA table_info(queued_sales)")
+            }
+            for name, ddl in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE queued_sales ADD COLUMN {name} {ddl}")
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS IX_queued_sales_status
+                ON queued_sales(status, queue_id)
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS IX_queued_sales_provisional
+                ON queued_sales(provisional_receipt_number)
+                """
+            )
+            # Outlives retention: a printed provisional receipt stays traceable to its sale.
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS provisional_receipts (
+                    provisional_receipt_number TEXT PRIMARY KEY,
+                    server_sale_id INTEGER NOT NULL,
+                    server_receipt_number TEXT NOT NULL
+                )
+                """
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> OfflineSaleQueue:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def enqueue(self, *, idempotency_key: str, payload: dict[str, Any]) -> int:
         payload_json = json.dumps(payload)
-        with self._connect() as conn:
-            conn.execute(
+        with self._lock, self._conn:
+            if self.max_pending is not None:
+                existing = self._conn.execute(
+                    "SELECT 1 FROM queued_sales WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if existing is None and self.depth() >= self.max_pending:
+                    raise QueueFullError(
+                        f"Offline queue is full ({self.max_pending} unsent sales). "
+                        "Reconnect to sync before taking more offline sales."
+                    )
+            self._conn.execute(
                 """
                 INSERT OR IGNORE INTO queued_sales(idempotency_key, payload_json, created_at_utc, status)
                 VALUES (?, ?, ?, 'PENDING')
                 """,
                 (idempotency_key, payload_json, datetime.now(UTC).isoformat()),
             )
-            conn.commit()
-            row = conn.execute(
+            row = self._conn.execute(
                 "SELECT queue_id FROM queued_sales WHERE idempotency_key = ?", (idempotency_key,)
             ).fetchone()
             return int(row["queue_id"])
 
     def pending(self) -> list[QueuedSale]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT queue_id, idempotency_key, payload_json, created_at_utc FROM queued_sales WHERE status = 'PENDING' ORDER BY queue_id"
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {_ITEM_COLUMNS} FROM queued_sales
+                WHERE status = 'PENDING'
+                ORDER BY queue_id
+                """
             ).fetchall()
-            return [
-                QueuedSale(
-                    queue_id=int(r["queue_id"]),
-                    idempotency_key=str(r["idempotency_key"]),
-                    payload_json=str(r["payload_json"]),
-                    created_at_utc=str(r["created_at_utc"]),
+        return [_item_from_row(r) for r in rows]
+
+    def enqueue_provisional(
+        self, *, idempotency_key: str, payload: dict[str, Any]
+    ) -> tuple[int, str]:
+        """Queue an offline-first sale and assign its provisional receipt number.
+
+        Re-enqueueing the same key returns the number issued the first time.
+        """
+        queue_id = self.enqueue(idempotency_key=idempotency_key, payload=payload)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE queued_sales SET provisional_receipt_number = ?
+                WHERE queue_id = ? AND provisional_receipt_number IS NULL
+                """,
+                (format_provisional_receipt_number(queue_id), queue_id),
+            )
+            row = self._conn.execute(
+                "SELECT provisional_receipt_number FROM queued_sales WHERE queue_id = ?",
+                (queue_id,),
+            ).fetchone()
+        return queue_id, str(row["provisional_receipt_number"])
+
+    def server_receipt_for(self, provisional_receipt_number: str) -> ReplayAck | None:
+        """Server sale and receipt number of a synced provisional receipt, None until synced."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT server_sale_id, server_receipt_number FROM queued_sales
+                WHERE provisional_receipt_number = ? AND server_receipt_number IS NOT NULL
+                UNION ALL
+                SELECT server_sale_id, server_receipt_number FROM provisional_receipts
+                WHERE provisional_receipt_number = ?
+                """,
+                (provisional_receipt_number, provisional_receipt_number),
+            ).fetchone()
+        if row is None:
+            return None
+        return ReplayAck(
+            sale_id=int(row["server_sale_id"]), receipt_number=str(row["server_receipt_number"])
+        )
+
+    def depth(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n FROM queued_sales WHERE status = 'PENDING'"
+            ).fetchone()
+        return int(row["n"])
+
+    def stats(self, *, now: datetime | None = None) -> QueueStats:
+        now = now or datetime.now(UTC)
+        with self._lock:
+            counts = {
+                str(r["status"]): int(r["n"])
+                for r in self._conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM queued_sales GROUP BY status"
                 )
-                for r in rows
-            ]
+            }
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at_utc) AS oldest FROM queued_sales WHERE status = 'PENDING'"
+            ).fetchone()["oldest"]
+        age = None
+        if oldest is not None:
+            age = max((now - datetime.fromisoformat(oldest)).total_seconds(), 0.0)
+        bytes_on_disk = sum(
+            os.path.getsize(path)
+            for path in (self.db_path, Path(f"{self.db_path}-wal"), Path(f"{self.db_path}-shm"))
+            if path.exists()
+        )
+        return QueueStats(
+            depth=counts.get("PENDING", 0),
+            dead=counts.get("DEAD", 0),
+            sent=counts.get("SENT", 0),
+            oldest_pending_age_seconds=age,
+            bytes_on_disk=bytes_on_disk,
+            max_pending=self.max_pending,
+        )
+
+    def purge_sent(
+        self, *, older_than_days: int = DEFAULT_RETENTION_DAYS, now: datetime | None = None
+    ) -> int:
+        """Delete SENT rows replayed more than older_than_days ago. PENDING and DEAD rows are kept.
+
+        The provisional-to-server receipt mapping of each purged row is kept in
+        provisional_receipts, so server_receipt_for() keeps resolving it.
+        """
+        cutoff = _utc_iso((now or datetime.now(UTC)) - timedelta(days=older_than_days))
+        expired = "status = 'SENT' AND COALESCE(sent_at_utc, created_at_utc) < ?"
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"""
+                INSERT OR REPLACE INTO provisional_receipts(
+                    provisional_receipt_number, server_sale_id, server_receipt_number
+                )
+                SELECT provisional_receipt_number, server_sale_id, server_receipt_number
+                FROM queued_sales
+                WHERE {expired}
+                    AND provisional_receipt_number IS NOT NULL
+                    AND server_sale_id IS NOT NULL
+                    AND server_receipt_number IS NOT NULL
+                """,
+                (cutoff,),
+            )
+            cursor = self._conn.execute(f"DELETE FROM queued_sales WHERE {expired}", (cutoff,))
+            return cursor.rowcount
+
+    def vacuum(self, *, max_pages: int | None = None) -> None:
+        """Return free pages to the OS (all of them, or at most max_pages)."""
+        with self._lock:
+            # execute() stops after the first page; executescript steps the pragma to completion.
+            pages = "" if max_pages is None else f"({int(max_pages)})"
+            self._conn.executescript(f"PRAGMA incremental_vacuum{pages};")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def maintain(
+        self, *, retention_days: int = DEFAULT_RETENTION_DAYS, now: datetime | None = None
+    ) -> dict[str, int]:
+        purged = self.purge_sent(older_than_days=retention_days, now=now)
+        if purged:
+            self.vacuum()
+        return {"purged": purged}
+
+    def due(self, *, now: datetime | None = None, limit: int | None = None) -> list[QueuedSale]:
+        """PENDING items whose backoff has elapsed, oldest first."""
+        now_iso = _utc_iso(now or datetime.now(UTC))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {_ITEM_COLUMNS} FROM queued_sales
+                WHERE status = 'PENDING'
+                  AND (next_attempt_at_utc IS NULL OR next_attempt_at_utc <= ?)
+                ORDER BY queue_id
+                LIMIT ?
+                """,
+                (now_iso, -1 if limit is None else limit),
+            ).fetchall()
+        return [_item_from_row(r) for r in rows]
+
+    def dead_letters(self) -> list[QueuedSale]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM queued_sales WHERE status = 'DEAD' ORDER BY queue_id"
+            ).fetchall()
+        return [_item_from_row(r) for r in rows]
+
+    def requeue_dead(self, queue_ids: list[int]) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                """
+                UPDATE queued_sales
+                SET status = 'PENDING', attempt_count = 0, next_attempt_at_utc = NULL
+                WHERE queue_id = ? AND status = 'DEAD'
+                """,
+                [(queue_id,) for queue_id in queue_ids],
+            )
+            return cursor.rowcount
+
+    def process_pending(
+        self,
+        sender: SaleSender,
+        *,
+        max_workers: int = 1,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        now: datetime | None = None,
+    ) -> dict[str, int]:
+        def send_one(batch: list[QueuedSale]) -> dict[str, Exception | None]:
+            item = batch[0]
+            sender(item.idempotency_key, json.loads(item.payload_json))
+            return {item.idempotency_key: None}
 
-    def process_pending(self, sender: Callable[[str, dict[str, Any]], None]) -> dict[str, int]:
-        sent = 0
-        failed = 0
+        return self.replay(
+            send_one,
+            batch_size=1,
+            max_workers=max_workers,
+            max_attempts=max_attempts,
+            now=now,
+        )
 
-        for item in self.pending():
-            payload = json.loads(item.payload_json)
+    def replay(
+        self,
+        batch_sender: BatchSender,
+        *,
+        batch_size: int = 50,
+        max_workers: int = 4,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        now: datetime | None = None,
+        limit: int | None = None,
+    ) -> dict[str, int]:
+        """Replay due items in batches on up to max_workers threads.
+
+        Each item keeps its idempotency key, so a batch that is retried after a
+        partial server-side success does not create duplicate sales.
+        """
+        now = now or datetime.now(UTC)
+        items = self.due(now=now, limit=limit)
+        batches = [items[i : i + batch_size] for i in range(0, len(items), max(batch_size, 1))]
+
+        def run(batch: list[QueuedSale]) -> dict[int, ReplayAck | Exception | None]:
             try:
-                sender(item.idempotency_key, payload)
-                with self._connect() as conn:
-                    conn.execute(
-                        "UPDATE queued_sales SET status = 'SENT', last_error = NULL WHERE queue_id = ?",
-                        (item.queue_id,),
-                    )
-                    conn.commit()
-                sent += 1
+                results = batch_sender(batch)
             except Exception as exc:
-                with self._connect() as conn:
-                    conn.execute(
-                        "UPDATE queued_sales SET status = 'PENDING', last_error = ? WHERE queue_id = ?",
-                        (str(exc), item.queue_id),
+                return {item.queue_id: exc for item in batch}
+            return {
+                item.queue_id: results.get(
+                    item.idempotency_key, RuntimeError("Sender returned no result for queued sale")
+                )
+                for item in batch
+            }
+
+        outcomes: dict[int, ReplayAck | Exception | None] = {}
+        if max_workers <= 1 or len(batches) <= 1:
+            for batch in batches:
+                outcomes.update(run(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+                for result in pool.map(run, batches):
+                    outcomes.update(result)
+
+        by_id = {item.queue_id: item for item in items}
+        sent_at = _utc_iso(now)
+        sent: list[tuple[str, int | None, str | None, int]] = []
+        retry: list[tuple[int, str, str, int]] = []
+        dead: list[tuple[int, str, int]] = []
+        for queue_id, error in outcomes.items():
+            if error is None or isinstance(error, ReplayAck):
+                ack = error
+                sent.append(
+                    (
+                        sent_at,
+                        ack.sale_id if ack else None,
+                        ack.receipt_number if ack else None,
+                        queue_id,
                     )
-                    conn.commit()
-                failed += 1
+                )
+                continue
+            attempts = by_id[queue_id].attempt_count + 1
+            if isinstance(error, PermanentReplayError) or attempts >= max_attempts:
+                dead.append((attempts, str(error), queue_id))
+            else:
+                retry.append(
+                    (attempts, _utc_iso(now + backoff_delay(attempts)), str(error), queue_id)
+                )
+
+        # One transaction per replay round instead of one commit per item. If the app
+        # dies mid-round, sent items stay PENDING and replay again under the same
+        # idempotency key, which the server treats as success.
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE queued_sales
+                SET status = 'SENT', last_error = NULL, sent_at_utc = ?,
+                    server_sale_id = COALESCE(?, server_sale_id),
+                    server_receipt_number = COALESCE(?, server_receipt_number)
+                WHERE queue_id = ?
+                """,
+                sent,
+            )
+            self._conn.executemany(
+                """
+                UPDATE queued_sales
+                SET status = 'PENDING', attempt_count = ?, next_attempt_at_utc = ?, last_error = ?
+                WHERE queue_id = ?
+                """,
+                retry,
+            )
+            self._conn.executemany(
+                """
+                UPDATE queued_sales
+                SET status = 'DEAD', attempt_count = ?, last_error = ?, next_attempt_at_utc = NULL
+                WHERE queue_id = ?
+                """,
+                dead,
+            )
+
+        return {"sent": len(sent), "failed": len(retry), "dead": len(dead)}
+
+
+_ITEM_COLUMNS = "queue_id, idempotency_key, payload_json, created_at_utc, attempt_count"
+
 
-        return {"sent": sent, "failed": failed}
+def _item_from_row(row: sqlite3.Row) -> QueuedSale:
+    return QueuedSale(
+        queue_id=int(row["queue_id"]),
+        idempotency_key=str(row["idempotency_key"]),
+        payload_json=str(row["payload_json"]),
+        created_at_utc=str(row["created_at_utc"]),
+        attempt_count=int(row["attempt_count"]),
+    )
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from pecan_crm.db.models import Customer, Product
+from pecan_crm.db.repositories.customers import CustomerRepository
+from pecan_crm.db.repositories.products import ProductRepository
+
+
+@dataclass(frozen=True)
+class ReplicaProduct:
+    product_id: int
+    sku: str | None
+    name: str
+    unit_type: str
+    unit_price: Decimal
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class ReplicaCustomer:
+    customer_id: int
+    first_name: str | None
+    last_name: str | None
+    phone: str | None
+    email: str | None
+    is_active: bool
+
+
+def _like_pattern(search: str) -> str:
+    escaped = search.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class LocalReplica:
+    """Read-only SQLite copy of products and customers for ring-up lookups.
+
+    pull() fetches rows whose updated_at_utc is at or after the stored watermark and upserts
+    them, so each refresh moves only what changed. Rows are never deleted upstream
+    (archiving clears is_active), so upserts are enough to stay current.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    product_id INTEGER PRIMARY KEY,
+                    sku TEXT NULL,
+                    name TEXT NOT NULL,
+                    unit_type TEXT NOT NULL,
+                    unit_price TEXT NOT NULL,
+                    is_active INTEGER NOT NULL,
+                    updated_at_utc TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS IX_products_active_name ON products(is_active, name);
+                CREATE TABLE IF NOT EXISTS customers (
+                    customer_id INTEGER PRIMARY KEY,
+                    first_name TEXT NULL,
+                    last_name TEXT NULL,
+                    phone TEXT NULL,
+                    email TEXT NULL,
+                    is_active INTEGER NOT NULL,
+                    updated_at_utc TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS IX_customers_active_name
+                    ON customers(is_active, last_name, first_name);
+                CREATE TABLE IF NOT EXISTS replica_state (
+                    table_name TEXT PRIMARY KEY,
+                    watermark_utc TEXT NULL,
+                    synced_at_utc TEXT NULL
+                );
+                """
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> LocalReplica:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def watermark(self, table_name: str) -> datetime | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark_utc FROM replica_state WHERE table_name = ?", (table_name,)
+            ).fetchone()
+        if row is None or row["watermark_utc"] is None:
+            return None
+        return datetime.fromisoformat(row["watermark_utc"])
+
+    def is_populated(self) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n FROM replica_state WHERE synced_at_utc IS NOT NULL"
+            ).fetchone()
+        return int(row["n"]) == 2
+
+    def pull(self, session_factory: sessionmaker[Session]) -> dict[str, int]:
+        products = ProductRepository(session_factory).changed_since(self.watermark("products"))
+        customers = CustomerRepository(session_factory).changed_since(self.watermark("customers"))
+        self.apply_products(products)
+        self.apply_customers(customers)
+        return {"products": len(products), "customers": len(customers)}
+
+    def apply_products(self, products: list[Product]) -> None:
+        rows = [
+            (
+                p.product_id,
+                p.sku,
+                p.name,
+                p.unit_type,
+                str(p.unit_price),
+                int(bool(p.is_active)),
+                p.updated_at_utc.isoformat(),
+            )
+            for p in products
+        ]
+        self._apply(
+            "products",
+            """
+            INSERT INTO products(
+                product_id, sku, name, unit_type, unit_price, is_active, updated_at_utc
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(product_id) DO UPDATE SET
+                sku = excluded.sku, name = excluded.name, unit_type = excluded.unit_type,
+                unit_price = excluded.unit_price, is_active = excluded.is_active,
+                updated_at_utc = excluded.updated_at_utc
+            """,
+            rows,
+            max((p.updated_at_utc for p in products), default=None),
+        )
+
+    def apply_customers(self, customers: list[Customer]) -> None:
+        rows = [
+            (
+                c.customer_id,
+                c.first_name,
+                c.last_name,
+                c.phone,
+                c.email,
+                int(bool(c.is_active)),
+                c.updated_at_utc.isoformat(),
+            )
+            for c in customers
+        ]
+        self._apply(
+            "customers",
+            """
+            INSERT INTO customers(
+                customer_id, first_name, last_name, phone, email, is_active, updated_at_utc
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(customer_id) DO UPDATE SET
+                first_name = excluded.first_name, last_name = excluded.last_name,
+                phone = excluded.phone, email = excluded.email, is_active = excluded.is_active,
+                updated_at_utc = excluded.updated_at_utc
+            """,
+            rows,
+            max((c.updated_at_utc for c in customers), default=None),
+        )
+
+    def _apply(
+        self, table_name: str, upsert_sql: str, rows: list[tuple], newest: datetime | None
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(upsert_sql, rows)
+            # Keep the old watermark when nothing changed; an empty first pull still
+            # marks the table as synced so reads switch to the replica.
+            self._conn.execute(
+                """
+                INSERT INTO replica_state(table_name, watermark_utc, synced_at_utc)
+                VALUES (?, ?, ?)
+                ON CONFLICT(table_name) DO UPDATE SET
+                    watermark_utc = COALESCE(excluded.watermark_utc, replica_state.watermark_utc),
+                    synced_at_utc = excluded.synced_at_utc
+                """,
+                (table_name, newest.isoformat() if newest else None, datetime.utcnow().isoformat()),
+            )
+
+    def list_active_products(self, *, search: str = "") -> list[ReplicaProduct]:
+        query = "SELECT * FROM products WHERE is_active = 1"
+        params: tuple[str, ...] = ()
+        if search.strip():
+            query += " AND (name LIKE ? ESCAPE '\\' OR sku LIKE ? ESCAPE '\\')"
+            params = (_like_pattern(search),) * 2
+        with self._lock:
+            rows = self._conn.execute(f"{query} ORDER BY name", params).fetchall()
+        return [
+            ReplicaProduct(
+                product_id=int(r["product_id"]),
+                sku=r["sku"],
+                name=str(r["name"]),
+                unit_type=str(r["unit_type"]),
+                unit_price=Decimal(r["unit_price"]),
+                is_active=bool(r["is_active"]),
+            )
+            for r in rows
+        ]
+
+    def search_customers(self, search: str) -> list[ReplicaCustomer]:
+        query = "SELECT * FROM customers WHERE is_active = 1"
+        params: tuple[str, ...] = ()
+        if search.strip():
+            query += (
+                " AND (first_name LIKE ? ESCAPE '\\' OR last_name LIKE ? ESCAPE '\\'"
+                " OR phone LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\')"
+            )
+            params = (_like_pattern(search),) * 4
+        with self._lock:
+            rows = self._conn.execute(f"{query} ORDER BY last_name, first_name", params).fetchall()
+        return [
+            ReplicaCustomer(
+                customer_id=int(r["customer_id"]),
+                first_name=r["first_name"],
+                last_name=r["last_name"],
+                phone=r["phone"],
+                email=r["email"],
+                is_active=bool(r["is_active"]),
+            )
+            for r in rows
+        ]
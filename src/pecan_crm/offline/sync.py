@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import logging
+import socket
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from pecan_crm.db.repositories.sales import FinalizePartialFailure, SalesRepository
+from pecan_crm.offline.payloads import finalize_payload_from_json
+from pecan_crm.offline.queue import (
+    DEFAULT_RETENTION_DAYS,
+    BatchSender,
+    OfflineSaleQueue,
+    PermanentReplayError,
+    QueuedSale,
+    ReplayAck,
+)
+from pecan_crm.offline.replica import LocalReplica
+
+LOGGER = logging.getLogger(__name__)
+
+SQL_SERVER_PORT = 1433
+MAX_IDLE_SECONDS = 300.0
+MAINTENANCE_INTERVAL_SECONDS = 3600.0
+
+
+@dataclass(frozen=True)
+class SyncStatus:
+    online: bool
+    depth: int
+    last_sync_at_utc: datetime | None
+    last_error: str = ""
+    queue_full: bool = False
+    oldest_pending_age_seconds: float | None = None
+
+
+def tcp_probe(host: str, port: int = SQL_SERVER_PORT, *, timeout_seconds: float = 2.0) -> bool:
+    """Cheap reachability check: a TCP handshake, no login or query."""
+    if not host.strip():
+        return False
+    try:
+        with socket.create_connection((host.strip(), port), timeout=timeout_seconds):
+            return True
+    except OSError:
+        return False
+
+
+def sales_batch_sender(repo: SalesRepository) -> BatchSender:
+    """Replay queued finalize payloads through SalesRepository.finalize_sale.
+
+    finalize_sale is idempotent on the payload key, so an item that committed on the
+    server before a dropped connection is reported as sent on the next attempt.
+    """
+
+    def send(batch: list[QueuedSale]) -> dict[str, ReplayAck | Exception | None]:
+        results: dict[str, ReplayAck | Exception | None] = {}
+        for item in batch:
+            try:
+                payload = finalize_payload_from_json(json.loads(item.payload_json))
+                result = repo.finalize_sale(payload, replay=True)
+                results[item.idempotency_key] = ReplayAck(result.sale_id, result.receipt_number)
+            except FinalizePartialFailure as exc:
+                # Sale is committed; the receipt can be regenerated from Sales History.
+                results[item.idempotency_key] = ReplayAck(exc.sale_id, exc.receipt_number)
+            except ValueError as exc:
+                results[item.idempotency_key] = PermanentReplayError(str(exc))
+            except Exception as exc:
+                results[item.idempotency_key] = exc
+        return results
+
+    return send
+
+
+class OfflineSyncService:
+    """Background thread that drains the offline queue whenever the database is reachable.
+
+    The loop waits interval_seconds between rounds, doubling up to MAX_IDLE_SECONDS while the
+    probe fails. When a replica is configured, each online round also pulls product and
+    customer changes into it. Once an hour the queue purges old SENT rows and vacuums.
+    Status updates go to on_status from the worker thread; GUI callers must marshal them
+    (see pecan_crm.app.offline_sync).
+    """
+
+    def __init__(
+        self,
+        queue: OfflineSaleQueue,
+        *,
+        probe: Callable[[], bool],
+        sender_factory: Callable[[], BatchSender],
+        interval_seconds: float = 15.0,
+        on_status: Callable[[SyncStatus], None] | None = None,
+        replica: LocalReplica | None = None,
+        replica_session_factory: Callable[[], sessionmaker[Session]] | None = None,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+    ) -> None:
+        self.queue = queue
+        self.probe = probe
+        self.sender_factory = sender_factory
+        self.interval_seconds = interval_seconds
+        self.on_status = on_status
+        self.replica = replica
+        self.replica_session_factory = replica_session_factory
+        self.retention_days = retention_days
+        self._last_maintenance: float | None = None
+        self.last_sync_at_utc: datetime | None = None
+        self._sender: BatchSender | None = None
+        self._offline_rounds = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="offline-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout_seconds)
+            if self._thread.is_alive():
+                LOGGER.warning("Offline sync thread did not stop within %.1fs", timeout_seconds)
+            self._thread = None
+
+    def wake(self) -> None:
+        """Run the next round now, e.g. right after a sale was queued."""
+        self._wake.set()
+
+    def run_once(self) -> SyncStatus:
+        error = ""
+        online = self.probe()
+        if online:
+            self._offline_rounds = 0
+            try:
+                if self._sender is None:
+                    self._sender = self.sender_factory()
+                result = self.queue.replay(self._sender)
+                self.last_sync_at_utc = datetime.now(UTC)
+                if result["sent"] or result["failed"] or result["dead"]:
+                    LOGGER.info("Offline sync round: %s", result)
+                if self.replica is not None and self.replica_session_factory is not None:
+                    pulled = self.replica.pull(self.replica_session_factory())
+                    if pulled["products"] or pulled["customers"]:
+                        LOGGER.debug("Replica refreshed: %s", pulled)
+            except Exception as exc:
+                LOGGER.exception("Offline sync round failed")
+                self._sender = None
+                error = str(exc)
+        else:
+            self._offline_rounds += 1
+
+        self._maybe_maintain()
+        stats = self.queue.stats()
+        status = SyncStatus(
+            online=online,
+            depth=stats.depth,
+            last_sync_at_utc=self.last_sync_at_utc,
+            last_error=error,
+            queue_full=stats.is_full,
+            oldest_pending_age_seconds=stats.oldest_pending_age_seconds,
+        )
+        if self.on_status is not None:
+            self.on_status(status)
+        return status
+
+    def _maybe_maintain(self) -> None:
+        now = time.monotonic()
+        last = self._last_maintenance
+        if last is not None and now - last < MAINTENANCE_INTERVAL_SECONDS:
+            return
+        self._last_maintenance = now
+        try:
+            result = self.queue.maintain(retention_days=self.retention_days)
+            if result["purged"]:
+                LOGGER.info("Offline queue maintenance: %s", result)
+        except Exception:
+            LOGGER.exception("Offline queue maintenance failed")
+
+    def next_delay_seconds(self) -> float:
+        return min(self.interval_seconds * (2 ** min(self._offline_rounds, 8)), MAX_IDLE_SECONDS)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                LOGGER.exception("Offline sync status update failed")
+            self._wake.wait(self.next_delay_seconds())
+            self._wake.clear()
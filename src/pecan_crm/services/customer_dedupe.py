@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from pecan_crm.db.models import Customer
+from pecan_crm.domain.customer_keys import normalize_phone, normalize_text
+
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MAX_BLOCK_SIZE = 50
+DEFAULT_WINDOW = 8
+PHONE_SUFFIX_LENGTH = 7
+MIN_EMAIL_LOCAL_LENGTH = 6
+FETCH_CHUNK_SIZE = 5000
+
+# First-name similarity assumed when one side is blank or an initial that agrees.
+_UNKNOWN_FIRST_SIMILARITY = 0.8
+_INITIAL_SIMILARITY = 0.9
+
+
+@dataclass(frozen=True, slots=True)
+class DedupeRecord:
+    customer_id: str
+    first_name: str
+    last_name: str
+    phone: str
+    email: str
+    is_active: bool = True
+
+
+@dataclass(frozen=True)
+class DedupeMember:
+    record: DedupeRecord
+    # Best link score into the cluster; the survivor carries 1.0.
+    score: float
+    reason: str
+
+
+@dataclass(frozen=True)
+class DedupeCluster:
+    cluster_id: int
+    survivor_id: str
+    members: list[DedupeMember]
+
+
+@dataclass
+class DedupeStats:
+    records: int = 0
+    blocks: int = 0
+    oversized_blocks: int = 0
+    comparisons: int = 0
+    clusters: int = 0
+    clustered_records: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _Keys:
+    first: str
+    last: str
+    phone: str
+    email: str
+
+
+def soundex(value: str) -> str:
+    """American Soundex code ("Robert" -> "R163"); empty for values without letters."""
+    letters = [ch for ch in value.upper() if "A" <= ch <= "Z"]
+    if not letters:
+        return ""
+    code = [letters[0]]
+    previous = _SOUNDEX_DIGITS.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_DIGITS.get(ch, "")
+        if digit and digit != previous:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code; vowels do.
+        if ch not in "HW":
+            previous = digit
+    return "".join(code).ljust(4, "0")
+
+
+_SOUNDEX_DIGITS = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def jaro_winkler(a: str, b: str, *, prefix_scale: float = 0.1) -> float:
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    match_distance = max(max(len_a, len_b) // 2 - 1, 0)
+    b_matched = [False] * len_b
+    a_matches: list[str] = []
+    for i, ch in enumerate(a):
+        hi = min(i + match_distance + 1, len_b)
+        j = b.find(ch, max(0, i - match_distance), hi)
+        while j != -1 and b_matched[j]:
+            j = b.find(ch, j + 1, hi)
+        if j != -1:
+            b_matched[j] = True
+            a_matches.append(ch)
+    matches = len(a_matches)
+    if not matches:
+        return 0.0
+
+    b_matches = [ch for ch, matched in zip(b, b_matched, strict=True) if matched]
+    transpositions = sum(ch_a != ch_b for ch_a, ch_b in zip(a_matches, b_matches, strict=True))
+
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions / 2) / matches) / 3
+    prefix = 0
+    for ch_a, ch_b in zip(a[:4], b[:4], strict=False):
+        if ch_a != ch_b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def _email_parts(email: str) -> tuple[str, str]:
+    local, _, domain = email.partition("@")
+    # Sub-addressing ("ann+pecans@") routes to the same mailbox.
+    return local.split("+", 1)[0], domain
+
+
+def _keys(record: DedupeRecord) -> _Keys:
+    local, domain = _email_parts(normalize_text(record.email))
+    return _Keys(
+        first=normalize_text(record.first_name),
+        last=normalize_text(record.last_name),
+        phone=normalize_phone(record.phone),
+        email=f"{local}@{domain}" if local and domain else "",
+    )
+
+
+def blocking_keys(keys: _Keys) -> list[str]:
+    """Cheap keys that near-duplicates are likely to share.
+
+    Only records sharing at least one key are compared.
+    """
+    blocks = []
+    if len(keys.phone) >= PHONE_SUFFIX_LENGTH:
+        blocks.append(f"p:{keys.phone[-PHONE_SUFFIX_LENGTH:]}")
+    if keys.email:
+        blocks.append(f"e:{keys.email}")
+        local = keys.email.partition("@")[0]
+        if len(local) >= MIN_EMAIL_LOCAL_LENGTH:
+            blocks.append(f"l:{local}")
+    if keys.last:
+        blocks.append(f"n:{soundex(keys.last)}{keys.first[:1]}")
+    return blocks
+
+
+def _first_similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return _UNKNOWN_FIRST_SIMILARITY
+    if (len(a) == 1 or len(b) == 1) and a[0] == b[0]:
+        return _INITIAL_SIMILARITY
+    return jaro_winkler(a, b)
+
+
+def name_similarity(a: _Keys, b: _Keys) -> float:
+    if not a.last or not b.last:
+        full_a = f"{a.first} {a.last}".strip()
+        full_b = f"{b.first} {b.last}".strip()
+        return jaro_winkler(full_a, full_b) if full_a and full_b else 0.0
+    # Multiplying keeps "Mary Smith" / "John Smith" (same household phone) apart.
+    straight = _first_similarity(a.first, b.first) * jaro_winkler(a.last, b.last)
+    if a.first and b.first and straight < 1.0:
+        swapped = jaro_winkler(a.first, b.last) * jaro_winkler(a.last, b.first)
+        return max(straight, swapped)
+    return straight
+
+
+def score_pair(a: _Keys, b: _Keys, *, floor: float = 0.0) -> tuple[float, str]:
+    """Match score in [0, 1] and the evidence behind it.
+
+    Pairs that cannot reach floor whatever their names are rejected before any string
+    comparison; most pairs in a name block fail that way on conflicting contact details.
+    """
+    email_match = bool(a.email) and a.email == b.email
+    phone_match = bool(a.phone) and a.phone == b.phone
+    if not (email_match or phone_match):
+        conflict = (a.phone and b.phone) or (a.email and b.email)
+        weight = 0.7 if conflict else 0.9
+        if weight < floor:
+            return 0.0, ""
+        return name_similarity(a, b) * weight, "name"
+
+    name = name_similarity(a, b)
+    score = 0.6 + 0.4 * name if email_match else 0.4 + 0.6 * name
+    if email_match and phone_match:
+        score = min(1.0, score + 0.1)
+    reason = "+".join(part for part, hit in (("email", email_match), ("phone", phone_match)) if hit)
+    return score, f"{reason}+name" if name >= 0.9 else reason
+
+
+class _UnionFind:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+@dataclass
+class CustomerDedupeEngine:
+    """Blocking + pairwise scoring + union-find clustering for customer duplicates.
+
+    Records stream in through add(); each is filed under a few blocking keys (phone
+    suffix, canonical email, email local part, last-name Soundex plus first initial).
+    clusters() compares pairs only within a block: every pair for blocks up to
+    max_block_size, a sorted-neighbourhood window for larger ones. Pairs scoring at or
+    above threshold are linked, and linked components become clusters. Work therefore
+    grows with the number of records times block size rather than n².
+    """
+
+    threshold: float = DEFAULT_THRESHOLD
+    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE
+    window: int = DEFAULT_WINDOW
+    stats: DedupeStats = field(default_factory=DedupeStats)
+    _records: list[DedupeRecord] = field(default_factory=list, repr=False)
+    _keys: list[_Keys] = field(default_factory=list, repr=False)
+    # A block holds a bare index until a second record shares the key.
+    _blocks: dict[str, int | list[int]] = field(default_factory=dict, repr=False)
+
+    def add(self, record: DedupeRecord) -> None:
+        index = len(self._records)
+        keys = _keys(record)
+        self._records.append(record)
+        self._keys.append(keys)
+        blocks = self._blocks
+        for key in blocking_keys(keys):
+            existing = blocks.get(key)
+            if existing is None:
+                blocks[key] = index
+            elif isinstance(existing, int):
+                blocks[key] = [existing, index]
+            else:
+                existing.append(index)
+
+    def add_many(self, records: Iterable[DedupeRecord]) -> None:
+        for record in records:
+            self.add(record)
+
+    def clusters(self) -> list[DedupeCluster]:
+        keys = self._keys
+        links = _UnionFind(len(keys))
+        best: dict[int, tuple[float, str]] = {}
+        stats = self.stats
+        stats.records = len(keys)
+        stats.comparisons = 0
+        stats.blocks = 0
+        stats.oversized_blocks = 0
+
+        def consider(i: int, j: int) -> None:
+            if links.find(i) == links.find(j):
+                return
+            stats.comparisons += 1
+            score, reason = score_pair(keys[i], keys[j], floor=self.threshold)
+            if score < self.threshold:
+                return
+            links.union(i, j)
+            for member in (i, j):
+                if score > best.get(member, (0.0, ""))[0]:
+                    best[member] = (score, reason)
+
+        for members in self._blocks.values():
+            if isinstance(members, int):
+                continue
+            stats.blocks += 1
+            if len(members) <= self.max_block_size:
+                for offset, i in enumerate(members):
+                    for j in members[offset + 1 :]:
+                        consider(i, j)
+            else:
+                stats.oversized_blocks += 1
+                ordered = sorted(
+                    members, key=lambda idx: (keys[idx].last, keys[idx].first, keys[idx].phone)
+                )
+                for offset, i in enumerate(ordered):
+                    for j in ordered[offset + 1 : offset + 1 + self.window]:
+                        consider(i, j)
+
+        groups: dict[int, list[int]] = {}
+        for member in best:
+            groups.setdefault(links.find(member), []).append(member)
+
+        clusters = []
+        for indexes in groups.values():
+            survivor = max(indexes, key=self._survivor_rank)
+            members = [
+                DedupeMember(
+                    record=self._records[idx],
+                    score=1.0 if idx == survivor else round(best[idx][0], 4),
+                    reason="survivor" if idx == survivor else best[idx][1],
+                )
+                for idx in sorted(indexes, key=lambda idx: idx != survivor)
+            ]
+            clusters.append((self._records[survivor].customer_id, members))
+
+        clusters.sort(key=lambda item: _id_sort_key(item[0]))
+        stats.clusters = len(clusters)
+        stats.clustered_records = len(best)
+        return [
+            DedupeCluster(cluster_id=number, survivor_id=survivor_id, members=members)
+            for number, (survivor_id, members) in enumerate(clusters, start=1)
+        ]
+
+    def _survivor_rank(self, index: int) -> tuple:
+        # Prefer active, then the most complete record, then the oldest id.
+        record = self._records[index]
+        filled = sum(
+            bool(value.strip())
+            for value in (record.first_name, record.last_name, record.phone, record.email)
+        )
+        return (record.is_active, filled, _negated(_id_sort_key(record.customer_id)))
+
+
+def _id_sort_key(customer_id: str) -> tuple[int, int, str]:
+    return (0, int(customer_id), "") if customer_id.isdigit() else (1, 0, customer_id)
+
+
+def _negated(key: tuple[int, int, str]) -> tuple[int, int, tuple[int, ...]]:
+    return (-key[0], -key[1], tuple(-ord(ch) for ch in key[2]))
+
+
+def _pick(row: dict[str, str], *candidates: str) -> str:
+    for key in candidates:
+        if key in row and str(row[key]).strip():
+            return str(row[key]).strip()
+    return ""
+
+
+def iter_csv_records(path: Path) -> Iterator[DedupeRecord]:
+    """Stream customers from an Access/CSV export (same column aliases as the migration script)."""
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            active = _pick(row, "IsActive", "is_active").lower()
+            yield DedupeRecord(
+                customer_id=_pick(row, "CustomerID", "customer_id", "ID", "Id"),
+                first_name=_pick(row, "FirstName", "first_name"),
+                last_name=_pick(row, "LastName", "last_name"),
+                phone=_pick(row, "Phone", "phone"),
+                email=_pick(row, "Email", "email"),
+                is_active=active not in {"0", "false", "no"},
+            )
+
+
+def iter_db_records(
+    session_factory: sessionmaker[Session], *, chunk_size: int = FETCH_CHUNK_SIZE
+) -> Iterator[DedupeRecord]:
+    """Stream customers from the live table in keyset-paged chunks of plain columns."""
+    last_id = 0
+    while True:
+        with session_factory() as session:
+            rows = session.execute(
+                select(
+                    Customer.customer_id,
+                    Customer.first_name,
+                    Customer.last_name,
+                    Customer.phone,
+                    Customer.email,
+                    Customer.is_active,
+                )
+                .where(Customer.customer_id > last_id)
+                .order_by(Customer.customer_id)
+                .limit(chunk_size)
+            ).all()
+        if not rows:
+            return
+        for row in rows:
+            yield DedupeRecord(
+                customer_id=str(row.customer_id),
+                first_name=row.first_name or "",
+                last_name=row.last_name or "",
+                phone=row.phone or "",
+                email=row.email or "",
+                is_active=bool(row.is_active),
+            )
+        last_id = rows[-1].customer_id
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from pecan_crm.db.models import Customer
+from pecan_crm.db.session import database_key
+
+
+REFRESH_INTERVAL_SECONDS = 30.0
+FETCH_CHUNK_SIZE = 1000
+
+SCORE_EXACT = 100
+SCORE_PREFIX = 75
+SCORE_SUBSTRING = 50
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+_NON_DIGITS = re.compile(r"\D+")
+
+
+# Fields are joined with NUL so exact, prefix and substring checks are single `in` tests.
+_SEP = "\x00"
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    is_active: bool
+    # SEP-delimited normalized full name, first, last, email, phone as typed, phone digits.
+    field_text: str
+    # field_text plus every word token, for prefix checks.
+    prefix_text: str
+    phone_digits: str
+    # "last SEP first SEP zero-padded id": one string compare per sort step.
+    sort_key: str
+
+
+def _normalize(value: str | None) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _fields(customer: Customer) -> tuple[str, ...]:
+    first = _normalize(customer.first_name)
+    last = _normalize(customer.last_name)
+    phone = _normalize(customer.phone)
+    return (
+        f"{first} {last}".strip(),
+        first,
+        last,
+        _normalize(customer.email),
+        phone,
+        _NON_DIGITS.sub("", phone),
+    )
+
+
+def _entry_for(
+    customer_id: int, is_active: bool, fields: tuple[str, ...], tokens: set[str]
+) -> _Entry:
+    field_text = _SEP + _SEP.join(fields) + _SEP
+    return _Entry(
+        is_active=is_active,
+        field_text=field_text,
+        prefix_text=field_text + _SEP.join(tokens),
+        phone_digits=fields[5],
+        sort_key=f"{fields[2]}{_SEP}{fields[1]}{_SEP}{customer_id:012d}",
+    )
+
+
+def _tokens(fields: tuple[str, ...]) -> set[str]:
+    return {token for field in fields for token in _TOKEN_SPLIT.split(field) if token}
+
+
+def _score(entry: _Entry, term: str, exact: str, prefix: str, digits: str) -> int:
+    if exact in entry.field_text or (digits and digits == entry.phone_digits):
+        return SCORE_EXACT
+    if prefix in entry.prefix_text:
+        return SCORE_PREFIX
+    if len(term) >= 3 and (term in entry.field_text or (digits and digits in entry.phone_digits)):
+        return SCORE_SUBSTRING
+    return 0
+
+
+class CustomerSearchIndex:
+    """In-process trigram index over customer name, phone and email.
+
+    Queries of three or more characters look up the rarest trigram's posting list and verify
+    each candidate, so cost tracks the number of plausible matches rather than table size.
+    Shorter queries match token prefixes only. Results rank exact field matches first, then
+    prefix, then substring matches, ties broken by last and first name.
+
+    Posting lists are append-only; superseded entries are filtered out on verification and
+    the lists are rebuilt once stale postings outnumber live ones.
+    """
+
+    def __init__(self, *, refresh_interval_seconds: float = REFRESH_INTERVAL_SECONDS) -> None:
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.watermark: datetime | None = None
+        self._entries: dict[int, _Entry] = {}
+        self._grams: dict[str, array[int]] = defaultdict(_postings)
+        self._prefixes: dict[str, array[int]] = defaultdict(_postings)
+        self._live_postings = 0
+        self._stale_postings = 0
+        self._last_refresh: float | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self, session_factory: sessionmaker[Session], *, force: bool = False) -> int:
+        """Pull customers changed since the watermark, at most once per refresh interval."""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and self._last_refresh is not None
+                and now - self._last_refresh < self.refresh_interval_seconds
+            ):
+                return 0
+            with session_factory() as session:
+                query = select(Customer)
+                if self.watermark is not None:
+                    query = query.where(Customer.updated_at_utc >= self.watermark)
+                changed = list(session.scalars(query))
+            self.upsert(changed)
+            self._last_refresh = now
+            return len(changed)
+
+    def upsert(self, customers: Iterable[Customer]) -> None:
+        with self._lock:
+            for customer in customers:
+                fields = _fields(customer)
+                entry = _entry_for(
+                    customer.customer_id, bool(customer.is_active), fields, _tokens(fields)
+                )
+                previous = self._entries.get(customer.customer_id)
+                self._entries[customer.customer_id] = entry
+                if customer.updated_at_utc is not None and (
+                    self.watermark is None or customer.updated_at_utc > self.watermark
+                ):
+                    self.watermark = customer.updated_at_utc
+                if previous is not None and previous.field_text == entry.field_text:
+                    continue
+                if previous is not None:
+                    self._stale_postings += self._add_postings(
+                        customer.customer_id, previous, dry_run=True
+                    )
+                self._add_postings(customer.customer_id, entry)
+
+            if self._stale_postings > max(self._live_postings, 10_000):
+                self._rebuild_postings()
+
+    def search(
+        self, term: str, *, include_inactive: bool = True, limit: int | None = None
+    ) -> list[int]:
+        """Customer ids matching term, best match first."""
+        query = _normalize(term)
+        if not query:
+            return []
+        digits = _NON_DIGITS.sub("", query)
+        phone_digits = digits if len(digits) >= 3 else ""
+        exact = f"{_SEP}{query}{_SEP}"
+        prefix = f"{_SEP}{query}"
+
+        with self._lock:
+            candidates = self._candidates(query, phone_digits)
+            entries = self._entries
+            ranked: list[tuple[int, str, int]] = []
+            for customer_id in candidates:
+                entry = entries.get(customer_id)
+                if entry is None or (not include_inactive and not entry.is_active):
+                    continue
+                score = _score(entry, query, exact, prefix, phone_digits)
+                if score:
+                    ranked.append((-score, entry.sort_key, customer_id))
+
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, ranked)
+        else:
+            ranked.sort()
+        return [customer_id for _, _, customer_id in ranked]
+
+    def _candidates(self, query: str, digits: str) -> set[int]:
+        if len(query) < 3:
+            return set(self._prefixes.get(query, ()))
+
+        candidates: set[int] = set()
+        for text in {query, digits} - {""}:
+            postings = [self._grams.get(gram) for gram in _trigrams(text)]
+            if all(postings):
+                candidates.update(min(postings, key=len))
+        return candidates
+
+    def _add_postings(self, customer_id: int, entry: _Entry, *, dry_run: bool = False) -> int:
+        # First and last name grams are covered by the full name, the typed phone by its
+        # digits (queries are matched on both their text and their digits).
+        full_name, _, _, email, _, phone_digits = entry.field_text[1:-1].split(_SEP)
+        grams = _trigrams(full_name) | _trigrams(email) | _trigrams(phone_digits)
+        prefixes = {token[:2] for token in entry.prefix_text.split(_SEP) if token}
+        prefixes |= {prefix[:1] for prefix in prefixes}
+        if not dry_run:
+            gram_postings = self._grams
+            for gram in grams:
+                gram_postings[gram].append(customer_id)
+            prefix_postings = self._prefixes
+            for prefix in prefixes:
+                prefix_postings[prefix].append(customer_id)
+            self._live_postings += len(grams) + len(prefixes)
+        return len(grams) + len(prefixes)
+
+    def _rebuild_postings(self) -> None:
+        self._grams = defaultdict(_postings)
+        self._prefixes = defaultdict(_postings)
+        self._live_postings = 0
+        self._stale_postings = 0
+        for customer_id, entry in self._entries.items():
+            self._add_postings(customer_id, entry)
+
+
+def _postings() -> array[int]:
+    return array("I")
+
+
+_INDEXES: dict[str, CustomerSearchIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def customer_search_index(session_factory: sessionmaker[Session]) -> CustomerSearchIndex:
+    """Process-wide index for the database behind session_factory."""
+    key = database_key(session_factory)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = CustomerSearchIndex()
+        return index
+
+
+def load_customers_ranked(
+    session_factory: sessionmaker[Session],
+    customer_ids: list[int],
+    *,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+) -> list[Customer]:
+    """Fetch customers by id, preserving the given order.
+
+    Ids are fetched in chunks to stay under SQL Server's parameter cap.
+    """
+    found: dict[int, Customer] = {}
+    with session_factory() as session:
+        for start in range(0, len(customer_ids), chunk_size):
+            chunk = customer_ids[start : start + chunk_size]
+            for customer in session.scalars(
+                select(Customer).where(Customer.customer_id.in_(chunk))
+            ):
+                found[customer.customer_id] = customer
+    return [found[customer_id] for customer_id in customer_ids if customer_id in found]
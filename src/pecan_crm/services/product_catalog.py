@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Protocol
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from pecan_crm.db.models import Product
+from pecan_crm.db.repositories.products import ProductRepository
+from pecan_crm.domain.scan_codes import normalize_sku
+from pecan_crm.offline.replica import LocalReplica
+
+
+CHECK_INTERVAL_SECONDS = 10.0
+
+
+class _ProductRow(Protocol):
+    product_id: int
+    sku: str | None
+    name: str
+    unit_type: str
+    unit_price: Decimal
+    is_active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogProduct:
+    product_id: int
+    sku: str | None
+    name: str
+    unit_type: str
+    unit_price: Decimal
+    # Lowercased "name NUL sku" for substring search.
+    search_text: str
+
+
+def _catalog_product(row: _ProductRow) -> CatalogProduct:
+    return CatalogProduct(
+        product_id=int(row.product_id),
+        sku=row.sku,
+        name=row.name,
+        unit_type=row.unit_type,
+        unit_price=Decimal(str(row.unit_price)),
+        search_text=f"{row.name}\x00{row.sku or ''}".lower(),
+    )
+
+
+class ProductCatalog:
+    """Active products held in memory, looked up by product_id or normalized SKU.
+
+    refresh() first reads a version stamp (the newest updated_at_utc); only when it moved
+    does it fetch the products changed since the previous stamp and patch the dicts, so
+    an unchanged catalog costs one aggregate query. Checks are throttled to one per
+    check_interval_seconds unless forced. Archived products drop out on the next refresh.
+    """
+
+    def __init__(self, *, check_interval_seconds: float = CHECK_INTERVAL_SECONDS) -> None:
+        self.check_interval_seconds = check_interval_seconds
+        self.version: datetime | None = None
+        self._by_id: dict[int, CatalogProduct] = {}
+        self._by_sku: dict[str, CatalogProduct] = {}
+        self._sorted: list[CatalogProduct] | None = None
+        self._last_check: float | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def refresh(self, session_factory: sessionmaker[Session], *, force: bool = False) -> bool:
+        """Bring the catalog up to date with the database; True when anything changed."""
+        with self._lock:
+            if not self._check_due(force):
+                return False
+            with session_factory() as session:
+                stamp = session.scalar(select(func.max(Product.updated_at_utc)))
+            if stamp is not None and stamp == self.version:
+                return False
+            # The >= watermark re-reads rows sharing the old stamp; upserts make that harmless.
+            self.apply(ProductRepository(session_factory).changed_since(self.version))
+            self.version = stamp
+            return True
+
+    def refresh_from_replica(self, replica: LocalReplica, *, force: bool = False) -> bool:
+        """Same as refresh() but sourced from the offline replica's product table."""
+        with self._lock:
+            if not self._check_due(force):
+                return False
+            stamp = replica.watermark("products")
+            if stamp is not None and stamp == self.version:
+                return False
+            self.replace(replica.list_active_products())
+            self.version = stamp
+            return True
+
+    def apply(self, products: Iterable[_ProductRow]) -> None:
+        """Upsert active products and drop inactive ones."""
+        with self._lock:
+            for row in products:
+                self._remove(int(row.product_id))
+                if row.is_active:
+                    self._add(_catalog_product(row))
+            self._sorted = None
+
+    def replace(self, products: Iterable[_ProductRow]) -> None:
+        with self._lock:
+            self._by_id.clear()
+            self._by_sku.clear()
+            for row in products:
+                if row.is_active:
+                    self._add(_catalog_product(row))
+            self._sorted = None
+
+    def get(self, product_id: int) -> CatalogProduct | None:
+        return self._by_id.get(product_id)
+
+    def by_sku(self, sku: str) -> CatalogProduct | None:
+        return self._by_sku.get(normalize_sku(sku))
+
+    def search(self, text: str = "") -> list[CatalogProduct]:
+        """Products whose name or SKU contains text, ordered by name."""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(
+                    self._by_id.values(), key=lambda p: (p.name.lower(), p.product_id)
+                )
+            ordered = self._sorted
+        needle = text.strip().lower()
+        if not needle:
+            return list(ordered)
+        return [product for product in ordered if needle in product.search_text]
+
+    def _check_due(self, force: bool) -> bool:
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_check is not None
+            and now - self._last_check < self.check_interval_seconds
+        ):
+            return False
+        self._last_check = now
+        return True
+
+    def _add(self, product: CatalogProduct) -> None:
+        self._by_id[product.product_id] = product
+        sku = normalize_sku(product.sku)
+        if sku:
+            self._by_sku[sku] = product
+
+    def _remove(self, product_id: int) -> None:
+        previous = self._by_id.pop(product_id, None)
+        if previous is not None:
+            sku = normalize_sku(previous.sku)
+            if self._by_sku.get(sku) is previous:
+                del self._by_sku[sku]
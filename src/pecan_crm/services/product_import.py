@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+
+IMPORT_COLUMNS = ("product_id", "sku", "name", "unit_type", "unit_price", "is_active")
+
+_TRUE = {"1", "y", "yes", "true", "active"}
+_FALSE = {"0", "n", "no", "false", "inactive"}
+
+
+class ProductImportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ProductImportRow:
+    """One CSV line. None means "leave as is" for existing products."""
+
+    line_number: int
+    product_id: int | None
+    sku: str | None
+    name: str | None
+    unit_type: str | None
+    unit_price: Decimal | None
+    is_active: bool | None
+
+
+def _parse_row(line_number: int, row: dict[str, str]) -> ProductImportRow:
+    def cell(column: str) -> str | None:
+        value = (row.get(column) or "").strip()
+        return value or None
+
+    product_id = cell("product_id")
+    if product_id is not None and not product_id.isdigit():
+        raise ProductImportError(f"line {line_number}: product_id must be a number")
+    price = cell("unit_price")
+    try:
+        unit_price = Decimal(price.lstrip("$").replace(",", "")) if price is not None else None
+    except InvalidOperation:
+        message = f"line {line_number}: unit_price {price!r} is not a number"
+        raise ProductImportError(message) from None
+    active = cell("is_active")
+    if active is not None and active.lower() not in _TRUE | _FALSE:
+        raise ProductImportError(f"line {line_number}: is_active must be yes or no")
+    unit_type = cell("unit_type")
+    parsed = ProductImportRow(
+        line_number=line_number,
+        product_id=int(product_id) if product_id is not None else None,
+        sku=cell("sku"),
+        name=cell("name"),
+        unit_type=unit_type.upper() if unit_type is not None else None,
+        unit_price=unit_price,
+        is_active=active.lower() in _TRUE if active is not None else None,
+    )
+    if parsed.product_id is None and parsed.sku is None:
+        raise ProductImportError(f"line {line_number}: product_id or sku is required")
+    return parsed
+
+
+def read_product_csv(path: Path) -> list[ProductImportRow]:
+    """Parse a price/catalog CSV; any of IMPORT_COLUMNS may be present, blank cells are skipped.
+
+    Raises ProductImportError listing every bad line so the file can be fixed in one pass.
+    """
+    rows: list[ProductImportRow] = []
+    errors: list[str] = []
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        headers = {(name or "").strip().lower() for name in reader.fieldnames or []}
+        if not headers & {"product_id", "sku"}:
+            raise ProductImportError(f"{path.name}: needs a product_id or sku column")
+        for line_number, raw in enumerate(reader, start=2):
+            row = {(key or "").strip().lower(): value for key, value in raw.items()}
+            if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            try:
+                rows.append(_parse_row(line_number, row))
+            except ProductImportError as exc:
+                errors.append(str(exc))
+    if errors:
+        raise ProductImportError("\n".join(errors))
+    return rows
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from pecan_crm.db.models import Sale, SaleItem
+from pecan_crm.db.session import database_key
+
+
+PAGE_SIZE = 25
+# Sales recorded or voided by other registers only show up once a history expires.
+MAX_AGE_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class PurchaseHistoryEntry:
+    sale_id: int
+    receipt_number: str
+    sold_at_utc: datetime
+    status: str
+    total: Decimal
+    items_summary: str
+
+
+@dataclass(frozen=True)
+class PurchaseHistory:
+    entries: list[PurchaseHistoryEntry]
+    has_more: bool
+
+
+@dataclass
+class _CachedHistory:
+    entries: list[PurchaseHistoryEntry] = field(default_factory=list)
+    has_more: bool = True
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def _measure(item: SaleItem) -> str:
+    if item.unit_type == "WEIGHT":
+        return f"{Decimal(str(item.weight_lbs)).normalize():f} lb"
+    return f"x{Decimal(str(item.quantity)).normalize():f}"
+
+
+def load_purchase_page(
+    session_factory: sessionmaker[Session],
+    customer_id: int,
+    *,
+    after: PurchaseHistoryEntry | None = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[PurchaseHistoryEntry], bool]:
+    """One page of a customer's sales, newest first, continuing after the given entry.
+
+    Keyset pagination on (sold_at_utc, sale_id) served by IX_sales_customer_sold_at, so
+    page N costs the same as page 1. Returns the entries and whether more exist.
+    """
+    with session_factory() as session:
+        query = select(Sale).where(Sale.customer_id == customer_id)
+        if after is not None:
+            query = query.where(
+                or_(
+                    Sale.sold_at_utc < after.sold_at_utc,
+                    and_(Sale.sold_at_utc == after.sold_at_utc, Sale.sale_id < after.sale_id),
+                )
+            )
+        query = query.order_by(Sale.sold_at_utc.desc(), Sale.sale_id.desc())
+        sales = list(session.scalars(query.limit(limit + 1)))
+        has_more = len(sales) > limit
+        sales = sales[:limit]
+
+        items: dict[int, list[str]] = {sale.sale_id: [] for sale in sales}
+        if sales:
+            for item in session.scalars(
+                select(SaleItem).where(SaleItem.sale_id.in_(items)).order_by(SaleItem.sale_item_id)
+            ):
+                items[item.sale_id].append(f"{item.product_name_snapshot} {_measure(item)}")
+
+        entries = [
+            PurchaseHistoryEntry(
+                sale_id=sale.sale_id,
+                receipt_number=sale.receipt_number,
+                sold_at_utc=sale.sold_at_utc,
+                status=sale.status,
+                total=Decimal(str(sale.total)),
+                items_summary=", ".join(items[sale.sale_id]),
+            )
+            for sale in sales
+        ]
+    return entries, has_more
+
+
+class PurchaseHistoryCache:
+    """Per-customer purchase history pages kept for the session.
+
+    get() returns what is loaded so far (fetching the first page on a miss) and
+    load_more() appends the next keyset page. Entries are dropped by invalidate(), which
+    the sales repository calls whenever it records or voids a sale for the customer, and
+    get() reloads a history older than max_age_seconds so other registers' sales appear.
+    load_more() never reloads, so a view that is scrolling keeps a consistent list.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        *,
+        page_size: int = PAGE_SIZE,
+        max_age_seconds: float = MAX_AGE_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.page_size = page_size
+        self.max_age_seconds = max_age_seconds
+        self._histories: dict[int, _CachedHistory] = {}
+        self._lock = threading.RLock()
+
+    def get(self, customer_id: int) -> PurchaseHistory:
+        with self._lock:
+            cached = self._histories.get(customer_id)
+            if cached is None or time.monotonic() - cached.loaded_at >= self.max_age_seconds:
+                cached = _CachedHistory()
+                self._load_next(customer_id, cached)
+                self._histories[customer_id] = cached
+            return PurchaseHistory(entries=list(cached.entries), has_more=cached.has_more)
+
+    def load_more(self, customer_id: int) -> PurchaseHistory:
+        with self._lock:
+            cached = self._histories.setdefault(customer_id, _CachedHistory())
+            if cached.has_more:
+                self._load_next(customer_id, cached)
+            return PurchaseHistory(entries=list(cached.entries), has_more=cached.has_more)
+
+    def invalidate(self, customer_id: int | None = None) -> None:
+        with self._lock:
+            if customer_id is None:
+                self._histories.clear()
+            else:
+                self._histories.pop(customer_id, None)
+
+    def _load_next(self, customer_id: int, cached: _CachedHistory) -> None:
+        entries, has_more = load_purchase_page(
+            self.session_factory,
+            customer_id,
+            after=cached.entries[-1] if cached.entries else None,
+            limit=self.page_size,
+        )
+        cached.entries.extend(entries)
+        cached.has_more = has_more
+
+
+_CACHES: dict[str, PurchaseHistoryCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def purchase_history_cache(session_factory: sessionmaker[Session]) -> PurchaseHistoryCache:
+    """Process-wide cache for the database behind session_factory."""
+    key = database_key(session_factory)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = PurchaseHistoryCache(session_factory)
+        return cache
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+from pecan_crm.services.receipt_storage import ARCHIVE_DIRNAME, ReceiptStore
+
+
+@dataclass
+class ArchiveReport:
+    months: list[str] = field(default_factory=list)
+    receipts_packed: int = 0
+    bytes_loose: int = 0
+    bytes_packed: int = 0
+
+
+class ReceiptArchiver:
+    """Packs closed months of sharded receipts into one zip per month.
+
+    The zip central directory is the member index: reading one receipt back only
+    parses the directory and seeks to that member, never the whole pack.
+    """
+
+    def __init__(self, store: ReceiptStore) -> None:
+        self.store = store
+        self.archive_dir = store.root / ARCHIVE_DIRNAME
+
+    def archive_path(self, year: int, month: int) -> Path:
+        return self.archive_dir / f"receipts_{year:04d}_{month:02d}.zip"
+
+    def closed_months(self, today: date) -> list[tuple[int, int]]:
+        """Month shards strictly before the current month that still hold loose receipts."""
+        months: list[tuple[int, int]] = []
+        if not self.store.root.exists():
+            return months
+        for year_dir in _numbered_dirs(self.store.root):
+            for month_dir in _numbered_dirs(year_dir):
+                key = (int(year_dir.name), int(month_dir.name))
+                if key < (today.year, today.month) and any(month_dir.glob("receipt_*.pdf")):
+                    months.append(key)
+        return months
+
+    def pack_month(self, year: int, month: int) -> tuple[int, int, int]:
+        """Pack one month shard. Returns (receipts packed, loose bytes, pack bytes)."""
+        shard = self.store.root / f"{year:04d}" / f"{month:02d}"
+        loose = sorted(shard.glob("receipt_*.pdf"))
+        if not loose:
+            return 0, 0, 0
+
+        target = self.archive_path(year, month)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_suffix(".zip.tmp")
+        loose_names = {p.name for p in loose}
+
+        # Rebuild into a temp file so late (regenerated) receipts replace stale
+        # members and a crash never leaves a half-written pack in place.
+        with zipfile.ZipFile(tmp_target, "w", compression=zipfile.ZIP_DEFLATED) as out:
+            if target.exists():
+                with zipfile.ZipFile(target) as existing:
+                    for info in existing.infolist():
+                        if info.filename not in loose_names:
+                            out.writestr(info, existing.read(info.filename))
+            for path in loose:
+                out.write(path, arcname=path.name)
+
+        with zipfile.ZipFile(tmp_target) as check:
+            bad_member = check.testzip()
+        if bad_member is not None:
+            tmp_target.unlink()
+            raise RuntimeError(f"Archive verification failed for {bad_member}")
+
+        os.replace(tmp_target, target)
+        relative_archive = target.relative_to(self.store.root).as_posix()
+        self.store.mark_archived((p.stem.removeprefix("receipt_") for p in loose), relative_archive)
+
+        loose_bytes = sum(p.stat().st_size for p in loose)
+        for path in loose:
+            path.unlink()
+        for empty_dir in (shard, shard.parent):
+            try:
+                empty_dir.rmdir()
+            except OSError:
+                break
+
+        return len(loose), loose_bytes, target.stat().st_size
+
+    def pack_closed_months(self, today: date) -> ArchiveReport:
+        report = ArchiveReport()
+        for year, month in self.closed_months(today):
+            packed, loose_bytes, pack_bytes = self.pack_month(year, month)
+            report.months.append(f"{year:04d}-{month:02d}")
+            report.receipts_packed += packed
+            report.bytes_loose += loose_bytes
+            report.bytes_packed += pack_bytes
+        return report
+
+
+def _numbered_dirs(parent: Path) -> list[Path]:
+    return sorted(p for p in parent.iterdir() if p.is_dir() and p.name.isdigit())
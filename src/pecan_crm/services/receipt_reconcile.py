@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from pecan_crm.db.repositories.sales import SalesRepository
+from pecan_crm.services.receipt_storage import ReceiptIndexEntry, ReceiptStore, receipt_filename
+from pecan_crm.services.receipts import ReceiptData
+
+
+@dataclass
+class ReconcileReport:
+    scanned: int = 0
+    missing: int = 0
+    regenerated: int = 0
+    # Missing sales that could not be loaded (deleted between the scan and the bulk load).
+    vanished: int = 0
+    render_failures: int = 0
+    errors: int = 0
+    after_sale_id: int | None = None
+    watermark: int | None = None
+    watermark_advanced: bool = False
+
+
+def present_receipts(store: ReceiptStore, *, index_only: bool = False) -> set[str]:
+    """Receipt numbers whose PDF is in place at the indexed size.
+
+    The shard tree is walked once instead of stat-ing one path per sale, and each monthly
+    pack's member list is read once. A file whose size differs from the index (truncated or
+    replaced outside the app) counts as missing. index_only trusts the index alone: faster,
+    but blind to files deleted outside the app.
+    """
+    if index_only:
+        return store.indexed_receipt_numbers()
+    on_disk = store.scan_files()
+    archives: dict[str, dict[str, int]] = {}
+    present: set[str] = set()
+    for entry in store.indexed_entries():
+        if entry.archive_path:
+            members = archives.get(entry.archive_path)
+            if members is None:
+                members = archives[entry.archive_path] = store.archive_members(entry.archive_path)
+            size = members.get(receipt_filename(entry.receipt_number))
+        else:
+            size = on_disk.get(entry.relative_path)
+        if size == entry.size_bytes:
+            present.add(entry.receipt_number)
+    return present
+
+
+def read_watermark(path: Path | None) -> int | None:
+    """Last reconciled sale_id. Older sold-at watermarks are ignored, forcing one full sweep."""
+    if path is None or not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    raw = data.get("last_sale_id")
+    return int(raw) if raw is not None else None
+
+
+def write_watermark(path: Path, last_sale_id: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"last_sale_id": last_sale_id}, indent=2), encoding="utf-8")
+
+
+def reconcile(
+    repo: SalesRepository,
+    store: ReceiptStore,
+    *,
+    business_name: str,
+    business_address: str,
+    business_phone: str,
+    repair: bool = True,
+    since: datetime | None = None,
+    watermark_path: Path | None = None,
+    workers: int = 1,
+    chunk_size: int = 500,
+    index_only: bool = False,
+) -> ReconcileReport:
+    """Find sales whose receipt PDF is missing and, when repairing, regenerate them.
+
+    Without since, only sales after the watermark's sale_id are scanned. The watermark is
+    keyed on sale_id, not sold_at_utc: replayed offline sales keep their original sale time
+    but are inserted (and so numbered) later. It advances only after a repair run with no
+    errors; a since run can skip replayed sales sold before it, so it never moves it.
+    """
+    report = ReconcileReport()
+    report.after_sale_id = None if since else read_watermark(watermark_path)
+
+    present = present_receipts(store, index_only=index_only)
+    refs = repo.list_receipt_refs(since=since, after_sale_id=report.after_sale_id)
+    report.scanned = len(refs)
+
+    missing_ids = [ref.sale_id for ref in refs if ref.receipt_number not in present]
+    report.missing = len(missing_ids)
+
+    if missing_ids and repair:
+        loaded = 0
+
+        def counted(receipts: Iterable[ReceiptData]) -> Iterator[ReceiptData]:
+            nonlocal loaded
+            for data in receipts:
+                loaded += 1
+                yield data
+
+        receipts = counted(
+            repo.load_receipt_data(
+                missing_ids,
+                business_name=business_name,
+                business_address=business_address,
+                business_phone=business_phone,
+                chunk_size=chunk_size,
+            )
+        )
+        entries, report.render_failures = _render(store, receipts, workers, chunk_size)
+        report.regenerated = store.record_many(entries)
+        report.vanished = report.missing - loaded
+        report.errors = report.render_failures + report.vanished
+
+    report.watermark = max((ref.sale_id for ref in refs), default=None)
+    clean_run = repair and report.errors == 0 and since is None
+    if watermark_path is not None and report.watermark is not None and clean_run:
+        write_watermark(watermark_path, report.watermark)
+        report.watermark_advanced = True
+    return report
+
+
+def _render(
+    store: ReceiptStore,
+    receipts: Iterator[ReceiptData],
+    workers: int,
+    chunk_size: int,
+) -> tuple[list[ReceiptIndexEntry], int]:
+    """Render receipt files; returns the index entries written and the number of failures."""
+    entries: list[ReceiptIndexEntry] = []
+    failures = 0
+    if workers <= 1:
+        for data in receipts:
+            try:
+                entries.append(store.write(data))
+            except Exception:
+                failures += 1
+        return entries, failures
+
+    # Workers only render files; the index is updated once from this process.
+    # Submit one chunk at a time so only chunk_size receipts are held in memory.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while chunk := list(islice(receipts, max(chunk_size, 1))):
+            futures = [pool.submit(store.write, data) for data in chunk]
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    entries.append(future.result())
+                else:
+                    failures += 1
+    return entries, failures
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import zipfile
+from collections.abc import Iterable
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from pecan_crm.services.receipts import (
+    ReceiptData,
+    receipt_fingerprint,
+    render_receipt_pdf,
+    write_atomic,
+)
+
+
+INDEX_FILENAME = "receipt_index.db"
+ARCHIVE_DIRNAME = "archive"
+RESTORE_DIR = Path(tempfile.gettempdir()) / "PecanCRM" / "restored_receipts"
+
+
+@dataclass(frozen=True)
+class ReceiptIndexEntry:
+    receipt_number: str
+    relative_path: str
+    size_bytes: int
+    sha256: str
+    archive_path: str | None = None
+    data_hash: str | None = None
+
+
+@dataclass
+class ReceiptMigrationReport:
+    moved: int = 0
+    indexed: int = 0
+    skipped: int = 0
+
+
+_ENTRY_COLUMNS = "receipt_number, relative_path, size_bytes, sha256, archive_path, data_hash"
+_ADDED_COLUMNS = {"archive_path": "TEXT NULL", "data_hash": "TEXT NULL"}
+
+
+def _entry_from_row(row: sqlite3.Row) -> ReceiptIndexEntry:
+    return ReceiptIndexEntry(
+        receipt_number=str(row["receipt_number"]),
+        relative_path=str(row["relative_path"]),
+        size_bytes=int(row["size_bytes"]),
+        sha256=str(row["sha256"]),
+        archive_path=row["archive_path"],
+        data_hash=row["data_hash"],
+    )
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def receipt_filename(receipt_number: str) -> str:
+    return f"receipt_{receipt_number}.pdf"
+
+
+class ReceiptStore:
+    """Receipt PDFs sharded as YYYY/MM/receipt_<number>.pdf with a SQLite index.
+
+    The index maps receipt number to relative path, size and content hash so
+    lookups never have to stat or list the receipt tree.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.index_path = root / INDEX_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS receipt_index (
+                receipt_number TEXT PRIMARY KEY,
+                relative_path TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                indexed_at_utc TEXT NOT NULL,
+                archive_path TEXT NULL,
+                data_hash TEXT NULL
+            )
+            """
+        )
+        columns = {str(r["name"]) for r in conn.execute("PRAGMA table_info(receipt_index)")}
+        for name, ddl in _ADDED_COLUMNS.items():
+            if name not in columns:
+                conn.execute(f"ALTER TABLE receipt_index ADD COLUMN {name} {ddl}")
+        return conn
+
+    def shard_dir(self, sold_at: datetime) -> Path:
+        return self.root / f"{sold_at:%Y}" / f"{sold_at:%m}"
+
+    def write(self, data: ReceiptData) -> ReceiptIndexEntry:
+        """Render into the date shard without touching the index (safe in worker processes)."""
+        content = render_receipt_pdf(data)
+        path = self.shard_dir(data.sold_at_local) / receipt_filename(data.receipt_number)
+        write_atomic(path, content)
+        return ReceiptIndexEntry(
+            receipt_number=data.receipt_number,
+            relative_path=path.relative_to(self.root).as_posix(),
+            size_bytes=len(content),
+            sha256=hashlib.sha256(content).hexdigest(),
+            data_hash=receipt_fingerprint(data),
+        )
+
+    def save(self, data: ReceiptData) -> Path:
+        """Render and index a receipt, skipping the render when the stored copy is current."""
+        existing = self.lookup(data.receipt_number)
+        if existing is not None and existing.data_hash == receipt_fingerprint(data):
+            path = self._stored_path(existing)
+            if path is not None:
+                return path
+
+        entry = self.write(data)
+        self.record_many([entry])
+        return self.root / entry.relative_path
+
+    def record_many(self, entries: Iterable[ReceiptIndexEntry]) -> int:
+        now = datetime.now(UTC).isoformat()
+        rows = [
+            (
+                e.receipt_number,
+                e.relative_path,
+                e.size_bytes,
+                e.sha256,
+                now,
+                e.archive_path,
+                e.data_hash,
+            )
+            for e in entries
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO receipt_index(
+                    receipt_number, relative_path, size_bytes, sha256, indexed_at_utc,
+                    archive_path, data_hash
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(receipt_number) DO UPDATE SET
+                    relative_path = excluded.relative_path,
+                    size_bytes = excluded.size_bytes,
+                    sha256 = excluded.sha256,
+                    indexed_at_utc = excluded.indexed_at_utc,
+                    archive_path = excluded.archive_path,
+                    data_hash = excluded.data_hash
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def lookup(self, receipt_number: str) -> ReceiptIndexEntry | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM receipt_index WHERE receipt_number = ?",
+                (receipt_number,),
+            ).fetchone()
+        return _entry_from_row(row) if row is not None else None
+
+    def resolve(self, receipt_number: str) -> Path | None:
+        entry = self.lookup(receipt_number)
+        if entry is not None:
+            return self._stored_path(entry)
+
+        # Receipts written before the sharded layout until the migrator has run.
+        legacy = self.root / receipt_filename(receipt_number)
+        return legacy if legacy.exists() else None
+
+    def indexed_receipt_numbers(self) -> set[str]:
+        with closing(self._connect()) as conn:
+            return {str(r[0]) for r in conn.execute("SELECT receipt_number FROM receipt_index")}
+
+    def indexed_entries(self) -> list[ReceiptIndexEntry]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT {_ENTRY_COLUMNS} FROM receipt_index").fetchall()
+        return [_entry_from_row(r) for r in rows]
+
+    def mark_archived(self, receipt_numbers: Iterable[str], archive_path: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE receipt_index SET archive_path = ? WHERE receipt_number = ?",
+                [(archive_path, number) for number in receipt_numbers],
+            )
+
+    def extract(self, receipt_number: str, dest_dir: Path = RESTORE_DIR) -> Path | None:
+        """Copy one archived receipt out of its monthly pack (for reprint)."""
+        entry = self.lookup(receipt_number)
+        if entry is None or not entry.archive_path:
+            return None
+        archive = self.root / entry.archive_path
+        if not archive.exists():
+            return None
+
+        member = receipt_filename(receipt_number)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(archive) as zf:
+            # Only the central directory is read; the member is reached by seeking to its offset.
+            return Path(zf.extract(member, dest_dir))
+
+    def scan_files(self) -> dict[str, int]:
+        """Walk the shard tree once and return every receipt's relative path and size.
+
+        Sizes come from the directory entries, which Windows fills in during the listing,
+        so the walk costs no extra stat per file there.
+        """
+        found: dict[str, int] = {}
+        if not self.root.exists():
+            return found
+        pending = [(self.root, "")]
+        while pending:
+            directory, prefix = pending.pop()
+            with os.scandir(directory) as listing:
+                for entry in listing:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not (directory == self.root and entry.name == ARCHIVE_DIRNAME):
+                            pending.append((Path(entry.path), f"{prefix}{entry.name}/"))
+                    elif entry.name.startswith("receipt_") and entry.name.endswith(".pdf"):
+                        found[f"{prefix}{entry.name}"] = entry.stat().st_size
+        return found
+
+    def archive_members(self, archive_path: str) -> dict[str, int]:
+        """Member name to uncompressed size for one monthly pack; empty if it is unreadable."""
+        try:
+            with zipfile.ZipFile(self.root / archive_path) as zf:
+                return {info.filename: info.file_size for info in zf.infolist()}
+        except (OSError, zipfile.BadZipFile):
+            return {}
+
+    def migrate_flat_layout(
+        self, sold_at_by_receipt: dict[str, datetime]
+    ) -> ReceiptMigrationReport:
+        """Move receipt_<number>.pdf files from the folder root into date shards.
+
+        Receipts without a known sale date fall back to the file modification time.
+        """
+        report = ReceiptMigrationReport()
+        entries: list[ReceiptIndexEntry] = []
+        if not self.root.exists():
+            return report
+
+        with os.scandir(self.root) as listing:
+            flat_files = [
+                Path(e.path)
+                for e in listing
+                if e.is_file() and e.name.startswith("receipt_") and e.name.endswith(".pdf")
+            ]
+
+        for path in flat_files:
+            receipt_number = path.stem.removeprefix("receipt_")
+            sold_at = sold_at_by_receipt.get(receipt_number)
+            if sold_at is None:
+                sold_at = datetime.fromtimestamp(path.stat().st_mtime)
+            target_dir = self.shard_dir(sold_at)
+            target = target_dir / path.name
+            if target.exists():
+                report.skipped += 1
+                entries.append(self._entry_for(receipt_number, target))
+                continue
+            target_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+            report.moved += 1
+            entries.append(self._entry_for(receipt_number, target))
+
+        report.indexed = self.record_many(entries)
+        return report
+
+    def _stored_path(self, entry: ReceiptIndexEntry) -> Path | None:
+        if entry.archive_path:
+            return self.extract(entry.receipt_number)
+        path = self.root / entry.relative_path
+        try:
+            # Writes are atomic, so a size mismatch means the file was altered outside the app.
+            return path if path.stat().st_size == entry.size_bytes else None
+        except FileNotFoundError:
+            return None
+
+    def _entry_for(self, receipt_number: str, path: Path) -> ReceiptIndexEntry:
+        return ReceiptIndexEntry(
+            receipt_number=receipt_number,
+            relative_path=path.relative_to(self.root).as_posix(),
+            size_bytes=path.stat().st_size,
+            sha256=file_sha256(path),
+        )
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import io
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
 
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+# reportlab is imported inside the rendering functions: it is only needed once a receipt
+# is printed, and importing it with this module (pulled in by the sales repository) would
+# add to every app start.
+
+# Bump when the rendered layout changes so stored receipts are re-rendered.
+RENDER_VERSION = 1
 
 
 @dataclass(frozen=True)
@@ -35,33 +45,133 @@ class ReceiptData:
     lines: list[ReceiptLine]
 
 
+@dataclass(frozen=True)
+class ReceiptTemplate:
+    """Static receipt content and layout metrics for one business profile."""
+
+    header_lines: tuple[str, ...]
+    separator: str
+    page_width: float
+    page_height: float
+    left_margin: float
+    top_y: float
+    bottom_y: float
+    line_step: int
+    item_step: int
+    header_height: float
+    header_code: str
+
+
+def _compile_header(
+    header_lines: tuple[str, ...], separator: str, *, x: float, y: float, step: int
+) -> str:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    # Rendered once against a scratch canvas; every canvas registers the default
+    # font under the same internal name, so the operators replay into any receipt.
+    scratch = canvas.Canvas(io.BytesIO(), pagesize=letter)
+    text = scratch.beginText(x, y)
+    text.setLeading(step)
+    for value in (*header_lines, separator):
+        text.textLine(value)
+    return text.getCode()
+
+
+@lru_cache(maxsize=16)
+def receipt_template(
+    business_name: str, business_address: str, business_phone: str
+) -> ReceiptTemplate:
+    from reportlab.lib.pagesizes import letter
+
+    width, height = letter
+    header_lines = (business_name, business_address, business_phone)
+    separator = "-" * 70
+    left_margin = 50
+    top_y = height - 50
+    line_step = 16
+    return ReceiptTemplate(
+        header_lines=header_lines,
+        separator=separator,
+        page_width=width,
+        page_height=height,
+        left_margin=left_margin,
+        top_y=top_y,
+        bottom_y=60,
+        line_step=line_step,
+        item_step=14,
+        header_height=line_step * (len(header_lines) + 1),
+        header_code=_compile_header(
+            header_lines, separator, x=left_margin, y=top_y, step=line_step
+        ),
+    )
+
+
+def receipt_fingerprint(data: ReceiptData) -> str:
+    """Hash of everything that affects the rendered receipt."""
+    canonical = json.dumps(
+        {"render_version": RENDER_VERSION, **asdict(data)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    """Write through a temp file in the same folder and rename over the target."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
 def generate_receipt_pdf(receipt_dir: Path, data: ReceiptData) -> Path:
-    receipt_dir.mkdir(parents=True, exist_ok=True)
     output_path = receipt_dir / f"receipt_{data.receipt_number}.pdf"
+    write_atomic(output_path, render_receipt_pdf(data))
+    return output_path
 
-    c = canvas.Canvas(str(output_path), pagesize=letter)
-    width, height = letter
 
-    y = height - 50
+def render_receipt_pdf(data: ReceiptData) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    template = receipt_template(data.business_name, data.business_address, data.business_phone)
+
+    buffer = io.BytesIO()
+    # invariant drops the creation timestamp and random document ID so the same
+    # receipt data always renders to the same bytes (stable content hash).
+    c = canvas.Canvas(buffer, pagesize=letter, invariant=1)
+    c.addLiteral(template.header_code)
 
-    def write_line(text: str, step: int = 16) -> None:
-        nonlocal y
-        if y < 60:
+    # Variable lines share one text object per page instead of one per drawString.
+    body = c.beginText(template.left_margin, template.top_y - template.header_height)
+    leading = 0
+
+    def write_line(text: str, step: int = template.line_step) -> None:
+        nonlocal body, leading
+        if body.getY() < template.bottom_y:
+            c.drawText(body)
             c.showPage()
-            y = height - 50
-        c.drawString(50, y, text)
-        y -= step
-
-    write_line(data.business_name)
-    write_line(data.business_address)
-    write_line(data.business_phone)
-    write_line("-" * 70)
+            body = c.beginText(template.left_margin, template.top_y)
+            leading = 0
+        if step != leading:
+            body.setLeading(step)
+            leading = step
+        body.textLine(text)
+
     write_line(f"Receipt: {data.receipt_number}")
     write_line(f"Date/Time: {data.sold_at_local.strftime('%Y-%m-%d %H:%M:%S')}")
     write_line(f"Payment: {data.payment_method}")
     if data.customer_summary:
         write_line(f"Customer: {data.customer_summary}")
-    write_line("-" * 70)
+    write_line(template.separator)
 
     for line in data.lines:
         qty_weight = (
@@ -69,15 +179,16 @@ def generate_receipt_pdf(receipt_dir: Path, data: ReceiptData) -> Path:
         )
         write_line(
             f"{line.name} | {qty_weight} | ${line.unit_price:.2f} | ${line.line_subtotal:.2f}",
-            step=14,
+            step=template.item_step,
         )
 
-    write_line("-" * 70)
+    write_line(template.separator)
     write_line(f"Subtotal: ${data.subtotal:.2f}")
     write_line(f"Discount: ${data.discount_total:.2f}")
     write_line(f"Tax: ${data.tax_total:.2f}")
     write_line(f"Total: ${data.total:.2f}")
 
+    c.drawText(body)
     c.showPage()
     c.save()
-    return output_path
\ No newline at end of file
+    return buffer.getvalue()
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QThreadPool  # noqa: E402
+from PySide6.QtWidgets import QApplication, QLineEdit, QPushButton  # noqa: E402
+
+from pecan_crm.app.tasks import (  # noqa: E402
+    ActionRunner,
+    BusyIndicator,
+    DebouncedSearch,
+    LatestTaskRunner,
+)
+
+
+def _app() -> QCoreApplication:
+    return QApplication.instance() or QApplication([])
+
+
+def _wait_until(condition, timeout_seconds: float = 5.0) -> None:
+    app = _app()
+    deadline = time.monotonic() + timeout_seconds
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_runner_delivers_only_latest_result() -> None:
+    _app()
+    pool = QThreadPool()
+    pool.setMaxThreadCount(2)
+    results: list[str] = []
+    errors: list[Exception] = []
+    runner = LatestTaskRunner(on_result=results.append, on_error=errors.append, pool=pool)
+    release = threading.Event()
+
+    def slow() -> str:
+        release.wait(5)
+        return "stale"
+
+    runner.submit(slow)
+    runner.submit(lambda: "fresh")
+    _wait_until(lambda: results == ["fresh"])
+    release.set()
+    pool.waitForDone(5000)
+    _app().processEvents()
+
+    assert results == ["fresh"]
+    assert not runner.is_busy()
+
+    def boom() -> str:
+        raise RuntimeError("offline")
+
+    runner.submit(boom)
+    _wait_until(lambda: bool(errors))
+    assert str(errors[0]) == "offline"
+
+
+def test_debounced_search_runs_once_after_typing_pauses() -> None:
+    _app()
+    pool = QThreadPool()
+    line_edit = QLineEdit()
+    queried: list[str] = []
+    shown: list[str] = []
+
+    def make_query(text: str):
+        def query() -> str:
+            queried.append(text)
+            return text.upper()
+
+        return query
+
+    DebouncedSearch(
+        line_edit, make_query, on_result=shown.append, on_error=pytest.fail, delay_ms=20, pool=pool
+    )
+    for partial in ("a", "an", "ann"):
+        line_edit.setText(partial)
+
+    _wait_until(lambda: shown == ["ANN"])
+    pool.waitForDone(5000)
+    assert queried == ["ann"]
+
+
+def test_action_runner_refuses_double_submit_and_locks_controls() -> None:
+    _app()
+    pool = QThreadPool()
+    runner = ActionRunner(pool=pool)
+    indicator = BusyIndicator(runner)
+    button = QPushButton("Finalize")
+    release = threading.Event()
+    results: list[str] = []
+    calls: list[int] = []
+
+    def finalize() -> str:
+        calls.append(1)
+        release.wait(5)
+        return "sale 1"
+
+    assert runner.run(
+        "finalize",
+        finalize,
+        on_result=results.append,
+        on_error=pytest.fail,
+        controls=(button,),
+        cancellable=False,
+    )
+    assert not runner.run("finalize", finalize, on_result=results.append, on_error=pytest.fail)
+    assert not button.isEnabled()
+    assert not indicator.isHidden()
+    assert indicator.cancel_button.isHidden()
+
+    # Not cancellable: the outcome is still delivered.
+    runner.cancel()
+    release.set()
+    _wait_until(lambda: results == ["sale 1"])
+    pool.waitForDone(5000)
+    assert calls == [1]
+    assert button.isEnabled()
+    assert indicator.isHidden()
+
+
+def test_cancelled_action_drops_its_outcome_and_frees_the_key() -> None:
+    _app()
+    pool = QThreadPool()
+    runner = ActionRunner(pool=pool)
+    button = QPushButton("Export")
+    release = threading.Event()
+    results: list[str] = []
+    errors: list[Exception] = []
+
+    runner.run(
+        "export",
+        lambda: release.wait(5) and "old",
+        on_result=results.append,
+        on_error=errors.append,
+        controls=(button,),
+    )
+    runner.cancel()
+    assert button.isEnabled()
+    assert not runner.is_busy()
+
+    def boom() -> str:
+        raise RuntimeError("disk full")
+
+    assert runner.run("export", boom, on_result=results.append, on_error=errors.append)
+    release.set()
+    _wait_until(lambda: bool(errors))
+    pool.waitForDone(5000)
+    _app().processEvents()
+
+    assert results == []
+    assert [str(e) for e in errors] == ["disk full"]
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base
+from pecan_crm.db.repositories.customers import CustomerInput, CustomerRepository
+from pecan_crm.services.customer_dedupe import (
+    CustomerDedupeEngine,
+    DedupeRecord,
+    iter_csv_records,
+    iter_db_records,
+    jaro_winkler,
+    soundex,
+)
+
+
+def test_soundex_and_jaro_winkler_reference_values() -> None:
+    assert [soundex(name) for name in ("Robert", "Rupert", "Ashcraft", "Tymczak", "Lee")] == [
+        "R163",
+        "R163",
+        "A261",
+        "T522",
+        "L000",
+    ]
+    assert round(jaro_winkler("martha", "marhta"), 4) == 0.9611
+    assert round(jaro_winkler("dwayne", "duane"), 4) == 0.84
+    assert jaro_winkler("ann", "ann") == 1.0
+    assert jaro_winkler("", "ann") == 0.0
+
+
+def test_engine_clusters_format_variants_and_keeps_households_apart() -> None:
+    engine = CustomerDedupeEngine()
+    engine.add_many(
+        [
+            DedupeRecord("1", "Ann", "Moss", "(555) 123-4567", "ann@grove.com"),
+            DedupeRecord("2", "Anne", "Moss", "+1 555 123 4567", ""),
+            DedupeRecord("3", "ann", "MOSS", "", "Ann+orders@Grove.com"),
+            DedupeRecord("4", "Bill", "Moss", "555-123-4567", ""),
+            DedupeRecord("5", "Carl", "Reed", "555-000-1111", "carl@example.com", is_active=False),
+            DedupeRecord("6", "Carl", "Reed", "555-000-1111", "carl@example.com"),
+            DedupeRecord("7", "Dana", "Fox", "555-222-3333", ""),
+        ]
+    )
+
+    clusters = engine.clusters()
+
+    assert [(c.cluster_id, c.survivor_id) for c in clusters] == [(1, "1"), (2, "6")]
+    ann = clusters[0]
+    assert [m.record.customer_id for m in ann.members] == ["1", "2", "3"]
+    assert ann.members[0].reason == "survivor"
+    assert all(m.score >= 0.85 for m in ann.members)
+    assert engine.stats.clusters == 2
+    assert engine.stats.clustered_records == 5
+
+
+def test_records_stream_from_csv_and_database(tmp_path: Path) -> None:
+    csv_path = tmp_path / "customers.csv"
+    csv_path.write_text(
+        "CustomerID,FirstName,LastName,Phone,Email,IsActive\n"
+        "10,Ann,Moss,555-123-4567,ann@grove.com,1\n"
+        "11,Ann,Moss,5551234567,,0\n",
+        encoding="utf-8",
+    )
+    records = list(iter_csv_records(csv_path))
+    assert [(r.customer_id, r.is_active) for r in records] == [("10", True), ("11", False)]
+
+    db = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(db)
+    session_factory = sessionmaker(bind=db, expire_on_commit=False)
+    repo = CustomerRepository(session_factory)
+    for index in range(5):
+        repo.save(CustomerInput("Ann", "Moss", f"555-000-000{index}", "", ""))
+
+    records = list(iter_db_records(session_factory, chunk_size=2))
+    assert [r.customer_id for r in records] == ["1", "2", "3", "4", "5"]
+    assert records[0].phone == "555-000-0000"
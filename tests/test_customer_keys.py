@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base
+from pecan_crm.db.repositories.customers import CustomerInput, CustomerRepository
+from pecan_crm.domain.customer_keys import customer_keys, normalize_phone
+
+
+def test_customer_keys_normalize_format_variants() -> None:
+    assert normalize_phone("(555) 123-4567") == "5551234567"
+    assert normalize_phone("+1 555.123.4567") == "5551234567"
+    assert normalize_phone("44 20 7946 0958") == "442079460958"
+
+    keys = customer_keys(
+        first_name="  Ann ", last_name="Van  Moss", phone="", email=" Ann@Grove.COM "
+    )
+    assert keys.phone_digits is None
+    assert keys.email_normalized == "ann@grove.com"
+    assert keys.name_key == "ann|van moss"
+    assert customer_keys(first_name="Ann", last_name="", phone=None, email=None).name_key is None
+
+
+def test_find_likely_duplicates_matches_on_normalized_keys(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    repo = CustomerRepository(sessionmaker(bind=engine, expire_on_commit=False))
+
+    saved = repo.save(CustomerInput("Ann", "Moss", "(555) 123-4567", "Ann@Grove.com", ""))
+    assert saved.phone_digits == "5551234567"
+    assert (saved.email_normalized, saved.name_key) == ("ann@grove.com", "ann|moss")
+
+    def dupes(**fields: str) -> list[int]:
+        data = {"phone": "", "email": "", "first_name": "", "last_name": "", **fields}
+        return [c.customer_id for c in repo.find_likely_duplicates(**data)]
+
+    assert dupes(phone="555-123-4567") == [saved.customer_id]
+    assert dupes(email=" ANN@grove.com") == [saved.customer_id]
+    assert dupes(first_name="ann", last_name=" MOSS") == [saved.customer_id]
+    assert dupes(first_name="Ann") == []
+    assert dupes(phone="5551234567", exclude_customer_id=saved.customer_id) == []
+
+    updated = repo.save(
+        CustomerInput("Ann", "Moss", "555 999 0000", "", ""), customer_id=saved.customer_id
+    )
+    assert (updated.phone_digits, updated.email_normalized) == ("5559990000", None)
+    assert dupes(phone="5551234567") == []
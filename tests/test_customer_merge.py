@@ -0,0 +1,97 @@
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Customer, CustomerMerge, Sale
+from pecan_crm.db.repositories.customers import (
+    CustomerInput,
+    CustomerMergeError,
+    CustomerRepository,
+)
+
+
+def _setup(tmp_path: Path) -> tuple[CustomerRepository, sessionmaker]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    repo = CustomerRepository(session_factory)
+    for name in ("Ann", "Anne", "Annie", "Bo", "Cy"):
+        repo.save(CustomerInput(name, "Moss", "", "", ""))
+    with session_factory() as session:
+        for number, customer_id in enumerate([1, 2, 2, 3, 4, None], start=1):
+            session.add(
+                Sale(
+                    receipt_number=f"{number:06d}",
+                    customer_id=customer_id,
+                    payment_method="CASH",
+                    subtotal=Decimal("1"),
+                    total=Decimal("1"),
+                )
+            )
+        session.commit()
+    return repo, session_factory
+
+
+def _owners(session_factory: sessionmaker) -> dict[str, int | None]:
+    with session_factory() as session:
+        return dict(session.execute(select(Sale.receipt_number, Sale.customer_id)).all())
+
+
+def _active(session_factory: sessionmaker) -> dict[int, bool]:
+    with session_factory() as session:
+        return dict(session.execute(select(Customer.customer_id, Customer.is_active)).all())
+
+
+def test_merge_customers_moves_sales_deactivates_and_rolls_back(tmp_path: Path) -> None:
+    repo, session_factory = _setup(tmp_path)
+    before = _owners(session_factory)
+
+    # 3 -> 2 -> 1 chains to survivor 1; 5 is missing; 4 -> 4 is ignored.
+    result = repo.merge_customers([(1, 2), (2, 3), (4, 4), (1, 99)], chunk_size=1)
+
+    assert (result.merged, result.sales_moved) == (2, 3)
+    assert [(s.duplicate_id, s.reason) for s in result.skipped] == [(99, "customer not found")]
+    assert _owners(session_factory) == {
+        "000001": 1,
+        "000002": 1,
+        "000003": 1,
+        "000004": 1,
+        "000005": 4,
+        "000006": None,
+    }
+    assert _active(session_factory) == {1: True, 2: False, 3: False, 4: True, 5: True}
+
+    skipped = repo.merge_customers([(1, 2)]).skipped
+    assert [(s.duplicate_id, s.reason) for s in skipped] == [(2, "already merged")]
+    again = repo.merge_customers([(2, 5)])
+    assert [(s.duplicate_id, s.reason) for s in again.skipped] == [(5, "survivor already merged")]
+    assert again.merged == 0
+
+    later = repo.merge_customers([(5, 1)])
+    assert later.merged == 1
+    with pytest.raises(CustomerMergeError):
+        repo.rollback_merge(result.batch_id)
+    repo.rollback_merge(later.batch_id)
+
+    undone = repo.rollback_merge(result.batch_id)
+    assert (undone.merged, undone.sales_moved) == (2, 3)
+    assert _owners(session_factory) == before
+    assert _active(session_factory) == {1: True, 2: True, 3: True, 4: True, 5: True}
+    with session_factory() as session:
+        assert all(m.rolled_back_at_utc is not None for m in session.scalars(select(CustomerMerge)))
+
+
+def test_merge_dry_run_changes_nothing(tmp_path: Path) -> None:
+    repo, session_factory = _setup(tmp_path)
+    before = _owners(session_factory)
+
+    result = repo.merge_customers([(1, 2)], dry_run=True)
+
+    assert (result.merged, result.sales_moved) == (1, 2)
+    assert _owners(session_factory) == before
+    assert _active(session_factory)[2] is True
+    with session_factory() as session:
+        assert session.scalars(select(CustomerMerge)).first() is None
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Customer
+from pecan_crm.db.repositories.customers import CustomerInput, CustomerRepository
+from pecan_crm.services.customer_search import CustomerSearchIndex
+
+T0 = datetime(2026, 3, 1, 9, 0)
+
+
+def _customer(
+    customer_id: int, first: str, last: str, phone: str = "", email: str = "", active: bool = True
+):
+    return SimpleNamespace(
+        customer_id=customer_id,
+        first_name=first,
+        last_name=last,
+        phone=phone,
+        email=email,
+        is_active=active,
+        updated_at_utc=T0 + timedelta(minutes=customer_id),
+    )
+
+
+def test_search_index_ranks_exact_then_prefix_then_substring() -> None:
+    index = CustomerSearchIndex()
+    index.upsert(
+        [
+            _customer(1, "Ann", "Moss", "555-0101", "ann@grove.com"),
+            _customer(2, "Joanna", "Bell", "555-0102", "jb@example.com"),
+            _customer(3, "Anna", "Lee", "(555) 123-4567", "anna.lee@example.com"),
+            _customer(4, "Ann", "Zed", active=False),
+        ]
+    )
+
+    assert index.search("ann") == [1, 4, 3, 2]
+    assert index.search("ann", include_inactive=False) == [1, 3, 2]
+    assert index.search("an") == [3, 1, 4]
+    assert index.search("5551234567") == [3]
+    assert index.search("123-45") == [3]
+    assert index.search("xyz") == []
+
+    index.upsert([_customer(2, "Jo", "Bell", "555-0102", "jb@example.com")])
+    assert index.search("joanna") == []
+    assert index.watermark == T0 + timedelta(minutes=4)
+
+
+def test_customer_repository_search_uses_index_and_sees_saves(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add_all(
+            [
+                Customer(first_name="Ada", last_name="Moss", phone="555-0101", is_active=True),
+                Customer(
+                    first_name="Adam", last_name="Ng", email="adam@example.com", is_active=False
+                ),
+            ]
+        )
+        session.commit()
+
+    repo = CustomerRepository(factory)
+    assert [c.first_name for c in repo.list_customers(search="ada")] == ["Ada", "Adam"]
+    active = repo.list_customers(search="ada", include_inactive=False)
+    assert [c.first_name for c in active] == ["Ada"]
+
+    saved = repo.save(
+        CustomerInput(first_name="Adaline", last_name="Ray", phone="", email="", notes="")
+    )
+    assert [c.customer_id for c in repo.list_customers(search="adal")] == [saved.customer_id]
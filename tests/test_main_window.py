@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+from PySide6.QtWidgets import QApplication, QWidget  # noqa: E402
+
+from pecan_crm.app import main_window  # noqa: E402
+
+
+def _app() -> QCoreApplication:
+    return QApplication.instance() or QApplication([])
+
+
+BUILT: list[str] = []
+
+
+class _Page(QWidget):
+    def __init__(self, *, offline_sync: object = None) -> None:
+        super().__init__()
+        self.shown = 0
+        BUILT.append(type(self).__name__)
+
+    def on_shown(self) -> None:
+        self.shown += 1
+
+
+def test_pages_are_built_on_first_navigation_and_refreshed_on_show(monkeypatch) -> None:
+    _app()
+    for key, spec in main_window.PAGE_CLASSES.items():
+        name = spec.partition(":")[2]
+        monkeypatch.setitem(globals(), name, type(name, (_Page,), {}))
+        monkeypatch.setitem(main_window.PAGE_CLASSES, key, f"{__name__}:{name}")
+    BUILT.clear()
+
+    window = main_window.MainWindow()
+    # Only the landing page is built at startup.
+    assert BUILT == ["SettingsPage"]
+    assert window.page("products") is None
+
+    window.nav.setCurrentRow(1)
+    products = window.page("products")
+    assert BUILT == ["SettingsPage", "ProductsPage"]
+    assert window.stack.currentWidget() is products
+    assert products.shown == 1
+
+    window.nav.setCurrentRow(0)
+    window.nav.setCurrentRow(1)
+    assert BUILT == ["SettingsPage", "ProductsPage"]
+    assert products.shown == 2
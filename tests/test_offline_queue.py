@@ -1,6 +1,15 @@
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
-from pecan_crm.offline.queue import OfflineSaleQueue
+import pytest
+
+from pecan_crm.offline.queue import (
+    OfflineSaleQueue,
+    PermanentReplayError,
+    QueuedSale,
+    QueueFullError,
+    ReplayAck,
+)
 
 
 def test_offline_queue_enqueue_and_pending(tmp_path: Path) -> None:
@@ -29,4 +38,100 @@ def test_offline_queue_process_pending_marks_sent(tmp_path: Path) -> None:
     assert result["sent"] == 1
     assert result["failed"] == 0
     assert seen == ["abc-123"]
-    assert q.pending() == []
\ No newline at end of file
+    assert q.pending() == []
+
+
+def test_offline_queue_failed_items_stay_pending_and_survive_reopen(tmp_path: Path) -> None:
+    queue_path = tmp_path / "offline.db"
+    q = OfflineSaleQueue(queue_path)
+    q.enqueue(idempotency_key="ok-1", payload={"sale": 1})
+    q.enqueue(idempotency_key="bad-2", payload={"sale": 2})
+
+    def sender(idempotency_key: str, payload: dict) -> None:
+        if idempotency_key.startswith("bad"):
+            raise ConnectionError("offline")
+
+    result = q.process_pending(sender)
+    q.close()
+
+    assert result == {"sent": 1, "failed": 1, "dead": 0}
+    with OfflineSaleQueue(queue_path) as reopened:
+        assert [item.idempotency_key for item in reopened.pending()] == ["bad-2"]
+
+
+def test_offline_queue_replay_batches_backs_off_and_dead_letters(tmp_path: Path) -> None:
+    now = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+    with OfflineSaleQueue(tmp_path / "offline.db") as q:
+        for i in range(5):
+            q.enqueue(idempotency_key=f"ok-{i}", payload={"sale": i})
+        q.enqueue(idempotency_key="flaky", payload={"sale": 98})
+        q.enqueue(idempotency_key="poison", payload={"sale": 99})
+
+        batch_sizes: list[int] = []
+
+        def batch_sender(batch: list[QueuedSale]) -> dict[str, Exception | None]:
+            batch_sizes.append(len(batch))
+            results: dict[str, Exception | None] = {}
+            for item in batch:
+                if item.idempotency_key == "poison":
+                    results[item.idempotency_key] = PermanentReplayError("unknown product")
+                elif item.idempotency_key != "flaky":
+                    results[item.idempotency_key] = None
+            return results
+
+        result = q.replay(batch_sender, batch_size=3, max_workers=3, now=now)
+        assert result == {"sent": 5, "failed": 1, "dead": 1}
+        assert sorted(batch_sizes) == [1, 3, 3]
+        assert [item.idempotency_key for item in q.dead_letters()] == ["poison"]
+
+        # Still backing off: nothing is due yet.
+        assert q.due(now=now + timedelta(seconds=1)) == []
+        later = now + timedelta(seconds=10)
+        assert [item.attempt_count for item in q.due(now=later)] == [1]
+
+        result = q.replay(batch_sender, max_attempts=2, now=later)
+        assert result == {"sent": 0, "failed": 0, "dead": 1}
+        assert q.pending() == []
+        assert q.requeue_dead([item.queue_id for item in q.dead_letters()]) == 2
+        assert len(q.due(now=later)) == 2
+
+
+def test_offline_queue_retention_back_pressure_and_stats(tmp_path: Path) -> None:
+    # Relative to the real clock: enqueue stamps created_at_utc with the current time.
+    now = datetime.now(UTC)
+    with OfflineSaleQueue(tmp_path / "offline.db", max_pending=2) as q:
+        q.enqueue(idempotency_key="a", payload={"sale": "x" * 4000})
+        q.enqueue(idempotency_key="b", payload={"sale": 2})
+        with pytest.raises(QueueFullError):
+            q.enqueue(idempotency_key="c", payload={"sale": 3})
+        assert q.enqueue(idempotency_key="a", payload={"sale": 1}) == 1
+
+        stats = q.stats(now=now + timedelta(days=365))
+        assert (stats.depth, stats.is_full) == (2, True)
+        assert stats.oldest_pending_age_seconds is not None and stats.oldest_pending_age_seconds > 0
+        assert stats.bytes_on_disk > 0
+
+        q.replay(lambda batch: {item.idempotency_key: None for item in batch}, now=now)
+        assert q.stats().depth == 0
+        assert q.purge_sent(older_than_days=30, now=now + timedelta(days=29)) == 0
+        assert q.maintain(retention_days=30, now=now + timedelta(days=31)) == {"purged": 2}
+        assert q.stats().sent == 0
+        assert q.stats().bytes_on_disk < stats.bytes_on_disk
+        assert q.enqueue(idempotency_key="c", payload={"sale": 3}) > 0
+
+
+def test_provisional_receipts_resolve_after_retention_purges_sent_rows(tmp_path: Path) -> None:
+    now = datetime.now(UTC)
+    with OfflineSaleQueue(tmp_path / "offline.db") as q:
+        _, provisional = q.enqueue_provisional(idempotency_key="k1", payload={"sale": 1})
+        _, unsynced = q.enqueue_provisional(idempotency_key="k2", payload={"sale": 2})
+        q.replay(lambda batch: {"k1": ReplayAck(41, "000123")}, now=now)
+        assert q.server_receipt_for(provisional) == ReplayAck(41, "000123")
+
+        assert q.maintain(retention_days=30, now=now + timedelta(days=31)) == {"purged": 1}
+        assert q.stats().sent == 0
+        assert q.server_receipt_for(provisional) == ReplayAck(41, "000123")
+        assert q.server_receipt_for(unsynced) is None
+
+    with OfflineSaleQueue(tmp_path / "offline.db") as reopened:
+        assert reopened.server_receipt_for(provisional) == ReplayAck(41, "000123")
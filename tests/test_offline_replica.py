@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Customer, Product
+from pecan_crm.db.repositories.sales import (
+    CartLineInput,
+    FinalizeSaleInput,
+    PriceMismatchError,
+    SalesRepository,
+)
+from pecan_crm.offline.replica import LocalReplica
+
+
+def _session_factory(tmp_path: Path) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def test_replica_pulls_only_changes_since_watermark(tmp_path: Path) -> None:
+    factory = _session_factory(tmp_path)
+    t0 = datetime(2026, 3, 1, 9, 0)
+    with factory() as session:
+        session.add_all(
+            [
+                Product(
+                    product_id=1,
+                    sku="PIE-1",
+                    name="Pecan Pie",
+                    unit_type="EACH",
+                    unit_price=12.5,
+                    is_active=True,
+                    updated_at_utc=t0,
+                ),
+                Product(
+                    product_id=2,
+                    sku="RAW-1",
+                    name="Raw Pecans",
+                    unit_type="WEIGHT",
+                    unit_price=9.99,
+                    is_active=True,
+                    updated_at_utc=t0,
+                ),
+                Customer(
+                    customer_id=1,
+                    first_name="Ada",
+                    last_name="Moss",
+                    phone="555-0101",
+                    email="ada@example.com",
+                    is_active=True,
+                    updated_at_utc=t0,
+                ),
+            ]
+        )
+        session.commit()
+
+    with LocalReplica(tmp_path / "replica.db") as replica:
+        assert not replica.is_populated()
+        assert replica.pull(factory) == {"products": 2, "customers": 1}
+        assert replica.is_populated()
+        products = replica.list_active_products(search="pecan")
+        assert [p.name for p in products] == ["Pecan Pie", "Raw Pecans"]
+        assert [c.customer_id for c in replica.search_customers("0101")] == [1]
+        assert replica.list_active_products(search="%") == []
+
+        with factory() as session:
+            product = session.get(Product, 2)
+            product.unit_price = 10.49
+            product.updated_at_utc = t0 + timedelta(hours=1)
+            session.commit()
+
+        assert replica.pull(factory) == {"products": 2, "customers": 1}
+        assert replica.watermark("products") == t0 + timedelta(hours=1)
+        # Only rows at or after the new watermark come back on the next pull.
+        assert replica.pull(factory) == {"products": 1, "customers": 1}
+        assert [(p.product_id, p.unit_price) for p in replica.list_active_products()] == [
+            (1, Decimal("12.50")),
+            (2, Decimal("10.49")),
+        ]
+
+
+def test_finalize_rejects_prices_that_changed_since_ring_up(tmp_path: Path) -> None:
+    factory = _session_factory(tmp_path)
+    with factory() as session:
+        session.add(
+            Product(
+                product_id=7, name="Pecan Brittle", unit_type="EACH", unit_price=6.0, is_active=True
+            )
+        )
+        session.commit()
+
+    payload = FinalizeSaleInput(
+        cart_lines=[CartLineInput(product_id=7, quantity=Decimal("1"), weight_lbs=None)],
+        payment_method="CASH",
+        customer_id=None,
+        discount_type="NONE",
+        discount_value=Decimal("0"),
+        tax_enabled=False,
+        tax_rate_percent=Decimal("0"),
+        receipt_folder=tmp_path / "receipts",
+        business_name="",
+        business_address="",
+        business_phone="",
+        idempotency_key="key-1",
+        expected_unit_prices={7: Decimal("5.50")},
+    )
+    with pytest.raises(PriceMismatchError) as excinfo:
+        SalesRepository(factory).finalize_sale(payload)
+    assert excinfo.value.server_prices == {7: Decimal("6.00")}
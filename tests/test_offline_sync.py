@@ -0,0 +1,181 @@
+import json
+import socket
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Product, Sale, SaleItem
+from pecan_crm.db.repositories.sales import CartLineInput, FinalizeSaleInput, SalesRepository
+from pecan_crm.offline.checkout import LocalCartLine, finalize_locally
+from pecan_crm.offline.payloads import finalize_payload_from_json, finalize_payload_to_json
+from pecan_crm.offline.queue import OfflineSaleQueue, QueuedSale, ReplayAck
+from pecan_crm.offline.sync import OfflineSyncService, sales_batch_sender, tcp_probe
+
+
+def _payload(key: str) -> FinalizeSaleInput:
+    return FinalizeSaleInput(
+        cart_lines=[
+            CartLineInput(product_id=1, quantity=Decimal("2"), weight_lbs=None),
+            CartLineInput(product_id=2, quantity=None, weight_lbs=Decimal("1.255")),
+        ],
+        payment_method="CASH",
+        customer_id=None,
+        discount_type="PERCENT",
+        discount_value=Decimal("10.00"),
+        tax_enabled=True,
+        tax_rate_percent=Decimal("8.25"),
+        receipt_folder=Path("receipts"),
+        business_name="Pecan Co",
+        business_address="1 Grove Rd",
+        business_phone="555-0100",
+        idempotency_key=key,
+    )
+
+
+def test_finalize_payload_round_trips_through_json() -> None:
+    payload = _payload("key-1")
+    assert finalize_payload_from_json(finalize_payload_to_json(payload)) == payload
+
+
+def test_sync_service_drains_only_when_online(tmp_path: Path) -> None:
+    online = {"value": False}
+    sent: list[str] = []
+    statuses = []
+
+    def sender(batch: list[QueuedSale]) -> dict[str, Exception | None]:
+        sent.extend(item.idempotency_key for item in batch)
+        return {item.idempotency_key: None for item in batch}
+
+    with OfflineSaleQueue(tmp_path / "offline.db") as queue:
+        queue.enqueue(idempotency_key="key-1", payload=finalize_payload_to_json(_payload("key-1")))
+        service = OfflineSyncService(
+            queue,
+            probe=lambda: online["value"],
+            sender_factory=lambda: sender,
+            interval_seconds=1.0,
+            on_status=statuses.append,
+        )
+
+        offline = service.run_once()
+        assert (offline.online, offline.depth, offline.last_sync_at_utc) == (False, 1, None)
+        assert service.next_delay_seconds() == 2.0
+
+        online["value"] = True
+        synced = service.run_once()
+        assert (synced.online, synced.depth) == (True, 0)
+        assert synced.last_sync_at_utc is not None
+        assert sent == ["key-1"]
+        assert service.next_delay_seconds() == 1.0
+        assert statuses == [offline, synced]
+
+        service.start()
+        service.stop(timeout_seconds=5.0)
+        assert service._thread is None
+
+
+def test_tcp_probe_detects_listening_port() -> None:
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        port = listener.getsockname()[1]
+        assert tcp_probe("127.0.0.1", port, timeout_seconds=1.0)
+    assert not tcp_probe("", port)
+
+
+def test_offline_first_finalize_prints_provisional_receipt_and_reconciles(tmp_path: Path) -> None:
+    payload = replace(_payload("key-7"), receipt_folder=tmp_path / "receipts")
+    cart = [
+        LocalCartLine("Pecan Pie", "EACH", Decimal("12.50"), Decimal("2"), None),
+        LocalCartLine("Raw Pecans", "WEIGHT", Decimal("9.99"), None, Decimal("1.255")),
+    ]
+
+    with OfflineSaleQueue(tmp_path / "offline.db") as queue:
+        result = finalize_locally(queue, payload, cart)
+        again = finalize_locally(queue, payload, cart)
+
+        assert result.receipt_number == again.receipt_number == "P000001"
+        assert result.receipt_path.exists()
+        assert queue.depth() == 1
+        queued = json.loads(queue.pending()[0].payload_json)
+        assert queued["sold_at_utc"] is not None
+
+        ack = ReplayAck(41, "000123")
+        outcome = queue.replay(lambda batch: {item.idempotency_key: ack for item in batch})
+        assert outcome["sent"] == 1
+        assert queue.server_receipt_for("P000001") == ReplayAck(41, "000123")
+
+
+def _crm(tmp_path: Path) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _receipt_sequence(conn, cursor, statement, parameters, context, executemany):
+        # SQLite has no sequences; stand in for receipt_number_seq.
+        return statement.replace("NEXT VALUE FOR receipt_number_seq", "123"), parameters
+
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as session:
+        session.add_all(
+            [
+                Product(
+                    product_id=1, name="Pecan Pie", unit_type="EACH", unit_price=Decimal("12.50")
+                ),
+                Product(
+                    product_id=2, name="Raw Pecans", unit_type="WEIGHT", unit_price=Decimal("9.99")
+                ),
+            ]
+        )
+        session.commit()
+    return factory
+
+
+CART = [
+    LocalCartLine("Pecan Pie", "EACH", Decimal("12.50"), Decimal("2"), None),
+    LocalCartLine("Raw Pecans", "WEIGHT", Decimal("9.99"), None, Decimal("1.255")),
+]
+
+
+def test_replay_persists_charged_prices_after_a_server_price_change(tmp_path: Path) -> None:
+    factory = _crm(tmp_path)
+    payload = replace(_payload("key-9"), receipt_folder=tmp_path / "receipts")
+    with OfflineSaleQueue(tmp_path / "offline.db") as queue:
+        result = finalize_locally(queue, payload, CART)
+
+        # Prices go up while the sale waits in the queue.
+        with factory() as session:
+            session.get(Product, 1).unit_price = Decimal("14.00")
+            session.commit()
+
+        outcome = queue.replay(sales_batch_sender(SalesRepository(factory)))
+        assert outcome["sent"] == 1
+
+    with factory() as session:
+        sale = session.scalars(select(Sale)).one()
+        prices = session.scalars(select(SaleItem.unit_price).order_by(SaleItem.product_id)).all()
+    assert Decimal(str(sale.total)) == result.total
+    assert [Decimal(str(price)) for price in prices] == [Decimal("12.50"), Decimal("9.99")]
+
+
+def test_charged_prices_are_refused_outside_replay_and_checked_on_replay(tmp_path: Path) -> None:
+    factory = _crm(tmp_path)
+    repo = SalesRepository(factory)
+    payload = replace(_payload("key-10"), receipt_folder=tmp_path / "receipts")
+    with OfflineSaleQueue(tmp_path / "offline.db") as queue:
+        finalize_locally(queue, payload, CART)
+        queued = finalize_payload_from_json(json.loads(queue.pending()[0].payload_json))
+
+    with pytest.raises(ValueError, match="only accepted when replaying"):
+        repo.finalize_sale(queued)
+
+    # Totals that cannot come from the charged line prices mean a corrupt payload.
+    assert queued.charged_totals is not None
+    tampered = replace(queued, charged_totals=replace(queued.charged_totals, total=Decimal("1.00")))
+    with pytest.raises(ValueError, match="do not match"):
+        repo.finalize_sale(tampered, replay=True)
+    with factory() as session:
+        assert session.scalars(select(Sale)).all() == []
@@ -0,0 +1,87 @@
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base
+from pecan_crm.db.repositories.products import ProductInput, ProductRepository
+from pecan_crm.domain.scan_codes import normalize_sku
+from pecan_crm.services.product_catalog import ProductCatalog
+
+
+def _factory(tmp_path: Path) -> tuple[sessionmaker, list[str]]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return sessionmaker(bind=engine, expire_on_commit=False), statements
+
+
+def test_catalog_lookups_by_id_and_normalized_sku(tmp_path: Path) -> None:
+    session_factory, _ = _factory(tmp_path)
+    repo = ProductRepository(session_factory)
+    pecans = repo.save(
+        ProductInput(
+            name="Pecan Halves", sku="ph-1", unit_type="WEIGHT", unit_price=Decimal("9.50")
+        )
+    )
+    repo.save(
+        ProductInput(name="Brittle", sku="BR 2", unit_type="EACH", unit_price=Decimal("4.25"))
+    )
+
+    catalog = ProductCatalog()
+    assert catalog.refresh(session_factory) is True
+
+    assert len(catalog) == 2
+    assert catalog.get(pecans.product_id).unit_price == Decimal("9.50")
+    assert catalog.by_sku(" PH-1 ").product_id == pecans.product_id
+    assert catalog.by_sku("br2").name == "Brittle"
+    assert normalize_sku(" a b ") == "AB"
+    assert [p.name for p in catalog.search("")] == ["Brittle", "Pecan Halves"]
+    assert [p.name for p in catalog.search("ph-")] == ["Pecan Halves"]
+
+
+def test_catalog_refresh_applies_changes_since_version(tmp_path: Path) -> None:
+    session_factory, statements = _factory(tmp_path)
+    repo = ProductRepository(session_factory)
+    pecans = repo.save(
+        ProductInput(name="Pecans", sku="P1", unit_type="WEIGHT", unit_price=Decimal("9.50"))
+    )
+    brittle = repo.save(
+        ProductInput(name="Brittle", sku="B1", unit_type="EACH", unit_price=Decimal("4.25"))
+    )
+
+    catalog = ProductCatalog(check_interval_seconds=0)
+    catalog.refresh(session_factory)
+
+    # Unchanged catalog: only the version stamp is read.
+    statements.clear()
+    assert catalog.refresh(session_factory) is False
+    assert len(statements) == 1
+
+    repo.save(
+        ProductInput(name="Pecans", sku="P2", unit_type="WEIGHT", unit_price=Decimal("10.00")),
+        product_id=pecans.product_id,
+    )
+    repo.archive(brittle.product_id)
+    assert catalog.refresh(session_factory) is True
+
+    assert catalog.get(pecans.product_id).unit_price == Decimal("10.00")
+    assert catalog.by_sku("P2").product_id == pecans.product_id
+    assert catalog.by_sku("P1") is None
+    assert catalog.get(brittle.product_id) is None
+    assert catalog.by_sku("B1") is None
+
+
+def test_catalog_checks_are_throttled_unless_forced(tmp_path: Path) -> None:
+    session_factory, _ = _factory(tmp_path)
+    repo = ProductRepository(session_factory)
+    catalog = ProductCatalog(check_interval_seconds=3600)
+    catalog.refresh(session_factory)
+
+    repo.save(ProductInput(name="Pecans", sku="P1", unit_type="WEIGHT", unit_price=Decimal("9.50")))
+    assert catalog.refresh(session_factory) is False
+    assert len(catalog) == 0
+    assert catalog.refresh(session_factory, force=True) is True
+    assert len(catalog) == 1
@@ -0,0 +1,105 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Product
+from pecan_crm.db.repositories.products import (
+    ProductImportConflictError,
+    ProductInput,
+    ProductRepository,
+)
+from pecan_crm.services.product_import import ProductImportError, read_product_csv
+
+
+def _repo(tmp_path: Path) -> tuple[ProductRepository, list[str]]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    repo = ProductRepository(sessionmaker(bind=engine, expire_on_commit=False))
+    for name, sku, unit_type, price in [
+        ("Pecan Halves", "PH-1", "WEIGHT", "9.50"),
+        ("Brittle", "BR-1", "EACH", "4.25"),
+        ("Pie", "PIE", "EACH", "18.00"),
+    ]:
+        repo.save(ProductInput(name=name, sku=sku, unit_type=unit_type, unit_price=Decimal(price)))
+    statements.clear()
+    return repo, statements
+
+
+def _csv(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "prices.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_read_product_csv_reports_every_bad_line(tmp_path: Path) -> None:
+    path = _csv(tmp_path, "sku,unit_price,is_active\nPH-1,abc,yes\n,1.00,\nBR-1,2.00,maybe\n")
+    with pytest.raises(ProductImportError) as excinfo:
+        read_product_csv(path)
+    message = str(excinfo.value)
+    assert "line 2" in message and "line 3" in message and "line 4" in message
+
+
+def test_plan_diffs_against_catalog_and_apply_writes_it(tmp_path: Path) -> None:
+    repo, statements = _repo(tmp_path)
+    path = _csv(
+        tmp_path,
+        "sku,name,unit_type,unit_price,is_active\n"
+        "ph-1,,,$10.25,\n"
+        "BR-1,,,4.25,\n"
+        "PIE,,,,no\n"
+        "NEW-1,Pralines,EACH,6.5,\n",
+    )
+
+    plan = repo.plan_import(read_product_csv(path))
+    assert plan.unchanged == 1
+    assert [(c.after.sku, c.changed_fields) for c in plan.updates] == [
+        ("PH-1", ["unit_price"]),
+        ("PIE", ["is_active"]),
+    ]
+    assert [c.after.name for c in plan.inserts] == ["Pralines"]
+    assert plan.updates[0].after.unit_price == Decimal("10.25")
+
+    statements.clear()
+    result = repo.apply_import(plan)
+    assert (result.updated, result.inserted, result.unchanged) == (2, 1, 1)
+    # Lock/check SELECT, one executemany UPDATE, one INSERT: no per-product round trips.
+    assert sum(s.lstrip().upper().startswith("UPDATE") for s in statements) == 1
+
+    products = {p.sku: p for p in repo.list_products()}
+    assert Decimal(str(products["PH-1"].unit_price)) == Decimal("10.25")
+    assert products["PIE"].is_active is False
+    assert Decimal(str(products["NEW-1"].unit_price)) == Decimal("6.50")
+
+
+def test_plan_rejects_incomplete_new_products_and_duplicates(tmp_path: Path) -> None:
+    repo, _ = _repo(tmp_path)
+    path = _csv(tmp_path, "sku,name,unit_price\nNEW-1,,1.00\nPIE,,2.00\npie,,3.00\n")
+    with pytest.raises(ProductImportError) as excinfo:
+        repo.plan_import(read_product_csv(path))
+    message = str(excinfo.value)
+    assert "line 2" in message
+    assert "also on line 3" in message
+
+
+def test_apply_rolls_back_when_products_changed_after_preview(tmp_path: Path) -> None:
+    repo, _ = _repo(tmp_path)
+    plan = repo.plan_import(
+        read_product_csv(_csv(tmp_path, "sku,unit_price\nPH-1,11.00\nBR-1,5.00\n"))
+    )
+
+    with repo.session_factory() as session:
+        session.execute(
+            update(Product).where(Product.sku == "BR-1").values(updated_at_utc=datetime(2030, 1, 1))
+        )
+        session.commit()
+
+    with pytest.raises(ProductImportConflictError):
+        repo.apply_import(plan)
+    prices = {p.sku: Decimal(str(p.unit_price)) for p in repo.list_products()}
+    assert prices["PH-1"] == Decimal("9.50")
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Customer, Product, Sale, SaleItem
+from pecan_crm.db.repositories.sales import SalesRepository
+from pecan_crm.services.purchase_history import PurchaseHistoryCache, load_purchase_page
+
+T0 = datetime(2026, 3, 1, 9, 0)
+
+
+def _seed(tmp_path: Path) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with session_factory() as session:
+        session.add_all(
+            [Customer(customer_id=1, first_name="Ann"), Customer(customer_id=2, first_name="Bo")]
+        )
+        session.add(
+            Product(product_id=1, name="Pecans", unit_type="WEIGHT", unit_price=Decimal("9.50"))
+        )
+        # Sales 3 and 4 share a timestamp so the sale_id tie-break is exercised.
+        times = [T0 + timedelta(days=days) for days in (0, 1, 2, 2, 3)]
+        for sale_id, sold_at in enumerate(times, start=1):
+            session.add(
+                Sale(
+                    sale_id=sale_id,
+                    receipt_number=f"{sale_id:06d}",
+                    customer_id=2 if sale_id == 5 else 1,
+                    payment_method="CASH",
+                    subtotal=Decimal("19"),
+                    total=Decimal("19"),
+                    sold_at_utc=sold_at,
+                )
+            )
+            session.add(
+                SaleItem(
+                    sale_id=sale_id,
+                    product_id=1,
+                    product_name_snapshot="Pecans",
+                    unit_type="WEIGHT",
+                    weight_lbs=Decimal("2.000"),
+                    unit_price=Decimal("9.50"),
+                    line_subtotal=Decimal("19"),
+                )
+            )
+        session.commit()
+    return session_factory
+
+
+def test_keyset_pages_walk_newest_first_without_gaps(tmp_path: Path) -> None:
+    session_factory = _seed(tmp_path)
+
+    first, more = load_purchase_page(session_factory, 1, limit=2)
+    second, more_after = load_purchase_page(session_factory, 1, after=first[-1], limit=2)
+
+    assert [e.sale_id for e in first] == [4, 3]
+    assert more is True
+    assert [e.sale_id for e in second] == [2, 1]
+    assert more_after is False
+    assert first[0].items_summary == "Pecans 2 lb"
+    assert first[0].total == Decimal("19.00")
+
+
+def test_cache_appends_pages_and_is_invalidated_by_voids(tmp_path: Path) -> None:
+    session_factory = _seed(tmp_path)
+    cache = PurchaseHistoryCache(session_factory, page_size=3)
+
+    history = cache.get(1)
+    assert [e.sale_id for e in history.entries] == [4, 3, 2]
+    assert history.has_more is True
+    history = cache.load_more(1)
+    assert [e.sale_id for e in history.entries] == [4, 3, 2, 1]
+    assert history.has_more is False
+    assert cache.get(1) == history
+
+    repo = SalesRepository(session_factory)
+    assert [e.status for e in repo.customer_purchase_history(1).entries] == ["FINALIZED"] * 4
+    repo.void_sale(sale_id=4, reason="Wrong customer")
+    assert repo.customer_purchase_history(1).entries[0].status == "VOIDED"
+
+
+def test_cache_expires_so_sales_from_other_registers_appear(tmp_path: Path) -> None:
+    session_factory = _seed(tmp_path)
+    cached = PurchaseHistoryCache(session_factory, page_size=10)
+    expiring = PurchaseHistoryCache(session_factory, page_size=10, max_age_seconds=0)
+    assert len(cached.get(1).entries) == len(expiring.get(1).entries) == 4
+
+    # Another register records a sale; no invalidate() reaches this process.
+    with session_factory() as session:
+        session.add(
+            Sale(
+                sale_id=6,
+                receipt_number="000006",
+                customer_id=1,
+                payment_method="CARD",
+                subtotal=Decimal("5"),
+                total=Decimal("5"),
+                sold_at_utc=T0 + timedelta(days=4),
+            )
+        )
+        session.commit()
+
+    assert len(cached.get(1).entries) == 4
+    assert [e.sale_id for e in expiring.get(1).entries] == [6, 4, 3, 2, 1]
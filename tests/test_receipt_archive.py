@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from pecan_crm.services.receipt_archive import ReceiptArchiver
+from pecan_crm.services.receipt_storage import ReceiptStore
+from pecan_crm.services.receipts import ReceiptData
+
+
+def _receipt(receipt_number: str, sold_at: datetime) -> ReceiptData:
+    return ReceiptData(
+        receipt_number=receipt_number,
+        sold_at_local=sold_at,
+        business_name="Pecan Company",
+        business_address="123 Main St",
+        business_phone="555-0100",
+        payment_method="CASH",
+        customer_summary="",
+        subtotal=Decimal("0.00"),
+        discount_total=Decimal("0.00"),
+        tax_total=Decimal("0.00"),
+        total=Decimal("0.00"),
+        lines=[],
+    )
+
+
+def test_pack_closed_months_leaves_current_month_loose(tmp_path: Path) -> None:
+    store = ReceiptStore(tmp_path)
+    store.save(_receipt("000001", datetime(2026, 1, 5)))
+    store.save(_receipt("000002", datetime(2026, 1, 20)))
+    current = store.save(_receipt("000003", datetime(2026, 2, 1)))
+
+    report = ReceiptArchiver(store).pack_closed_months(date(2026, 2, 10))
+
+    assert report.months == ["2026-01"]
+    assert report.receipts_packed == 2
+    assert not (tmp_path / "2026" / "01").exists()
+    assert current.exists()
+    assert (tmp_path / "archive" / "receipts_2026_01.zip").exists()
+
+
+def test_archived_receipt_extracts_on_demand(tmp_path: Path) -> None:
+    store = ReceiptStore(tmp_path)
+    original = store.save(_receipt("000001", datetime(2025, 11, 5))).read_bytes()
+    ReceiptArchiver(store).pack_closed_months(date(2026, 2, 10))
+
+    restored = store.extract("000001", tmp_path / "restored")
+
+    assert restored is not None
+    assert restored.read_bytes() == original
+    assert store.resolve("000001") is not None
@@ -2,7 +2,9 @@ import pytest
 
 from pecan_crm.domain.receipt_numbers import (
     ReceiptNumberError,
+    format_provisional_receipt_number,
     format_receipt_number,
+    is_provisional_receipt_number,
     parse_receipt_number,
 )
 
@@ -23,4 +25,13 @@ def test_parse_receipt_number_rejects_invalid_format() -> None:
 
 
 def test_parse_receipt_number_returns_integer() -> None:
-    assert parse_receipt_number("000321") == 321
\ No newline at end of file
+    assert parse_receipt_number("000321") == 321
+
+
+def test_provisional_receipt_numbers_are_distinct_from_server_numbers() -> None:
+    provisional = format_provisional_receipt_number(42)
+    assert provisional == "P000042"
+    assert is_provisional_receipt_number(provisional)
+    assert not is_provisional_receipt_number(format_receipt_number(42))
+    with pytest.raises(ReceiptNumberError):
+        parse_receipt_number(provisional)
@@ -0,0 +1,216 @@
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.db.models import Base, Customer, Product, Sale, SaleItem
+from pecan_crm.db.repositories.sales import SalesRepository
+from pecan_crm.services.receipt_archive import ReceiptArchiver
+from pecan_crm.services.receipt_reconcile import present_receipts, reconcile
+from pecan_crm.services.receipt_storage import ReceiptStore
+from pecan_crm.services.receipts import ReceiptData
+
+T0 = datetime(2026, 3, 1, 9, 0)
+
+
+def _seed(tmp_path: Path) -> tuple[SalesRepository, list[str]]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with session_factory() as session:
+        session.add(Customer(customer_id=1, first_name="Ann", last_name="Lee", phone="555-0101"))
+        session.add(
+            Product(product_id=1, name="Pecans", unit_type="WEIGHT", unit_price=Decimal("9.50"))
+        )
+        # Sale 3 is an offline sale replayed after sale 2 with its original, earlier sale time.
+        times = [T0, T0 + timedelta(days=2), T0 + timedelta(days=1)]
+        for sale_id, sold_at in enumerate(times, start=1):
+            session.add(
+                Sale(
+                    sale_id=sale_id,
+                    receipt_number=f"{sale_id:06d}",
+                    customer_id=1 if sale_id == 3 else None,
+                    payment_method="CASH",
+                    subtotal=Decimal("19"),
+                    total=Decimal("19"),
+                    sold_at_utc=sold_at,
+                )
+            )
+            session.add(
+                SaleItem(
+                    sale_id=sale_id,
+                    product_id=1,
+                    product_name_snapshot="Pecans",
+                    unit_type="WEIGHT",
+                    weight_lbs=Decimal("2.000"),
+                    unit_price=Decimal("9.50"),
+                    line_subtotal=Decimal("19"),
+                )
+            )
+        session.commit()
+    statements.clear()
+    return SalesRepository(session_factory), statements
+
+
+def test_receipt_refs_filter_by_sale_time_or_sale_id_watermark(tmp_path: Path) -> None:
+    repo, _ = _seed(tmp_path)
+
+    assert [ref.sale_id for ref in repo.list_receipt_refs()] == [1, 2, 3]
+    assert [ref.sale_id for ref in repo.list_receipt_refs(since=T0 + timedelta(days=2))] == [2]
+    # The replayed sale is still picked up by an incremental run keyed on sale_id.
+    refs = repo.list_receipt_refs(after_sale_id=2)
+    assert [(ref.sale_id, ref.receipt_number, ref.sold_at_utc) for ref in refs] == [
+        (3, "000003", T0 + timedelta(days=1))
+    ]
+
+
+def test_load_receipt_data_batches_queries_per_chunk(tmp_path: Path) -> None:
+    repo, statements = _seed(tmp_path)
+
+    receipts = list(
+        repo.load_receipt_data(
+            [1, 3, 99],
+            business_name="Pecan Co",
+            business_address="1 Grove Rd",
+            business_phone="555-0100",
+            chunk_size=2,
+        )
+    )
+
+    assert [r.receipt_number for r in receipts] == ["000001", "000003"]
+    assert receipts[1].customer_summary.startswith("Ann Lee")
+    assert receipts[1].business_name == "Pecan Co"
+    assert [(line.name, line.weight_lbs, line.line_subtotal) for line in receipts[0].lines] == [
+        ("Pecans", Decimal("2.000"), Decimal("19.00"))
+    ]
+    # Chunk [1, 3]: sales, items and customers; chunk [99]: sales and items only.
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 5
+
+
+def _reconcile(repo: SalesRepository, store: ReceiptStore, **kwargs):
+    return reconcile(
+        repo,
+        store,
+        business_name="Pecan Co",
+        business_address="1 Grove Rd",
+        business_phone="555-0100",
+        **kwargs,
+    )
+
+
+def _add_sale(repo: SalesRepository, sale_id: int) -> None:
+    with repo.session_factory() as session:
+        session.add(
+            Sale(
+                sale_id=sale_id,
+                receipt_number=f"{sale_id:06d}",
+                payment_method="CARD",
+                subtotal=Decimal("5"),
+                total=Decimal("5"),
+                sold_at_utc=T0,
+            )
+        )
+        session.commit()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reconcile_regenerates_missing_receipts_and_advances_watermark(
+    tmp_path: Path, workers: int
+) -> None:
+    repo, _ = _seed(tmp_path)
+    store = ReceiptStore(tmp_path / "receipts")
+    watermark = tmp_path / "watermark.json"
+
+    report = _reconcile(repo, store, watermark_path=watermark, workers=workers, chunk_size=2)
+    assert (report.scanned, report.missing, report.regenerated, report.errors) == (3, 3, 3, 0)
+    assert (report.watermark, report.watermark_advanced) == (3, True)
+    assert store.resolve("000003") == tmp_path / "receipts" / "2026" / "03" / "receipt_000003.pdf"
+
+    _add_sale(repo, 4)
+    report = _reconcile(repo, store, watermark_path=watermark, workers=workers, chunk_size=2)
+    assert (report.after_sale_id, report.scanned, report.regenerated) == (3, 1, 1)
+    assert report.watermark_advanced
+
+
+def test_reconcile_holds_the_watermark_until_a_clean_run(tmp_path: Path) -> None:
+    repo, _ = _seed(tmp_path)
+    store = ReceiptStore(tmp_path / "receipts")
+    watermark = tmp_path / "watermark.json"
+    # A directory where sale 2's PDF belongs makes that render fail.
+    blocker = tmp_path / "receipts" / "2026" / "03" / "receipt_000002.pdf"
+    blocker.mkdir(parents=True)
+
+    report = _reconcile(repo, store, watermark_path=watermark, workers=2)
+    assert (report.regenerated, report.render_failures, report.vanished) == (2, 1, 0)
+    assert report.errors == 1
+    assert not report.watermark_advanced
+    assert not watermark.exists()
+
+    # Detection-only and --since runs never move the watermark either.
+    blocker.rmdir()
+    assert not _reconcile(repo, store, watermark_path=watermark, repair=False).watermark_advanced
+    report = _reconcile(repo, store, watermark_path=watermark, since=T0)
+    assert (report.after_sale_id, report.regenerated, report.watermark_advanced) == (None, 1, False)
+    assert not watermark.exists()
+
+    report = _reconcile(repo, store, watermark_path=watermark)
+    assert (report.missing, report.errors, report.watermark_advanced) == (0, 0, True)
+
+
+def test_reconcile_counts_sales_that_vanish_before_the_bulk_load(tmp_path: Path) -> None:
+    repo, _ = _seed(tmp_path)
+
+    class _Vanishing(SalesRepository):
+        def load_receipt_data(self, sale_ids, **kwargs):
+            return super().load_receipt_data([i for i in sale_ids if i != 1], **kwargs)
+
+    report = _reconcile(_Vanishing(repo.session_factory), ReceiptStore(tmp_path / "receipts"))
+    assert (report.missing, report.regenerated, report.render_failures) == (3, 2, 0)
+    assert (report.vanished, report.errors) == (1, 1)
+
+
+def _receipt(receipt_number: str, sold_at: datetime) -> ReceiptData:
+    return ReceiptData(
+        receipt_number=receipt_number,
+        sold_at_local=sold_at,
+        business_name="Pecan Co",
+        business_address="1 Grove Rd",
+        business_phone="555-0100",
+        payment_method="CASH",
+        customer_summary="",
+        subtotal=Decimal("0.00"),
+        discount_total=Decimal("0.00"),
+        tax_total=Decimal("0.00"),
+        total=Decimal("0.00"),
+        lines=[],
+    )
+
+
+def test_present_receipts_checks_files_and_archive_members_by_default(tmp_path: Path) -> None:
+    store = ReceiptStore(tmp_path)
+    for number in ("000001", "000002"):
+        store.save(_receipt(number, datetime(2026, 1, 5)))
+    loose = {
+        number: store.save(_receipt(number, datetime(2026, 2, 5)))
+        for number in ("000003", "000004", "000005")
+    }
+    ReceiptArchiver(store).pack_closed_months(date(2026, 2, 10))
+
+    # Lose one archive member, delete one loose file and truncate another outside the app.
+    pack = tmp_path / "archive" / "receipts_2026_01.zip"
+    with zipfile.ZipFile(pack) as zf:
+        kept = {name: zf.read(name) for name in zf.namelist() if name != "receipt_000002.pdf"}
+    with zipfile.ZipFile(pack, "w") as zf:
+        for name, content in kept.items():
+            zf.writestr(name, content)
+    loose["000003"].unlink()
+    loose["000004"].write_bytes(loose["000004"].read_bytes()[:100])
+
+    assert present_receipts(store) == {"000001", "000005"}
+    assert present_receipts(store, index_only=True) == {f"00000{i}" for i in range(1, 6)}
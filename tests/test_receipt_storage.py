@@ -0,0 +1,81 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from pecan_crm.services import receipt_storage
+from pecan_crm.services.receipt_storage import ReceiptStore, file_sha256
+from pecan_crm.services.receipts import ReceiptData
+
+
+def _receipt(receipt_number: str, sold_at: datetime) -> ReceiptData:
+    return ReceiptData(
+        receipt_number=receipt_number,
+        sold_at_local=sold_at,
+        business_name="Pecan Company",
+        business_address="123 Main St",
+        business_phone="555-0100",
+        payment_method="CARD",
+        customer_summary="",
+        subtotal=Decimal("0.00"),
+        discount_total=Decimal("0.00"),
+        tax_total=Decimal("0.00"),
+        total=Decimal("0.00"),
+        lines=[],
+    )
+
+
+def test_save_shards_by_month_and_indexes_receipt(tmp_path: Path) -> None:
+    store = ReceiptStore(tmp_path)
+
+    path = store.save(_receipt("000010", datetime(2026, 3, 4, 10, 0, 0)))
+
+    assert path == tmp_path / "2026" / "03" / "receipt_000010.pdf"
+    entry = store.lookup("000010")
+    assert entry is not None
+    assert entry.relative_path == "2026/03/receipt_000010.pdf"
+    assert entry.size_bytes == path.stat().st_size
+    assert entry.sha256 == file_sha256(path)
+    assert store.resolve("000010") == path
+    assert store.resolve("999999") is None
+
+
+def test_migrate_flat_layout_moves_files_into_shards(tmp_path: Path) -> None:
+    (tmp_path / "receipt_000001.pdf").write_bytes(b"%PDF-1.4 one")
+    (tmp_path / "receipt_000002.pdf").write_bytes(b"%PDF-1.4 two")
+    store = ReceiptStore(tmp_path)
+
+    assert store.resolve("000001") == tmp_path / "receipt_000001.pdf"
+
+    report = store.migrate_flat_layout({"000001": datetime(2025, 12, 31, 23, 0, 0)})
+
+    assert report.moved == 2
+    assert report.indexed == 2
+    assert store.resolve("000001") == tmp_path / "2025" / "12" / "receipt_000001.pdf"
+    assert store.resolve("000002") is not None
+    assert not list(tmp_path.glob("receipt_*.pdf"))
+
+
+def test_save_skips_render_when_stored_receipt_matches(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = ReceiptStore(tmp_path)
+    data = _receipt("000020", datetime(2026, 3, 4, 10, 0, 0))
+    first = store.save(data)
+
+    renders: list[str] = []
+    original_render = receipt_storage.render_receipt_pdf
+
+    def counting_render(receipt: ReceiptData) -> bytes:
+        renders.append(receipt.receipt_number)
+        return original_render(receipt)
+
+    monkeypatch.setattr(receipt_storage, "render_receipt_pdf", counting_render)
+
+    assert store.save(data) == first
+    assert renders == []
+
+    first.write_bytes(b"truncated")
+    store.save(data)
+    assert renders == ["000020"]
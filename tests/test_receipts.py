@@ -0,0 +1,73 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from pecan_crm.services.receipts import (
+    ReceiptData,
+    ReceiptLine,
+    generate_receipt_pdf,
+    receipt_fingerprint,
+    receipt_template,
+    render_receipt_pdf,
+)
+
+
+def _receipt(receipt_number: str, line_count: int = 2) -> ReceiptData:
+    return ReceiptData(
+        receipt_number=receipt_number,
+        sold_at_local=datetime(2026, 2, 18, 9, 15, 0),
+        business_name="Pecan Company",
+        business_address="123 Main St",
+        business_phone="555-0100",
+        payment_method="CASH",
+        customer_summary="",
+        subtotal=Decimal("10.00"),
+        discount_total=Decimal("0.00"),
+        tax_total=Decimal("0.00"),
+        total=Decimal("10.00"),
+        lines=[
+            ReceiptLine(
+                name=f"Pecans {i}",
+                unit_type="EACH",
+                quantity=Decimal("1"),
+                weight_lbs=None,
+                unit_price=Decimal("5.00"),
+                line_subtotal=Decimal("5.00"),
+            )
+            for i in range(line_count)
+        ],
+    )
+
+
+def test_receipt_template_is_cached_per_business_profile() -> None:
+    first = receipt_template("Pecan Company", "123 Main St", "555-0100")
+    again = receipt_template("Pecan Company", "123 Main St", "555-0100")
+    other = receipt_template("Pecan Company", "456 Oak Ave", "555-0100")
+
+    assert first is again
+    assert other is not first
+    assert "(123 Main St) Tj" in first.header_code
+
+
+def test_generate_receipt_pdf_writes_multi_page_pdf(tmp_path: Path) -> None:
+    path = generate_receipt_pdf(tmp_path, _receipt("000007", line_count=120))
+
+    assert path == tmp_path / "receipt_000007.pdf"
+    content = path.read_bytes()
+    assert content.startswith(b"%PDF")
+    assert content.count(b"/Type /Page\n") == 3
+
+
+def test_render_receipt_pdf_is_deterministic_for_same_data() -> None:
+    data = _receipt("000008")
+
+    assert render_receipt_pdf(data) == render_receipt_pdf(data)
+    assert receipt_fingerprint(data) == receipt_fingerprint(_receipt("000008"))
+    assert receipt_fingerprint(data) != receipt_fingerprint(_receipt("000008", line_count=3))
+
+
+def test_generate_receipt_pdf_leaves_no_temp_files(tmp_path: Path) -> None:
+    generate_receipt_pdf(tmp_path, _receipt("000009"))
+    generate_receipt_pdf(tmp_path, _receipt("000009", line_count=4))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["receipt_000009.pdf"]
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+import pytest
+
+from pecan_crm.domain.scan_codes import ScanCode, ScanCodeError, is_valid_upc_a, parse_scan
+
+
+def test_plain_sku_and_quantity_prefix() -> None:
+    assert parse_scan(" PH-1 ") == ScanCode(sku="PH-1")
+    assert parse_scan("3*PH-1") == ScanCode(sku="PH-1", quantity=Decimal("3"))
+    assert parse_scan("036000291452") == ScanCode(sku="036000291452")
+
+
+def test_variable_weight_label_embeds_item_code_and_weight() -> None:
+    code = parse_scan("212345001257")
+    assert code.embedded_sku == "212345"
+    assert code.weight_lbs == Decimal("1.25")
+    # EAN-13 readout of the same label.
+    assert parse_scan("0212345001257").weight_lbs == Decimal("1.25")
+
+
+def test_prefix_two_with_bad_check_digit_is_a_plain_sku() -> None:
+    assert not is_valid_upc_a("212345001258")
+    assert parse_scan("212345001258") == ScanCode(sku="212345001258")
+
+
+@pytest.mark.parametrize("text", ["", "0*PH-1", "2*212345001257", "212345000007"])
+def test_invalid_scans_are_rejected(text: str) -> None:
+    with pytest.raises(ScanCodeError):
+        parse_scan(text)
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pecan_crm.config.models import AppConfig, DatabaseConfig
+from pecan_crm.config.settings_service import SettingsService
+from pecan_crm.config.store import ConfigStore
+from pecan_crm.db import runtime
+
+
+class _Secrets:
+    def __init__(self, password: str = "pw") -> None:
+        self.password = password
+        self.reads = 0
+
+    def get_db_password(self) -> str:
+        self.reads += 1
+        return self.password
+
+    def set_db_password(self, password: str) -> None:
+        self.password = password
+
+
+class _CountingStore(ConfigStore):
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.loads = 0
+
+    def load(self) -> AppConfig:
+        self.loads += 1
+        return super().load()
+
+
+def _config(server: str) -> AppConfig:
+    return AppConfig(database=DatabaseConfig(server=server, database="crm", username="pos"))
+
+
+def _service(tmp_path: Path) -> tuple[SettingsService, _CountingStore, _Secrets]:
+    store = _CountingStore(tmp_path / "settings.json")
+    secrets = _Secrets()
+    return SettingsService(store, secrets), store, secrets  # type: ignore[arg-type]
+
+
+def test_snapshot_is_cached_until_the_file_changes(tmp_path: Path) -> None:
+    service, store, secrets = _service(tmp_path)
+    store.save(_config("a"))
+    seen: list[str] = []
+    service.add_listener(lambda config: seen.append(config.database.server))
+
+    for _ in range(5):
+        assert service.config().database.server == "a"
+        assert service.db_password() == "pw"
+    assert (store.loads, secrets.reads) == (1, 1)
+
+    # Another process rewrites the file.
+    store.save(_config("b"))
+    os.utime(store.path, ns=(0, 10**18))
+    assert service.config().database.server == "b"
+    assert store.loads == 2
+    assert seen == ["b"]
+
+
+def test_save_updates_the_snapshot_and_notifies(tmp_path: Path) -> None:
+    service, store, secrets = _service(tmp_path)
+    seen: list[str] = []
+    remove = service.add_listener(lambda config: seen.append(config.database.server))
+
+    service.save(_config("c"), db_password="new")
+    assert service.config().database.server == "c"
+    assert service.db_password() == "new"
+    assert (store.loads, secrets.reads) == (0, 0)
+    assert seen == ["c"]
+
+    remove()
+    service.save(_config("d"))
+    assert seen == ["c"]
+
+
+def test_engines_are_reused_and_disposed_when_settings_change(tmp_path: Path, monkeypatch) -> None:
+    service, _, _ = _service(tmp_path)
+    service.save(_config("a"))
+    built: list[str] = []
+
+    def fake_factory(*, server: str, database: str, username: str, password: str):
+        built.append(server)
+        return sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / server}.db"))
+
+    monkeypatch.setattr(runtime, "make_session_factory", fake_factory)
+    monkeypatch.setattr(runtime, "_FACTORIES", {})
+
+    first = runtime.build_session_factory_from_settings(service)
+    assert runtime.build_session_factory_from_settings(service) is first
+
+    service.save(_config("b"))
+    assert runtime.build_session_factory_from_settings(service) is not first
+    assert built == ["a", "b"]
+    assert list(runtime._FACTORIES) == [("b", "crm", "pos", "pw")]
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Cold start (fresh interpreter) to the main window's first paint. Generous for slow CI
+# machines; a regression that pulls the database stack or reportlab back into startup
+# is caught by the module check below regardless of machine speed.
+STARTUP_BUDGET_SECONDS = 5.0
+
+
+def test_cold_start_paints_within_budget_without_deferred_modules(tmp_path: Path) -> None:
+    report_path = tmp_path / "startup.json"
+    env = {
+        **os.environ,
+        "HOME": str(tmp_path),
+        "USERPROFILE": str(tmp_path),
+        "QT_QPA_PLATFORM": "offscreen",
+        "PYTHONPATH": os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")]),
+    }
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pecan_crm",
+            "--startup-profile",
+            str(report_path),
+            "--quit-after-startup",
+        ],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=False,
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["marks"]["first_paint"] < STARTUP_BUDGET_SECONDS
+    assert report["deferred_modules_loaded_at_first_paint"] == []
+    assert {phase["name"] for phase in report["phases"]} >= {"qt_application", "main_window"}
+    assert any(entry["module"] == "pecan_crm.app.main_window" for entry in report["imports"])
@@ -0,0 +1,98 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QModelIndex, Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from pecan_crm.app.table_models import (  # noqa: E402
+    RowFilterProxyModel,
+    RowTableModel,
+    TableColumn,
+)
+
+COLUMNS = [
+    TableColumn("ID"),
+    TableColumn("Name"),
+    TableColumn("Total", lambda v: f"${v:.2f}", align_right=True),
+]
+
+
+def _app() -> QCoreApplication:
+    return QApplication.instance() or QApplication([])
+
+
+def _rows(count: int) -> list[tuple[int, str | None, Decimal]]:
+    return [(i, None if i == 3 else f"name{i % 7}", Decimal(i) / 4) for i in range(count)]
+
+
+def test_rows_are_exposed_in_batches_and_formatted_on_demand() -> None:
+    _app()
+    model = RowTableModel(COLUMNS, batch_size=10)
+    model.set_rows(_rows(25))
+
+    assert model.rowCount() == 10
+    assert model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    assert model.rowCount() == 25
+    assert not model.canFetchMore(QModelIndex())
+    assert model.index(5, 2).data() == "$1.25"
+    assert model.index(3, 1).data() == ""
+    assert model.headerData(2, Qt.Orientation.Horizontal) == "Total"
+
+
+def test_fetch_more_asks_for_the_next_page_once() -> None:
+    _app()
+    calls: list[int] = []
+    model = RowTableModel(COLUMNS, load_more=lambda: calls.append(1), batch_size=10)
+    model.set_rows(_rows(10), has_more=True)
+
+    model.fetchMore(QModelIndex())
+    assert calls == [1]
+    # Still waiting on that page: no second request.
+    assert not model.canFetchMore(QModelIndex())
+
+    model.append_rows(_rows(5), has_more=False)
+    assert model.rowCount() == 15
+
+
+def test_failed_page_is_retried_on_the_next_fetch() -> None:
+    _app()
+    calls: list[int] = []
+    model = RowTableModel(COLUMNS, load_more=lambda: calls.append(1), batch_size=10)
+    model.set_rows(_rows(10), has_more=True)
+
+    model.fetchMore(QModelIndex())
+    model.page_failed()
+    assert model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    assert calls == [1, 1]
+
+    model.append_rows(_rows(5), has_more=False)
+    # Only a pending page request is re-armed.
+    model.page_failed()
+    assert not model.canFetchMore(QModelIndex())
+
+
+def test_sort_covers_all_loaded_rows_and_filters_hide_rows() -> None:
+    _app()
+    model = RowTableModel(COLUMNS, batch_size=10)
+    proxy = RowFilterProxyModel(model)
+    model.set_rows(_rows(100))
+
+    proxy.sort(2, Qt.SortOrder.DescendingOrder)
+    assert proxy.index(0, 0).data() == "99"
+    proxy.sort(1, Qt.SortOrder.AscendingOrder)
+    # Blank names sort first.
+    assert proxy.source_row(0)[0] == 3
+
+    proxy.set_row_filter(lambda row: row[0] % 2 == 0)
+    assert proxy.rowCount() == 50
+    proxy.set_text_filter("NAME6")
+    assert {proxy.source_row(i)[1] for i in range(proxy.rowCount())} == {"name6"}
+    assert all(proxy.source_row(i)[0] % 2 == 0 for i in range(proxy.rowCount()))